@@ -0,0 +1,33 @@
+"""add item ingest failures
+
+Revision ID: 2d8f6b4a1c97
+Revises: 9a5c3e71d2b8
+Create Date: 2026-10-17 15:47:12.603958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '2d8f6b4a1c97'
+down_revision: Union[str, None] = '9a5c3e71d2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('item_ingest_failures',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('error', sa.Text(), nullable=False),
+    sa.Column('failed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_item_ingest_failures_failed_at', 'item_ingest_failures', ['failed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_item_ingest_failures_failed_at', table_name='item_ingest_failures')
+    op.drop_table('item_ingest_failures')
@@ -0,0 +1,100 @@
+"""shard collection versions
+
+Revision ID: 4e7b1c9d3f62
+Revises: b6f2d9a41c73
+Create Date: 2026-10-17 14:12:37.905124
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7b1c9d3f62'
+down_revision: Union[str, None] = 'b6f2d9a41c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SHARDED_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+DECLARE
+    delta bigint := 0;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE collection_versions SET row_count = 0
+        WHERE name = TG_TABLE_NAME;
+    ELSIF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    -- The shard is fixed per transaction, so writers never lock two
+    -- shards in opposite orders.
+    INSERT INTO collection_versions (name, shard, version, row_count)
+    VALUES (TG_TABLE_NAME, txid_current() % 16, 1, delta)
+    ON CONFLICT (name, shard) DO UPDATE SET
+        version = collection_versions.version + 1,
+        row_count = collection_versions.row_count + delta;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+COUNTING_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+DECLARE
+    delta bigint := 0;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    INSERT INTO collection_versions (name, version, row_count)
+    VALUES (TG_TABLE_NAME, 1, greatest(delta, 0))
+    ON CONFLICT (name) DO UPDATE SET
+        version = collection_versions.version + 1,
+        row_count = CASE WHEN TG_OP = 'TRUNCATE' THEN 0
+            ELSE collection_versions.row_count + delta END;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    # The existing row of each table becomes its shard 0.
+    op.add_column(
+        'collection_versions',
+        sa.Column('shard', sa.SmallInteger(), server_default='0', nullable=False),
+    )
+    op.drop_constraint('collection_versions_pkey', 'collection_versions')
+    op.create_primary_key(
+        'collection_versions_pkey', 'collection_versions', ['name', 'shard']
+    )
+    op.execute(SHARDED_FUNCTION)
+
+
+def downgrade() -> None:
+    op.execute("LOCK TABLE collection_versions IN EXCLUSIVE MODE")
+    op.execute(COUNTING_FUNCTION)
+    # Fold the shards into shard 0; the summed version never goes backwards.
+    op.execute(
+        "UPDATE collection_versions AS v SET "
+        "version = totals.version, row_count = greatest(totals.row_count, 0) "
+        "FROM (SELECT name, sum(version) AS version, sum(row_count) AS row_count "
+        "FROM collection_versions GROUP BY name) AS totals "
+        "WHERE v.name = totals.name AND v.shard = 0"
+    )
+    op.execute(
+        "INSERT INTO collection_versions (name, shard, version, row_count) "
+        "SELECT name, 0, sum(version), greatest(sum(row_count), 0) "
+        "FROM collection_versions GROUP BY name "
+        "HAVING bool_and(shard <> 0)"
+    )
+    op.execute("DELETE FROM collection_versions WHERE shard <> 0")
+    op.drop_constraint('collection_versions_pkey', 'collection_versions')
+    op.create_primary_key('collection_versions_pkey', 'collection_versions', ['name'])
+    op.drop_column('collection_versions', 'shard')
@@ -0,0 +1,38 @@
+"""add items keyset index
+
+Revision ID: 8c4d2b61e5a7
+Revises: 3f1a9c2e7b40
+Create Date: 2026-10-17 04:35:12.418903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4d2b61e5a7'
+down_revision: Union[str, None] = '3f1a9c2e7b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so existing tables stay writable during the build.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_created_at_id',
+            'items',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_items_created_at_id',
+            table_name='items',
+            postgresql_concurrently=True,
+        )
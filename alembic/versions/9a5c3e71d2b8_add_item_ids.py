@@ -0,0 +1,68 @@
+"""add item ids
+
+Revision ID: 9a5c3e71d2b8
+Revises: 4e7b1c9d3f62
+Create Date: 2026-10-17 15:03:51.284617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9a5c3e71d2b8'
+down_revision: Union[str, None] = '4e7b1c9d3f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACK_FUNCTION = """
+CREATE OR REPLACE FUNCTION track_item_ids() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO item_ids (id, created_at)
+        SELECT id, created_at FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        DELETE FROM item_ids USING old_rows WHERE item_ids.id = old_rows.id;
+    ELSE
+        TRUNCATE item_ids;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+TRIGGERS = [
+    "CREATE TRIGGER items_ids_insert AFTER INSERT ON items "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION track_item_ids()",
+    "CREATE TRIGGER items_ids_delete AFTER DELETE ON items "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION track_item_ids()",
+    "CREATE TRIGGER items_ids_truncate AFTER TRUNCATE ON items "
+    "FOR EACH STATEMENT EXECUTE FUNCTION track_item_ids()",
+]
+
+
+def upgrade() -> None:
+    op.create_table('item_ids',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(TRACK_FUNCTION)
+    # Writers wait until the existing ids are copied, so none is missed. Fails
+    # if an id is already used twice; such duplicates need fixing first.
+    op.execute("LOCK TABLE items IN SHARE MODE")
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+    op.execute("INSERT INTO item_ids (id, created_at) SELECT id, created_at FROM items")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER items_ids_truncate ON items")
+    op.execute("DROP TRIGGER items_ids_delete ON items")
+    op.execute("DROP TRIGGER items_ids_insert ON items")
+    op.execute("DROP FUNCTION track_item_ids()")
+    op.drop_table('item_ids')
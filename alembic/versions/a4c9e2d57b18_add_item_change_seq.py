@@ -0,0 +1,26 @@
+"""add item change sequence
+
+Revision ID: a4c9e2d57b18
+Revises: f3b8d72a9e14
+Create Date: 2026-10-17 09:12:44.208316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2d57b18'
+down_revision: Union[str, None] = 'f3b8d72a9e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('item_change_seq')))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('item_change_seq')))
@@ -0,0 +1,84 @@
+"""add items search
+
+Revision ID: b27e9f04c3d1
+Revises: 8c4d2b61e5a7
+Create Date: 2026-10-17 05:02:47.193562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b27e9f04c3d1'
+down_revision: Union[str, None] = '8c4d2b61e5a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites the table under an exclusive
+    # lock; run this in a maintenance window on large tables.
+    op.add_column(
+        'items',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    # Trigram matching for fuzzy search is only set up when pg_trgm can be
+    # installed; without it, fuzzy searches answer 501.
+    op.execute(
+        "DO $$ BEGIN "
+        "IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') "
+        "THEN CREATE EXTENSION IF NOT EXISTS pg_trgm; END IF; "
+        "END $$"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_search_vector',
+            'items',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+        has_trigram = op.get_bind().execute(
+            sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).scalar()
+        if has_trigram:
+            op.create_index(
+                'ix_items_name_trgm',
+                'items',
+                ['name'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={'name': 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_items_name_trgm',
+            table_name='items',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_items_search_vector',
+            table_name='items',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('items', 'search_vector')
@@ -0,0 +1,148 @@
+"""partition items by created_at
+
+Revision ID: c8e1f5a2d934
+Revises: a4c9e2d57b18
+Create Date: 2026-10-17 10:41:07.652390
+
+"""
+from datetime import UTC, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f5a2d934'
+down_revision: Union[str, None] = 'a4c9e2d57b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+NAME_C = sa.text('name COLLATE "C"')
+VERSION = sa.text('coalesce(updated_at, created_at)')
+COLUMNS = 'id, name, description, is_active, created_at, updated_at'
+
+# name, columns, partial index predicate
+INDEXES = [
+    ('ix_items_id', ['id'], None),
+    ('ix_items_name', ['name'], None),
+    ('ix_items_created_at_id', ['created_at', 'id'], None),
+    ('ix_items_name_c_id', [NAME_C, 'id'], None),
+    ('ix_items_version_id', [VERSION, 'id'], None),
+    ('ix_items_active_created_at_id', ['created_at', 'id'], sa.text('is_active')),
+    ('ix_items_active_name_c_id', [NAME_C, 'id'], sa.text('is_active')),
+    ('ix_items_active_version_id', [VERSION, 'id'], sa.text('is_active')),
+]
+
+TRIGGERS = [
+    "CREATE TRIGGER items_collection_version_insert AFTER INSERT ON items "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()",
+    "CREATE TRIGGER items_collection_version_delete AFTER DELETE ON items "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()",
+    "CREATE TRIGGER items_collection_version AFTER UPDATE OR TRUNCATE ON items "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()",
+]
+
+# Monthly partitions created ahead of the current month.
+PARTITIONS_AHEAD = 3
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.astimezone(UTC).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _create_table(name: str, partitioned: bool) -> None:
+    op.create_table(name,
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=not partitioned),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True),
+    postgresql_partition_by='RANGE (created_at)' if partitioned else None,
+    )
+
+
+def _finish_items_table(primary_key: list) -> None:
+    """Recreate the keys, indexes and triggers of a rebuilt items table."""
+    op.create_primary_key('items_pkey', 'items', primary_key)
+    for name, columns, where in INDEXES:
+        op.create_index(name, 'items', columns, unique=False, postgresql_where=where)
+    op.create_index(
+        'ix_items_search_vector',
+        'items',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+    has_trigram = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).scalar()
+    if has_trigram:
+        op.create_index(
+            'ix_items_name_trgm',
+            'items',
+            ['name'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+        )
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+    # The rows are unchanged, but list ETags must not survive the rebuild.
+    op.execute(
+        "UPDATE collection_versions SET version = version + 1 WHERE name = 'items'"
+    )
+
+
+def upgrade() -> None:
+    # The table is copied into a partitioned one under an exclusive lock;
+    # run this in a maintenance window on large tables.
+    op.execute("LOCK TABLE items IN ACCESS EXCLUSIVE MODE")
+    _create_table('items_partitioned', partitioned=True)
+    op.execute("CREATE TABLE items_default PARTITION OF items_partitioned DEFAULT")
+    first = op.get_bind().execute(sa.text("SELECT min(created_at) FROM items")).scalar()
+    current = _month_start(datetime.now(UTC))
+    month = min(_month_start(first), current) if first is not None else current
+    while month <= _add_months(current, PARTITIONS_AHEAD):
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE items_p{month:%Y_%m} PARTITION OF items_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    op.execute(
+        f"INSERT INTO items_partitioned ({COLUMNS}) "
+        "SELECT id, name, description, is_active, coalesce(created_at, now()), "
+        "updated_at FROM items"
+    )
+    op.drop_table('items')
+    op.rename_table('items_partitioned', 'items')
+    _finish_items_table(['id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.execute("LOCK TABLE items IN ACCESS EXCLUSIVE MODE")
+    _create_table('items_unpartitioned', partitioned=False)
+    op.execute(
+        f"INSERT INTO items_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM items"
+    )
+    # Drops the partitions along with the table.
+    op.drop_table('items')
+    op.rename_table('items_unpartitioned', 'items')
+    _finish_items_table(['id'])
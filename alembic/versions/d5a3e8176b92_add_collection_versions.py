@@ -0,0 +1,49 @@
+"""add collection versions
+
+Revision ID: d5a3e8176b92
+Revises: b27e9f04c3d1
+Create Date: 2026-10-17 05:41:09.662518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a3e8176b92'
+down_revision: Union[str, None] = 'b27e9f04c3d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('collection_versions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO collection_versions (name, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (name)
+            DO UPDATE SET version = collection_versions.version + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER items_collection_version "
+        "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON items "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER items_collection_version ON items")
+    op.execute("DROP FUNCTION bump_collection_version()")
+    op.drop_table('collection_versions')
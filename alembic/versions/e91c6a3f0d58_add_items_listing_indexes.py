@@ -0,0 +1,49 @@
+"""add items listing indexes
+
+Revision ID: e91c6a3f0d58
+Revises: d5a3e8176b92
+Create Date: 2026-10-17 06:12:33.804117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91c6a3f0d58'
+down_revision: Union[str, None] = 'd5a3e8176b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAME_C = sa.text('name COLLATE "C"')
+VERSION = sa.text('coalesce(updated_at, created_at)')
+
+# name, sort key expression, partial index predicate
+INDEXES = [
+    ('ix_items_name_c_id', NAME_C, None),
+    ('ix_items_version_id', VERSION, None),
+    ('ix_items_active_created_at_id', 'created_at', sa.text('is_active')),
+    ('ix_items_active_name_c_id', NAME_C, sa.text('is_active')),
+    ('ix_items_active_version_id', VERSION, sa.text('is_active')),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, sort_key, where in INDEXES:
+            op.create_index(
+                name,
+                'items',
+                [sort_key, 'id'],
+                unique=False,
+                postgresql_where=where,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='items', postgresql_concurrently=True)
@@ -0,0 +1,93 @@
+"""add items row count
+
+Revision ID: f3b8d72a9e14
+Revises: e91c6a3f0d58
+Create Date: 2026-10-17 06:48:20.531774
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d72a9e14'
+down_revision: Union[str, None] = 'e91c6a3f0d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTING_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+DECLARE
+    delta bigint := 0;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT count(*) INTO delta FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT -count(*) INTO delta FROM old_rows;
+    END IF;
+    INSERT INTO collection_versions (name, version, row_count)
+    VALUES (TG_TABLE_NAME, 1, greatest(delta, 0))
+    ON CONFLICT (name) DO UPDATE SET
+        version = collection_versions.version + 1,
+        row_count = CASE WHEN TG_OP = 'TRUNCATE' THEN 0
+            ELSE collection_versions.row_count + delta END;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO collection_versions (name, version) VALUES (TG_TABLE_NAME, 1)
+    ON CONFLICT (name)
+    DO UPDATE SET version = collection_versions.version + 1;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.add_column(
+        'collection_versions',
+        sa.Column('row_count', sa.BigInteger(), server_default='0', nullable=False),
+    )
+    op.execute(COUNTING_FUNCTION)
+    # Writers wait until the initial count is taken, so no change is missed.
+    op.execute("LOCK TABLE items IN SHARE MODE")
+    op.execute("DROP TRIGGER items_collection_version ON items")
+    op.execute(
+        "CREATE TRIGGER items_collection_version_insert AFTER INSERT ON items "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER items_collection_version_delete AFTER DELETE ON items "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER items_collection_version AFTER UPDATE OR TRUNCATE ON items "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()"
+    )
+    op.execute(
+        "INSERT INTO collection_versions (name, version, row_count) "
+        "SELECT 'items', 1, count(*) FROM items "
+        "ON CONFLICT (name) DO UPDATE SET row_count = excluded.row_count"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER items_collection_version ON items")
+    op.execute("DROP TRIGGER items_collection_version_delete ON items")
+    op.execute("DROP TRIGGER items_collection_version_insert ON items")
+    op.execute(VERSION_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER items_collection_version "
+        "AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON items "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()"
+    )
+    op.drop_column('collection_versions', 'row_count')
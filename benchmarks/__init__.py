@@ -0,0 +1,3 @@
+"""
+This package contains micro-benchmarks for performance-sensitive code paths.
+"""
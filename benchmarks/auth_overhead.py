@@ -0,0 +1,86 @@
+"""Micro-benchmark of the per-request authentication overhead.
+
+Compares a full token verification (HMAC check, JSON decode and TokenData
+construction with email validation) against the memoized hot path used by
+get_current_user, with warm token and principal caches.
+
+Usage:
+    DATABASE_URL=... python -m benchmarks.auth_overhead [--iterations N]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import jwt
+
+from src.auth.dependencies import get_current_user
+from src.auth.jwt import TokenData, create_access_token, decode_token
+from src.auth.keys import keyring
+from src.auth.principal import Principal, principal_cache
+
+
+def _report(name: str, elapsed: float, iterations: int) -> None:
+    print(f"{name:<40} {elapsed / iterations * 1e6:>10.2f} us/request")
+
+
+def bench_full_verification(token: str, iterations: int) -> float:
+    """Time an uncached verification, as done before memoization."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        key = keyring.get(jwt.get_unverified_header(token).get("kid"))
+        payload = jwt.decode(token, key.verifying_key, algorithms=[key.algorithm])
+        TokenData(email=payload["sub"])
+    return time.perf_counter() - start
+
+
+def bench_cached_verification(token: str, iterations: int) -> float:
+    """Time the memoized verification of a hot token."""
+    decode_token(token)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode_token(token)
+    return time.perf_counter() - start
+
+
+async def bench_get_current_user(token: str, iterations: int) -> float:
+    """Time the whole dependency with warm token and principal caches."""
+    email = decode_token(token).email
+    principal_cache.set(
+        email,
+        Principal(id=uuid.uuid4(), email=email, is_active=True, is_superuser=False),
+        ttl=3600,
+    )
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await get_current_user(token=token, db=None)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print per-request timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "bench@example.com"})
+    _report(
+        "full verification (before)",
+        bench_full_verification(token, args.iterations),
+        args.iterations,
+    )
+    _report(
+        "memoized verification (after)",
+        bench_cached_verification(token, args.iterations),
+        args.iterations,
+    )
+    _report(
+        "get_current_user, warm caches (after)",
+        asyncio.run(bench_get_current_user(token, args.iterations)),
+        args.iterations,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark of write-behind item creation against a commit per item.
+
+Compares creating items the way POST /api/items does, one transaction and
+commit per item, against queueing them on an ItemWriteQueue, as done for
+``Prefer: respond-async``, which writes them in batches. Requests are sent
+concurrency at a time in both cases.
+
+Usage:
+    DATABASE_URL=... python -m benchmarks.item_ingest [--items N]
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from src.database.database import AsyncSessionLocal, Base, engine
+from src.items.changes import publish_changes
+from src.items.ingest import ItemWriteQueue
+from src.items.models import Item
+from src.items.schemas import ItemCreate
+
+
+def _report(name: str, elapsed: float, count: int) -> None:
+    print(
+        f"{name:<46} {elapsed / count * 1e6:>10.1f} us/item"
+        f" {count / elapsed:>10.1f} items/s"
+    )
+
+
+async def _create_one(item: ItemCreate) -> None:
+    async with AsyncSessionLocal() as db:
+        db_item = Item(**item.model_dump(), id=uuid4())
+        db.add(db_item)
+        await publish_changes(db, "create", [db_item.id])
+        await db.commit()
+
+
+async def bench_commit_per_item(count: int, concurrency: int) -> float:
+    """Time creating every item in a transaction of its own."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(i: int) -> None:
+        async with semaphore:
+            await _create_one(ItemCreate(name=f"bench {i}"))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(create(i) for i in range(count)))
+    return time.perf_counter() - start
+
+
+async def bench_write_behind(count: int, batch_size: int) -> float:
+    """Time queueing every item until the queue has written them."""
+    write_queue = ItemWriteQueue(max_size=count, batch_size=batch_size)
+    start = time.perf_counter()
+    for i in range(count):
+        write_queue.submit(ItemCreate(name=f"bench {i}"))
+    await write_queue.close()
+    return time.perf_counter() - start
+
+
+async def run(count: int, concurrency: int, batch_size: int) -> None:
+    """Run both benchmarks."""
+    engine.echo = False  # SQL logging would dominate the timings
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # Warm up the connection pool and statement caches.
+    await bench_commit_per_item(concurrency, concurrency)
+    await bench_write_behind(batch_size, batch_size)
+
+    _report(
+        f"commit per item, concurrency={concurrency} (before)",
+        await bench_commit_per_item(count, concurrency),
+        count,
+    )
+    _report(
+        f"write-behind, batch_size={batch_size} (after)",
+        await bench_write_behind(count, batch_size),
+        count,
+    )
+    await engine.dispose()
+
+
+def main() -> None:
+    """Run the benchmark and print per-item timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.concurrency, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark of serializing item list pages from rows instead of ORM objects.
+
+Compares the previous read path (ORM select, then the ItemPage response
+model validating and encoding the page, as FastAPI does for a returned dict)
+against the Core select serialized through a precompiled TypeAdapter used by
+the item routes, for a page of limit items.
+
+Usage:
+    DATABASE_URL=... python -m benchmarks.item_listing [--iterations N]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+
+from src.database.database import AsyncSessionLocal, Base, engine
+from src.items.models import Item
+from src.items.pagination import encode_cursor, paginate, sort_columns
+from src.items.projection import item_page_adapter, project, projection_columns
+from src.items.schemas import ItemPage
+
+
+def _report(name: str, elapsed: float, iterations: int) -> None:
+    print(
+        f"{name:<46} {elapsed / iterations * 1e3:>10.3f} ms/page"
+        f" {iterations / elapsed:>10.1f} pages/s"
+    )
+
+
+async def _create_items(count: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(Item),
+            [
+                {"name": f"bench {i}", "description": f"description {i}"}
+                for i in range(count)
+            ],
+        )
+        await db.commit()
+
+
+async def bench_orm(limit: int, iterations: int) -> float:
+    """Time the previous read path."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(paginate(select(Item), None, limit))
+            items = result.scalars().all()
+            next_cursor = None
+            if len(items) > limit:
+                last = items[limit - 1]
+                next_cursor = encode_cursor(
+                    {"created_at": last.created_at, "id": last.id}
+                )
+            page = ItemPage.model_validate(
+                {"items": items[:limit], "next_cursor": next_cursor},
+                from_attributes=True,
+            )
+            json.dumps(jsonable_encoder(page.model_dump())).encode()
+    return time.perf_counter() - start
+
+
+async def bench_rows(limit: int, iterations: int) -> float:
+    """Time the Core select serialized through the TypeAdapter."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        async with AsyncSessionLocal() as db:
+            columns = projection_columns(None, *sort_columns("created_at"))
+            result = await db.execute(paginate(select(*columns), None, limit))
+            rows = result.mappings().all()
+            next_cursor = None
+            if len(rows) > limit:
+                next_cursor = encode_cursor(rows[limit - 1])
+            item_page_adapter.dump_json(
+                {
+                    "items": [project(row, None) for row in rows[:limit]],
+                    "next_cursor": next_cursor,
+                    "total": None,
+                    "total_mode": None,
+                }
+            )
+    return time.perf_counter() - start
+
+
+async def run(iterations: int, limits: list) -> None:
+    """Run every benchmark for every page size."""
+    engine.echo = False  # SQL logging would dominate the timings
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await _create_items(max(limits) + 1)
+
+    # Warm up the connection pool and statement caches.
+    await bench_rows(max(limits), 5)
+    await bench_orm(max(limits), 5)
+
+    for limit in limits:
+        for name, bench in (
+            (f"ORM + response model, limit={limit} (before)", bench_orm),
+            (f"rows + TypeAdapter, limit={limit} (after)", bench_rows),
+        ):
+            _report(name, await bench(limit, iterations), iterations)
+    await engine.dispose()
+
+
+def main() -> None:
+    """Run the benchmark and print per-page timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limits", default="100,1000")
+    args = parser.parse_args()
+    limits = [int(limit) for limit in args.limits.split(",")]
+    asyncio.run(run(args.iterations, limits))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark of single-statement item updates and deletes.
+
+Compares the previous select-then-mutate flow (SELECT, ORM change, COMMIT,
+refresh) against the single UPDATE/DELETE ... RETURNING statements used by
+the item routes. Each call is a transaction of its own, as in the routes.
+
+Usage:
+    DATABASE_URL=... python -m benchmarks.item_mutations [--iterations N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, func, insert, select, update
+
+from src.database.database import AsyncSessionLocal, Base, engine
+from src.items.models import Item
+
+
+def _report(name: str, elapsed: float, iterations: int) -> None:
+    print(f"{name:<40} {elapsed / iterations * 1e3:>10.3f} ms/call")
+
+
+async def _create_items(count: int) -> list:
+    async with AsyncSessionLocal() as db:
+        result = await db.scalars(
+            insert(Item).returning(Item.id),
+            [{"name": f"bench {i}"} for i in range(count)],
+        )
+        ids = result.all()
+        await db.commit()
+    return ids
+
+
+async def bench_select_then_update(ids: list) -> float:
+    """Time the previous update flow."""
+    start = time.perf_counter()
+    for item_id in ids:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Item).where(Item.id == item_id))
+            db_item = result.scalar_one_or_none()
+            db_item.name = "updated"
+            await db.commit()
+            await db.refresh(db_item)
+    return time.perf_counter() - start
+
+
+async def bench_update_returning(ids: list) -> float:
+    """Time the single-statement update."""
+    start = time.perf_counter()
+    for item_id in ids:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Item)
+                .where(Item.id == item_id)
+                .values(name="updated", updated_at=func.now())
+                .returning(Item)
+                .execution_options(synchronize_session=False)
+            )
+            result.scalar_one_or_none()
+            await db.commit()
+    return time.perf_counter() - start
+
+
+async def bench_select_then_delete(ids: list) -> float:
+    """Time the previous delete flow."""
+    start = time.perf_counter()
+    for item_id in ids:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Item).where(Item.id == item_id))
+            await db.delete(result.scalar_one_or_none())
+            await db.commit()
+    return time.perf_counter() - start
+
+
+async def bench_delete_returning(ids: list) -> float:
+    """Time the single-statement delete."""
+    start = time.perf_counter()
+    for item_id in ids:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(Item)
+                .where(Item.id == item_id)
+                .returning(Item)
+                .execution_options(synchronize_session=False)
+            )
+            result.scalar_one_or_none()
+            await db.commit()
+    return time.perf_counter() - start
+
+
+async def run(iterations: int) -> None:
+    """Run every benchmark on freshly created items."""
+    engine.echo = False  # SQL logging would dominate the timings
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    ids = await _create_items(iterations * 2)
+    before, after = ids[:iterations], ids[iterations:]
+
+    # Warm up the connection pool and statement caches.
+    await bench_update_returning(after[:10])
+
+    for name, bench, item_ids in (
+        ("select + update + refresh (before)", bench_select_then_update, before),
+        ("UPDATE ... RETURNING (after)", bench_update_returning, after),
+        ("select + delete (before)", bench_select_then_delete, before),
+        ("DELETE ... RETURNING (after)", bench_delete_returning, after),
+    ):
+        _report(name, await bench(item_ids), iterations)
+    await engine.dispose()
+
+
+def main() -> None:
+    """Run the benchmark and print per-call timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+r"""Benchmark password hash and verify latency per scheme and cost factor.
+
+Run this on the hardware that serves logins to pick the highest cost that
+still meets the login latency objective, then set PASSWORD_HASH_SCHEMES and
+the matching PASSWORD_BCRYPT_* / PASSWORD_ARGON2_* variables.
+
+Usage:
+    DATABASE_URL=... python -m benchmarks.password_hashing \
+        --bcrypt-rounds 10,11,12,13 --argon2-time-cost 2,3 --slo-ms 250
+"""
+
+import argparse
+import statistics
+import time
+
+from passlib.exc import MissingBackendError
+
+from src.auth.hashing import build_crypt_context
+from src.core.config import (
+    PASSWORD_ARGON2_MEMORY_COST,
+    PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_ARGON2_TIME_COST,
+    PASSWORD_BCRYPT_ROUNDS,
+)
+
+PASSWORD = "correct horse battery staple"
+
+
+def _ints(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(context, iterations: int) -> tuple[list[float], list[float]]:
+    """Time hash and verify calls of a context, in milliseconds."""
+    hash_samples, verify_samples = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        hashed = context.hash(PASSWORD)
+        hash_samples.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        context.verify(PASSWORD, hashed)
+        verify_samples.append((time.perf_counter() - start) * 1000)
+    return hash_samples, verify_samples
+
+
+def configurations(args) -> list[tuple[str, dict]]:
+    """List the (label, build_crypt_context kwargs) pairs to benchmark."""
+    configs = []
+    if "bcrypt" in args.schemes:
+        for rounds in args.bcrypt_rounds:
+            configs.append((f"bcrypt rounds={rounds}", {"schemes": ["bcrypt"], "bcrypt_rounds": rounds}))
+    if "argon2" in args.schemes:
+        for time_cost in args.argon2_time_cost:
+            for memory_cost in args.argon2_memory_cost:
+                configs.append(
+                    (
+                        f"argon2 t={time_cost} m={memory_cost} p={args.argon2_parallelism}",
+                        {
+                            "schemes": ["argon2"],
+                            "argon2_time_cost": time_cost,
+                            "argon2_memory_cost": memory_cost,
+                            "argon2_parallelism": args.argon2_parallelism,
+                        },
+                    )
+                )
+    return configs
+
+
+def main() -> None:
+    """Run the benchmark and print a latency table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schemes", type=lambda v: v.split(","), default=["bcrypt", "argon2"])
+    parser.add_argument("--bcrypt-rounds", type=_ints, default=[PASSWORD_BCRYPT_ROUNDS])
+    parser.add_argument("--argon2-time-cost", type=_ints, default=[PASSWORD_ARGON2_TIME_COST])
+    parser.add_argument("--argon2-memory-cost", type=_ints, default=[PASSWORD_ARGON2_MEMORY_COST])
+    parser.add_argument("--argon2-parallelism", type=int, default=PASSWORD_ARGON2_PARALLELISM)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--slo-ms", type=float, default=250.0, help="verify p95 target")
+    args = parser.parse_args()
+
+    print(f"{'configuration':<36} {'hash p50':>10} {'verify p50':>11} {'verify p95':>11}  SLO")
+    for label, kwargs in configurations(args):
+        try:
+            hash_samples, verify_samples = measure(build_crypt_context(**kwargs), args.iterations)
+        except MissingBackendError:
+            print(f"{label:<36} skipped, backend not installed (poetry install -E argon2)")
+            continue
+        verify_p95 = _percentile(verify_samples, 0.95)
+        print(
+            f"{label:<36} {statistics.median(hash_samples):>8.1f}ms "
+            f"{statistics.median(verify_samples):>9.1f}ms {verify_p95:>9.1f}ms  "
+            f"{'ok' if verify_p95 <= args.slo_ms else 'over'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
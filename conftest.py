@@ -9,10 +9,14 @@ from typing import AsyncGenerator, Generator
 import pytest
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
+from src.auth.hashing import pwd_context
+from src.auth.models import User
+from src.auth.throttling import limiters
 from src.database.database import Base, get_db
 from src.main import app
 
@@ -29,6 +33,14 @@ def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits() -> Generator[None, None, None]:
+    """Start every test with empty login rate limit counters."""
+    yield
+    for limiter in limiters:
+        limiter.reset()
+
+
 @pytest.fixture(scope="session")
 async def test_engine():
     """Create a test database engine."""
@@ -106,6 +118,37 @@ async def authenticated_client(
         yield auth_client
 
 
+@pytest.fixture
+async def superuser_client(
+    client: AsyncClient, test_session: AsyncSession
+) -> AsyncGenerator[AsyncClient, None]:
+    """Create a test client authenticated as a superuser."""
+    email = "admin@example.com"
+    result = await test_session.execute(select(User).where(User.email == email))
+    if result.scalar_one_or_none() is None:
+        test_session.add(
+            User(
+                email=email,
+                hashed_password=pwd_context.hash("testpassword123"),
+                is_superuser=True,
+            )
+        )
+        await test_session.commit()
+
+    response = await client.post(
+        "/auth/token", data={"username": email, "password": "testpassword123"}
+    )
+    token = response.json()["access_token"]
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport,
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as admin_client:
+        yield admin_client
+
+
 @pytest.fixture
 async def test_item(authenticated_client: AsyncClient) -> dict:
     """Create a test item and return its data."""
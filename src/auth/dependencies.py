@@ -5,8 +5,9 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.jwt import verify_token
+from src.auth.jwt import decode_token
 from src.auth.models import User
+from src.auth.principal import Principal, principal_cache
 from src.database.database import get_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -14,31 +15,51 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get the current authenticated user."""
+) -> Principal:
+    """Get the current authenticated user.
+
+    Both the token verification and the principal are served from in-process
+    caches when possible, so most requests resolve the user without decoding
+    the token again or a database round trip.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        token_data = verify_token(token)
-        if token_data.email is None:
-            raise credentials_exception
+        claims = decode_token(token)
     except Exception as e:
         raise credentials_exception from e
 
-    result = await db.execute(select(User).where(User.email == token_data.email))
+    principal = principal_cache.get(claims.email)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(select(User).where(User.email == claims.email))
     user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.model_validate(user)
+    principal_cache.set(claims.email, principal)
+    return principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """Get the current active user."""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def get_current_superuser(
+    current_user: Principal = Depends(get_current_active_user),
+) -> Principal:
+    """Get the current active user, requiring superuser privileges."""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges"
+        )
+    return current_user
@@ -0,0 +1,264 @@
+"""Module for password hashing.
+
+Hashing and verifying passwords is CPU bound, so the work runs in a dedicated
+thread or process pool instead of on the event loop. Admission to the pool is
+bounded: once every worker is busy and the wait queue is full, callers get a
+503 with a Retry-After header instead of piling up behind each other.
+
+The hashing scheme and its cost factors come from the configuration. Hashes
+made with another scheme or a lower cost are upgraded after a successful
+login.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Sequence
+
+from passlib.context import CryptContext
+
+from src.core.config import (
+    PASSWORD_ARGON2_MEMORY_COST,
+    PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_ARGON2_TIME_COST,
+    PASSWORD_BCRYPT_ROUNDS,
+    PASSWORD_HASH_EXECUTOR,
+    PASSWORD_HASH_MAX_QUEUE,
+    PASSWORD_HASH_RETRY_AFTER,
+    PASSWORD_HASH_SCHEMES,
+    PASSWORD_HASH_WORKERS,
+)
+from src.core.exceptions import ServiceUnavailableException
+from src.core.metrics import metrics
+
+
+def build_crypt_context(
+    schemes: Sequence[str],
+    bcrypt_rounds: int = PASSWORD_BCRYPT_ROUNDS,
+    argon2_time_cost: int = PASSWORD_ARGON2_TIME_COST,
+    argon2_memory_cost: int = PASSWORD_ARGON2_MEMORY_COST,
+    argon2_parallelism: int = PASSWORD_ARGON2_PARALLELISM,
+) -> CryptContext:
+    """Build a passlib context hashing with the first of the given schemes.
+
+    The other schemes are deprecated, as are hashes with a lower cost than
+    configured, so needs_update flags them for rehashing.
+
+    Args:
+        schemes: Accepted schemes, e.g. ["argon2", "bcrypt"].
+        bcrypt_rounds: bcrypt log2 work factor.
+        argon2_time_cost: argon2 number of iterations.
+        argon2_memory_cost: argon2 memory in KiB.
+        argon2_parallelism: argon2 number of lanes.
+
+    Returns:
+        CryptContext: The configured context.
+    """
+    settings = {}
+    if "bcrypt" in schemes:
+        settings.update(bcrypt__rounds=bcrypt_rounds, bcrypt__min_rounds=bcrypt_rounds)
+    if "argon2" in schemes:
+        settings.update(
+            argon2__time_cost=argon2_time_cost,
+            argon2__memory_cost=argon2_memory_cost,
+            argon2__parallelism=argon2_parallelism,
+        )
+    return CryptContext(
+        schemes=list(schemes), default=schemes[0], deprecated="auto", **settings
+    )
+
+
+pwd_context = build_crypt_context(PASSWORD_HASH_SCHEMES)
+
+hash_seconds = metrics.histogram(
+    "password_hash_seconds", "Time spent hashing or verifying a password in a worker"
+)
+hash_wait_seconds = metrics.histogram(
+    "password_hash_wait_seconds", "Time a hashing job waited for a free worker"
+)
+hash_rejected = metrics.counter(
+    "password_hash_rejected_total", "Hashing jobs rejected because the queue was full"
+)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+def _verify_and_update(
+    password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def _timed(func: Callable, *args: Any) -> tuple[Any, float]:
+    """Run func in the worker and report how long the computation itself took."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class PasswordHasher:
+    """Run password hashing jobs in a bounded worker pool.
+
+    Attributes:
+        executor_type (str): Either "thread" or "process".
+        max_workers (int): Number of workers computing hashes concurrently.
+        max_queue (int): Number of jobs allowed to wait for a free worker.
+        retry_after (int): Seconds advertised to rejected clients.
+    """
+
+    def __init__(
+        self,
+        executor_type: str = "thread",
+        max_workers: int = 1,
+        max_queue: int = 0,
+        retry_after: int = 1,
+    ):
+        """Initialize the PasswordHasher."""
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor_type}")
+        self.executor_type = executor_type
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._executor: Executor | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs currently waiting for a free worker."""
+        return max(0, self.in_flight - self.max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def _run(self, func: Callable, *args: Any, admit: bool = False) -> Any:
+        if not admit and self.in_flight >= self.max_workers + self.max_queue:
+            hash_rejected.inc()
+            raise ServiceUnavailableException(
+                "Authentication service is busy, please retry later",
+                retry_after=self.retry_after,
+            )
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(
+                self._get_executor(), _timed, func, *args
+            )
+        finally:
+            self.in_flight -= 1
+        hash_seconds.observe(elapsed)
+        hash_wait_seconds.observe(max(0.0, time.perf_counter() - start - elapsed))
+        return result
+
+    async def hash(self, password: str) -> str:
+        """Hash a password.
+
+        Args:
+            password: The plain text password.
+
+        Returns:
+            str: The password hash.
+
+        Raises:
+            ServiceUnavailableException: If the hashing queue is full.
+        """
+        return await self._run(_hash, password)
+
+    async def hash_many(
+        self, passwords: Sequence[str], concurrency: Optional[int] = None
+    ) -> list[str]:
+        """Hash many passwords in parallel for batch jobs.
+
+        At most concurrency jobs are submitted at once. Unlike hash, batch
+        jobs wait for a free slot instead of being rejected by a full queue.
+
+        Args:
+            passwords: The plain text passwords.
+            concurrency: Maximum number of jobs in the pool at once, defaults
+                to the number of workers.
+
+        Returns:
+            list[str]: The hashes, in the order of the passwords.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_workers)
+
+        async def hash_one(password: str) -> str:
+            async with semaphore:
+                return await self._run(_hash, password, admit=True)
+
+        return list(await asyncio.gather(*(hash_one(p) for p in passwords)))
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against a stored hash.
+
+        Args:
+            password: The plain text password.
+            hashed_password: The stored password hash.
+
+        Returns:
+            bool: True if the password matches the hash.
+
+        Raises:
+            ServiceUnavailableException: If the hashing queue is full.
+        """
+        return await self._run(_verify, password, hashed_password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        """Verify a password and rehash it if the stored hash is outdated.
+
+        The rehash only happens when needs_update flags the stored hash, in
+        the same worker job as the verification.
+
+        Args:
+            password: The plain text password.
+            hashed_password: The stored password hash.
+
+        Returns:
+            tuple[bool, Optional[str]]: Whether the password matches, and the
+                replacement hash if the stored one should be upgraded.
+
+        Raises:
+            ServiceUnavailableException: If the hashing queue is full.
+        """
+        return await self._run(_verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Shut down the worker pool, waiting for running jobs to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=PASSWORD_HASH_EXECUTOR,
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_queue=PASSWORD_HASH_MAX_QUEUE,
+    retry_after=PASSWORD_HASH_RETRY_AFTER,
+)
+
+metrics.gauge(
+    "password_hash_queue_depth",
+    "Hashing jobs waiting for a free worker",
+    callback=lambda: password_hasher.queue_depth,
+)
+metrics.gauge(
+    "password_hash_in_flight",
+    "Hashing jobs running or waiting",
+    callback=lambda: password_hasher.in_flight,
+)
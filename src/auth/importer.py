@@ -0,0 +1,237 @@
+"""Module for bulk user import.
+
+Rows are read from an NDJSON, JSON array or CSV upload, capped in bytes and
+in rows, and processed in batches: each batch is validated, checked for
+existing emails with a single query, hashed in parallel in the password
+hashing pool and written with one multi-row ``INSERT ... ON CONFLICT DO
+NOTHING``. A result line is produced per row.
+"""
+
+import csv
+import io
+import json
+import tempfile
+import uuid
+from typing import IO, AsyncIterator, Iterator
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, EmailStr, ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import (
+    USER_IMPORT_BATCH_SIZE,
+    USER_IMPORT_HASH_CONCURRENCY,
+    USER_IMPORT_MAX_BYTES,
+    USER_IMPORT_MAX_ROWS,
+)
+from src.core.exceptions import BadRequestException
+
+from .hashing import password_hasher
+from .models import User
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+JSON_MEDIA_TYPES = ("application/json",)
+CSV_MEDIA_TYPES = ("text/csv",)
+# Uploads larger than this are spooled to disk.
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class UserImportRow(BaseModel):
+    """Pydantic model for a row of a bulk user import."""
+
+    email: EmailStr
+    password: str
+    is_active: bool = True
+    is_superuser: bool = False
+
+
+def _result(row: int, status: str, email: str | None = None, detail=None) -> bytes:
+    line = {"row": row, "status": status, "email": email}
+    if detail is not None:
+        line["detail"] = detail
+    return json.dumps(line).encode() + b"\n"
+
+
+def _payload_too_large(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail
+    )
+
+
+async def read_upload(request: Request, media_type: str) -> IO[bytes]:
+    """Copy the request body into a temporary file.
+
+    The body may have at most USER_IMPORT_MAX_BYTES bytes. NDJSON and CSV
+    bodies may also have at most USER_IMPORT_MAX_ROWS lines, besides the CSV
+    header; a JSON array is counted once it is parsed.
+
+    Returns:
+        IO[bytes]: The upload, positioned at its start.
+
+    Raises:
+        HTTPException: If the body exceeds one of the caps.
+    """
+    too_large = f"Request body must not exceed {USER_IMPORT_MAX_BYTES} bytes"
+    too_many = f"At most {USER_IMPORT_MAX_ROWS} users can be imported at once"
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > USER_IMPORT_MAX_BYTES:
+        raise _payload_too_large(too_large)
+    count_lines = media_type not in JSON_MEDIA_TYPES
+    max_lines = USER_IMPORT_MAX_ROWS + (media_type in CSV_MEDIA_TYPES)
+    upload = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    size = lines = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > USER_IMPORT_MAX_BYTES:
+                raise _payload_too_large(too_large)
+            lines += chunk.count(b"\n")
+            if count_lines and lines > max_lines:
+                raise _payload_too_large(too_many)
+            upload.write(chunk)
+    except BaseException:
+        upload.close()
+        raise
+    upload.seek(0)
+    return upload
+
+
+def read_rows(upload: IO[bytes], media_type: str) -> Iterator[tuple[int, dict | str]]:
+    """Return the (row number, parsed row or parse error) pairs of an upload.
+
+    A JSON array is parsed at once, NDJSON and CSV rows as they are read.
+
+    Raises:
+        BadRequestException: If a JSON upload is not a valid JSON array.
+        HTTPException: If a JSON array has more than USER_IMPORT_MAX_ROWS rows.
+    """
+    if media_type not in JSON_MEDIA_TYPES:
+        return _read_lines(upload, media_type in CSV_MEDIA_TYPES)
+    try:
+        rows = json.load(upload)
+    except ValueError as e:
+        raise BadRequestException("Request body is not valid JSON") from e
+    if not isinstance(rows, list):
+        raise BadRequestException("Request body must be a JSON array")
+    if len(rows) > USER_IMPORT_MAX_ROWS:
+        raise _payload_too_large(
+            f"At most {USER_IMPORT_MAX_ROWS} users can be imported at once"
+        )
+    return (
+        (number, row if isinstance(row, dict) else "Row must be a JSON object")
+        for number, row in enumerate(rows, start=1)
+    )
+
+
+def _read_lines(
+    upload: IO[bytes], csv_format: bool
+) -> Iterator[tuple[int, dict | str]]:
+    """Yield (row number, parsed row or parse error) pairs from the lines."""
+    text = io.TextIOWrapper(upload, encoding="utf-8", newline="")
+    if csv_format:
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+        return
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, f"Invalid JSON: {e.msg}"
+            continue
+        yield number, row if isinstance(row, dict) else "Row must be a JSON object"
+
+
+async def _import_batch(
+    db: AsyncSession, batch: list[tuple[int, UserImportRow]], counts: dict
+) -> AsyncIterator[bytes]:
+    emails = [user.email for _, user in batch]
+    result = await db.execute(select(User.email).where(User.email.in_(emails)))
+    existing = set(result.scalars())
+
+    new_rows = [(number, user) for number, user in batch if user.email not in existing]
+    created: set[str] = set()
+    if new_rows:
+        hashes = await password_hasher.hash_many(
+            [user.password for _, user in new_rows],
+            concurrency=USER_IMPORT_HASH_CONCURRENCY,
+        )
+        result = await db.execute(
+            insert(User)
+            .values(
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "email": user.email,
+                        "hashed_password": hashed_password,
+                        "is_active": user.is_active,
+                        "is_superuser": user.is_superuser,
+                    }
+                    for (_, user), hashed_password in zip(new_rows, hashes, strict=True)
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User.email)
+        )
+        created = set(result.scalars())
+        await db.commit()
+
+    for number, user in batch:
+        status = "created" if user.email in created else "duplicate"
+        counts[status] += 1
+        yield _result(number, status, user.email)
+
+
+async def import_users(
+    db: AsyncSession, upload: IO[bytes], rows: Iterator[tuple[int, dict | str]]
+) -> AsyncIterator[bytes]:
+    """Import users from an upload and yield an NDJSON result line per row.
+
+    Args:
+        db: A session owned by the import; it is closed when the import ends.
+        upload: The uploaded file; it is closed when the import ends.
+        rows: The rows of the upload, as returned by read_rows.
+
+    Yields:
+        bytes: One JSON line per input row, then a summary line.
+    """
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    seen: set[str] = set()
+    batch: list[tuple[int, UserImportRow]] = []
+    try:
+        for number, row in rows:
+            if isinstance(row, str):
+                counts["invalid"] += 1
+                yield _result(number, "invalid", detail=row)
+                continue
+            try:
+                user = UserImportRow.model_validate(row)
+            except ValidationError as e:
+                counts["invalid"] += 1
+                yield _result(
+                    number,
+                    "invalid",
+                    row.get("email"),
+                    e.errors(include_url=False, include_input=False),
+                )
+                continue
+            if user.email in seen:
+                counts["duplicate"] += 1
+                yield _result(number, "duplicate", user.email)
+                continue
+            seen.add(user.email)
+            batch.append((number, user))
+            if len(batch) >= USER_IMPORT_BATCH_SIZE:
+                async for line in _import_batch(db, batch, counts):
+                    yield line
+                batch = []
+        if batch:
+            async for line in _import_batch(db, batch, counts):
+                yield line
+        yield json.dumps({"summary": counts}).encode() + b"\n"
+    finally:
+        upload.close()
+        await db.close()
@@ -1,13 +1,17 @@
 """Module for JWT token handling."""
 
+import hashlib
+import time
 from datetime import UTC, datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
 
 import jwt
 from fastapi import HTTPException, status
 from pydantic import BaseModel, EmailStr
 
-from src.core.config import JWT_ALGORITHM, JWT_SECRET_KEY
+from src.auth import keys
+from src.core.cache import TTLCache
+from src.core.config import JWT_CACHE_SIZE
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
@@ -17,6 +21,7 @@ class Token(BaseModel):
 
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 
 class TokenData(BaseModel):
@@ -25,6 +30,26 @@ class TokenData(BaseModel):
     email: Optional[EmailStr] = None
 
 
+class TokenClaims(NamedTuple):
+    """Verified claims of an access token.
+
+    This is the lightweight counterpart of TokenData used on the request hot
+    path; the subject was validated when the token was issued, so it is not
+    re-validated as an email address on every request.
+
+    Attributes:
+        email (str): The token subject.
+        exp (Optional[int]): Expiration time as a Unix timestamp.
+    """
+
+    email: str
+    exp: Optional[int]
+
+
+# Verified tokens, keyed by the SHA-256 digest of the encoded token
+token_cache = TTLCache("token", maxsize=JWT_CACHE_SIZE)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a new access token.
 
@@ -41,10 +66,61 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+    key = keys.keyring.active
+    encoded_jwt = jwt.encode(
+        to_encode,
+        key.signing_key,
+        algorithm=key.algorithm,
+        headers={"kid": key.kid} if key.kid else None,
+    )
     return encoded_jwt
 
 
+def decode_token(token: str) -> TokenClaims:
+    """Verify a JWT token and return its claims.
+
+    The verification key is selected by the token's kid header. Verified
+    tokens are memoized until they expire, so a token that is reused across
+    requests is only cryptographically verified once per worker.
+
+    Args:
+        token: The token to verify.
+
+    Returns:
+        TokenClaims: The verified claims.
+
+    Raises:
+        HTTPException: If the token is invalid.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = token_cache.get(digest)
+    if claims is not None:
+        return claims
+
+    try:
+        key = keys.keyring.get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise jwt.InvalidKeyError("Unknown signing key")
+        payload = jwt.decode(token, key.verifying_key, algorithms=[key.algorithm])
+    except jwt.PyJWTError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from e
+    email = payload.get("sub")
+    if not isinstance(email, str) or not email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    claims = TokenClaims(email=email, exp=payload.get("exp"))
+    if claims.exp is not None:
+        token_cache.set(digest, claims, ttl=claims.exp - time.time())
+    return claims
+
+
 def verify_token(token: str) -> TokenData:
     """Verify and decode a JWT token.
 
@@ -58,19 +134,10 @@ def verify_token(token: str) -> TokenData:
         HTTPException: If the token is invalid.
     """
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        token_data = TokenData(email=email)
-    except jwt.PyJWTError as e:
+        return TokenData(email=decode_token(token).email)
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         ) from e
-    return token_data
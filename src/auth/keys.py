@@ -0,0 +1,143 @@
+"""Module for the JWT signing keyring.
+
+Tokens are signed with the active key of the keyring and carry its key id in
+the ``kid`` header. Verification selects the key by ``kid``, so several keys
+can be valid at once while a key is being rotated. Asymmetric keys are loaded
+from PEM files once and kept as parsed key objects; their public halves are
+published as a JWKS document so other services can verify tokens locally.
+
+Without JWT_KEYS_DIR the keyring falls back to the shared JWT_SECRET_KEY.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+from src.core.config import JWT_ACTIVE_KID, JWT_ALGORITHM, JWT_KEYS_DIR, JWT_SECRET_KEY
+
+
+class JWTKey:
+    """A key used to sign and/or verify tokens.
+
+    Attributes:
+        kid (Optional[str]): The key id, or None for the shared secret.
+        algorithm (str): The JWS algorithm of the key.
+        signing_key: The parsed private key or secret, None for verify-only keys.
+        verifying_key: The parsed public key or secret.
+    """
+
+    def __init__(self, kid: Optional[str], algorithm: str, signing_key, verifying_key):
+        """Initialize the JWTKey."""
+        self.kid = kid
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verifying_key = verifying_key
+
+    @classmethod
+    def from_pem(cls, kid: str, pem: bytes) -> "JWTKey":
+        """Load an EC P-256 or Ed25519 key from a private or public PEM.
+
+        A private key can sign and verify; a public key is verify-only, which
+        is how retired keys or keys from other instances are added.
+        """
+        if b"PRIVATE KEY" in pem:
+            signing_key = load_pem_private_key(pem, password=None)
+            verifying_key = signing_key.public_key()
+        else:
+            signing_key = None
+            verifying_key = load_pem_public_key(pem)
+
+        if isinstance(verifying_key, ec.EllipticCurvePublicKey):
+            if not isinstance(verifying_key.curve, ec.SECP256R1):
+                raise ValueError(f"Key {kid!r}: only the P-256 curve is supported")
+            algorithm = "ES256"
+        elif isinstance(verifying_key, ed25519.Ed25519PublicKey):
+            algorithm = "EdDSA"
+        else:
+            raise ValueError(f"Key {kid!r}: only EC P-256 and Ed25519 keys are supported")
+        return cls(kid, algorithm, signing_key, verifying_key)
+
+    def public_jwk(self) -> Optional[dict]:
+        """Return the public key as a JWK, or None for a shared secret."""
+        if self.algorithm == "ES256":
+            jwk = ECAlgorithm.to_jwk(self.verifying_key, as_dict=True)
+        elif self.algorithm == "EdDSA":
+            jwk = OKPAlgorithm.to_jwk(self.verifying_key, as_dict=True)
+        else:
+            return None
+        return {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+class KeyRing:
+    """The set of keys accepted for verification and the key used for signing.
+
+    Attributes:
+        active (JWTKey): The key new tokens are signed with.
+        jwks_json (bytes): The serialized JWKS document.
+        jwks_etag (str): Strong ETag of the JWKS document.
+    """
+
+    def __init__(self, keys: list[JWTKey], active_kid: Optional[str] = None):
+        """Initialize the KeyRing.
+
+        Args:
+            keys: Every key accepted for verification.
+            active_kid: Id of the signing key. May be omitted when exactly one
+                key can sign.
+
+        Raises:
+            ValueError: If the active key is missing or cannot sign.
+        """
+        self._keys: Dict[Optional[str], JWTKey] = {key.kid: key for key in keys}
+        if active_kid is None:
+            signers = [key for key in keys if key.signing_key is not None]
+            if len(signers) != 1:
+                raise ValueError("JWT_ACTIVE_KID must name the signing key")
+            active = signers[0]
+        else:
+            active = self._keys.get(active_kid)
+        if active is None or active.signing_key is None:
+            raise ValueError(f"Active key {active_kid!r} has no private key")
+        self.active = active
+
+        jwks = {"keys": [jwk for key in keys if (jwk := key.public_jwk())]}
+        self.jwks_json = json.dumps(jwks, separators=(",", ":")).encode()
+        self.jwks_etag = f'"{hashlib.sha256(self.jwks_json).hexdigest()[:32]}"'
+
+    @classmethod
+    def from_directory(cls, path: Path, active_kid: Optional[str] = None) -> "KeyRing":
+        """Load every ``<kid>.pem`` file of a directory."""
+        keys = [
+            JWTKey.from_pem(pem_file.stem, pem_file.read_bytes())
+            for pem_file in sorted(Path(path).glob("*.pem"))
+        ]
+        if not keys:
+            raise ValueError(f"No *.pem keys found in {path}")
+        return cls(keys, active_kid)
+
+    @classmethod
+    def from_secret(cls, secret: str, algorithm: str) -> "KeyRing":
+        """Create a keyring holding a single shared HMAC secret."""
+        return cls([JWTKey(None, algorithm, secret, secret)])
+
+    def get(self, kid: Optional[str]) -> Optional[JWTKey]:
+        """Return the verification key for a kid header, if it is known."""
+        return self._keys.get(kid)
+
+
+def load_keyring() -> KeyRing:
+    """Build the keyring from the configuration."""
+    if JWT_KEYS_DIR:
+        return KeyRing.from_directory(Path(JWT_KEYS_DIR), JWT_ACTIVE_KID)
+    return KeyRing.from_secret(JWT_SECRET_KEY, JWT_ALGORITHM)
+
+
+keyring = load_keyring()
@@ -1,11 +1,12 @@
-"""Module containing the User model for authentication.
+"""Module containing the models for authentication.
 
-This module defines the User model which represents the users table in the database.
+This module defines the User model which represents the users table in the database,
+and the RefreshToken model which stores issued refresh tokens.
 """
 
 import uuid
 
-from sqlalchemy import Boolean, Column, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, LargeBinary, String
 from sqlalchemy.dialects.postgresql import UUID
 
 from src.database.models import BaseModel
@@ -29,3 +30,36 @@ class User(BaseModel):
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
+
+
+class RefreshToken(BaseModel):
+    """Refresh token issued to a user.
+
+    Only the SHA-256 digest of the token is stored. Every refresh consumes the
+    token and issues its successor in the same family, so presenting a token
+    twice reveals a leaked token and revokes the whole family.
+
+    Attributes:
+        id (UUID): The unique identifier for the refresh token.
+        token_hash (bytes): SHA-256 digest of the token (unique).
+        family_id (UUID): Identifier shared by every rotation of a login session.
+        user_id (UUID): The user the token was issued to.
+        expires_at (datetime): When the token stops being accepted.
+        used_at (datetime): When the token was exchanged, if it was.
+        revoked_at (datetime): When the token was revoked, if it was.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    token_hash = Column(LargeBinary(32), unique=True, nullable=False)
+    family_id = Column(UUID(as_uuid=True), index=True, nullable=False)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,134 @@
+"""Module for caching authenticated principals.
+
+Resolving the user behind a token would otherwise cost a users lookup on every
+authenticated request. Principals are kept in a per-worker TTL+LRU cache keyed
+by token subject and are invalidated whenever the underlying user row changes.
+When PRINCIPAL_CACHE_NOTIFY is enabled, invalidations are also broadcast to the
+other workers through PostgreSQL NOTIFY.
+"""
+
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session, object_session
+
+from src.core.cache import TTLCache
+from src.core.config import (
+    PRINCIPAL_CACHE_NOTIFY,
+    PRINCIPAL_CACHE_SIZE,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+)
+from src.database.listener import listener
+
+from .models import User
+
+PRINCIPAL_INVALIDATION_CHANNEL = "principal_invalidation"
+
+
+class Principal(BaseModel):
+    """The authenticated user as seen by request handlers.
+
+    Attributes:
+        id (UUID): The unique identifier of the user.
+        email (str): The user's email address.
+        is_active (bool): Whether the user account is active.
+        is_superuser (bool): Whether the user has superuser privileges.
+    """
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: UUID
+    email: str
+    is_active: bool
+    is_superuser: bool
+
+
+principal_cache = TTLCache(
+    "principal", maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_principal(subject: str) -> None:
+    """Drop the cached principal for a token subject in this worker."""
+    principal_cache.pop(subject)
+
+
+def _on_invalidation(payload: str | None) -> None:
+    if payload is None:
+        # The LISTEN connection was re-established; anything may have changed.
+        principal_cache.clear()
+    else:
+        invalidate_principal(payload)
+
+
+async def start_invalidation_listener() -> None:
+    """Subscribe to invalidations broadcast by other workers, if enabled."""
+    if PRINCIPAL_CACHE_NOTIFY:
+        await listener.subscribe(PRINCIPAL_INVALIDATION_CHANNEL, _on_invalidation)
+
+
+# Columns copied into Principal; changing any of them makes a cached entry stale
+_PRINCIPAL_COLUMNS = ("email", "is_active", "is_superuser")
+
+
+def _stale_subjects(target: User, deleted: bool) -> set[str]:
+    attrs = inspect(target).attrs
+    if not deleted and not any(
+        attrs[name].history.has_changes() for name in _PRINCIPAL_COLUMNS
+    ):
+        return set()
+    subjects = {target.email}
+    subjects.update(email for email in attrs.email.history.deleted or () if email)
+    return subjects
+
+
+# Session.info key of the subjects to invalidate once the session commits
+_STALE_SUBJECTS = "stale_principals"
+
+
+def _invalidate(connection, target: User, deleted: bool) -> None:
+    subjects = _stale_subjects(target, deleted)
+    if not subjects:
+        return
+    # Evicting now would let a concurrent request cache the old row again
+    # before the change commits; evict after the commit instead.
+    session = object_session(target)
+    session.info.setdefault(_STALE_SUBJECTS, set()).update(subjects)
+    if PRINCIPAL_CACHE_NOTIFY:
+        for subject in subjects:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :subject)"),
+                {"channel": PRINCIPAL_INVALIDATION_CHANNEL, "subject": subject},
+            )
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target: User) -> None:
+    """Invalidate the cached principal when its columns change.
+
+    The entry is dropped once the session commits, and the NOTIFY is
+    transactional, so other workers also only drop theirs once the change is
+    committed. Bulk UPDATE statements bypass these events and must call
+    invalidate_principal themselves.
+    """
+    _invalidate(connection, target, deleted=False)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target: User) -> None:
+    """Invalidate the cached principal of a deleted user."""
+    _invalidate(connection, target, deleted=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    """Drop the cached principals of the users changed by a commit."""
+    for subject in session.info.pop(_STALE_SUBJECTS, ()):
+        invalidate_principal(subject)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    """Forget the changes of a rolled back transaction."""
+    session.info.pop(_STALE_SUBJECTS, None)
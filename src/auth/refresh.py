@@ -0,0 +1,179 @@
+"""Module for refresh token handling.
+
+Refresh tokens are opaque random strings. Only their SHA-256 digest is stored,
+which is safe for high-entropy secrets and keeps a refresh free of any
+password hashing. Tokens rotate on every use and are grouped in families, one
+family per login, so a replayed token revokes every token of its login.
+Once every token of a login expired, its rows are purged in the background.
+"""
+
+import asyncio
+import hashlib
+import logging
+import secrets
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_TOKEN_PURGE_SECONDS
+from src.database.database import AsyncSessionLocal
+
+from .models import RefreshToken, User
+
+logger = logging.getLogger(__name__)
+
+# Families deleted per transaction when purging expired tokens.
+PURGE_BATCH_SIZE = 1000
+
+
+def hash_refresh_token(token: str) -> bytes:
+    """Return the digest under which a refresh token is stored."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue_refresh_token(
+    db: AsyncSession, user_id: uuid.UUID, family_id: Optional[uuid.UUID] = None
+) -> str:
+    """Add a new refresh token to the session.
+
+    Args:
+        db: The database session. The caller commits.
+        user_id: The user the token is issued to.
+        family_id: The family to continue, or None to start a new one.
+
+    Returns:
+        str: The refresh token to hand to the client.
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            token_hash=hash_refresh_token(token),
+            family_id=family_id or uuid.uuid4(),
+            user_id=user_id,
+            expires_at=datetime.now(UTC) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+async def revoke_refresh_token_family(db: AsyncSession, family_id: uuid.UUID) -> None:
+    """Revoke every token of a family that is not revoked yet."""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(UTC))
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[User, str]:
+    """Exchange a refresh token for its successor.
+
+    The token row is locked, so concurrent exchanges of the same token cannot
+    both succeed.
+
+    Args:
+        db: The database session.
+        token: The refresh token presented by the client.
+
+    Returns:
+        tuple[User, str]: The token owner and the new refresh token.
+
+    Raises:
+        HTTPException: If the token is unknown, expired, revoked or reused.
+    """
+    result = await db.execute(
+        select(RefreshToken, User)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+        .with_for_update(of=RefreshToken)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise _invalid_refresh_token()
+    refresh_token, user = row
+
+    now = datetime.now(UTC)
+    if refresh_token.used_at is not None or refresh_token.revoked_at is not None:
+        # A consumed token was presented again: assume it leaked.
+        await revoke_refresh_token_family(db, refresh_token.family_id)
+        await db.commit()
+        raise _invalid_refresh_token()
+    if refresh_token.expires_at <= now or not user.is_active:
+        raise _invalid_refresh_token()
+
+    refresh_token.used_at = now
+    new_token = issue_refresh_token(db, user.id, refresh_token.family_id)
+    await db.commit()
+    return user, new_token
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """Revoke the family of a refresh token, ending its login session."""
+    result = await db.execute(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == hash_refresh_token(token)
+        )
+    )
+    family_id = result.scalar_one_or_none()
+    if family_id is not None:
+        await revoke_refresh_token_family(db, family_id)
+        await db.commit()
+
+
+async def purge_expired_refresh_tokens(
+    db: AsyncSession, batch_size: int = PURGE_BATCH_SIZE
+) -> int:
+    """Delete the tokens of the families whose every token expired.
+
+    Expired tokens of a family that still has an unexpired token are kept, so
+    replaying them still revokes the family. Families are deleted batch_size
+    at a time, each batch in a transaction of its own.
+
+    Returns:
+        int: The number of deleted tokens.
+    """
+    expired_families = (
+        select(RefreshToken.family_id)
+        .group_by(RefreshToken.family_id)
+        .having(func.max(RefreshToken.expires_at) <= func.now())
+        .limit(batch_size)
+    )
+    deleted = 0
+    while True:
+        result = await db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.family_id.in_(expired_families.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if not result.rowcount:
+            return deleted
+        deleted += result.rowcount
+
+
+async def purge_refresh_tokens(
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    interval: float = REFRESH_TOKEN_PURGE_SECONDS,
+) -> None:
+    """Purge expired refresh tokens every interval seconds until cancelled."""
+    while True:
+        try:
+            async with session_factory() as db:
+                deleted = await purge_expired_refresh_tokens(db)
+            if deleted:
+                logger.info("Purged %d expired refresh tokens", deleted)
+        except Exception:
+            logger.exception("Purging expired refresh tokens failed")
+        await asyncio.sleep(interval)
@@ -2,23 +2,36 @@
 
 from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.database import get_db
-
-from .dependencies import get_current_active_user
+from src.core.config import JWKS_MAX_AGE_SECONDS
+from src.database.database import get_db, streaming_session
+from src.items.etag import etag_matches
+
+from . import keys
+from .dependencies import get_current_active_user, get_current_superuser
+from .hashing import password_hasher
+from .importer import (
+    CSV_MEDIA_TYPES,
+    JSON_MEDIA_TYPES,
+    NDJSON_MEDIA_TYPES,
+    import_users,
+    read_rows,
+    read_upload,
+)
 from .jwt import ACCESS_TOKEN_EXPIRE_MINUTES, Token, create_access_token
 from .models import User
+from .principal import Principal
+from .refresh import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from .throttling import throttle_login, throttle_register
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class UserCreate(BaseModel):
     """Pydantic model for user creation."""
@@ -27,6 +40,12 @@ class UserCreate(BaseModel):
     password: str
 
 
+class RefreshRequest(BaseModel):
+    """Pydantic model for refresh token exchange and revocation."""
+
+    refresh_token: str
+
+
 class UserOut(BaseModel):
     """Pydantic model for user output."""
 
@@ -47,22 +66,34 @@ async def get_user(email: str, db: AsyncSession) -> User | None:
 
 
 async def authenticate_user(email: str, password: str, db: AsyncSession) -> User | bool:
-    """Authenticate a user by email and password."""
+    """Authenticate a user by email and password.
+
+    If the stored hash uses an outdated scheme or cost, the upgraded hash is
+    set on the user; it is saved with the caller's next commit.
+    """
     user = await get_user(email, db)
     if not user:
         return False
-    if not pwd_context.verify(password, user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(
+        password, user.hashed_password
+    )
+    if not verified:
         return False
+    if new_hash is not None:
+        user.hashed_password = new_hash
     return user
 
 
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+async def register(
+    request: Request, user_data: UserCreate, db: AsyncSession = Depends(get_db)
+):
     """Register a new user."""
+    await throttle_register(request)
     existing_user = await get_user(user_data.email, db)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(email=user_data.email, hashed_password=hashed_password)
     db.add(new_user)
     await db.commit()
@@ -72,9 +103,12 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.post("/token", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Authenticate a user and return a JWT token."""
+    """Authenticate a user and return a JWT token and a refresh token."""
+    await throttle_login(request, form_data.username)
     user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise HTTPException(
@@ -86,10 +120,99 @@ async def login(
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new access token and refresh token.
+
+    No password is checked, so this is far cheaper than logging in again.
+    Presenting an already used refresh token revokes its whole login session.
+    """
+    user, refresh_token = await rotate_refresh_token(db, request.refresh_token)
+    access_token = create_access_token(
+        data={"sub": user.email},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(request: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Revoke a refresh token and every token rotated from the same login."""
+    await revoke_refresh_token(db, request.refresh_token)
 
 
 @router.get("/me", response_model=UserOut)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
+async def read_users_me(current_user: Principal = Depends(get_current_active_user)):
     """Get information about the currently authenticated user."""
     return current_user
+
+
+@router.post("/users/import")
+async def import_users_route(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_superuser),
+):
+    """Create users in bulk from an NDJSON, JSON array or CSV upload.
+
+    Each row has an email and a password, and optionally is_active and
+    is_superuser. The response streams one NDJSON result line per row, with
+    a status of created, duplicate or invalid, followed by a summary line.
+    Uploads over USER_IMPORT_MAX_BYTES or USER_IMPORT_MAX_ROWS get a 413.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type not in NDJSON_MEDIA_TYPES + JSON_MEDIA_TYPES + CSV_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=(
+                "Upload NDJSON (application/x-ndjson), a JSON array "
+                "(application/json) or CSV (text/csv)"
+            ),
+        )
+    # The body is read completely before the response starts streaming, as
+    # the server stops delivering it once the response has begun.
+    upload = await read_upload(request, media_type)
+    try:
+        rows = read_rows(upload, media_type)
+    except HTTPException:
+        upload.close()
+        raise
+    return StreamingResponse(
+        import_users(streaming_session(db), upload, rows),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/.well-known/jwks.json")
+async def read_jwks(request: Request):
+    """Publish the public token verification keys as a JWKS document.
+
+    The document only changes when keys are rotated, so it is served from
+    memory with long-lived cache headers and supports conditional requests.
+    """
+    keyring = keys.keyring
+    headers = {
+        "Cache-Control": (
+            f"public, max-age={JWKS_MAX_AGE_SECONDS}, "
+            f"stale-while-revalidate={JWKS_MAX_AGE_SECONDS}"
+        ),
+        "ETag": keyring.jwks_etag,
+    }
+    if etag_matches(request.headers.get("if-none-match"), keyring.jwks_etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=keyring.jwks_json, media_type="application/json", headers=headers
+    )
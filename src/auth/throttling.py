@@ -0,0 +1,61 @@
+"""Module for throttling authentication attempts.
+
+Every login or registration costs a password hash, so attempts are limited
+per client IP and per account before any database query or hashing is done.
+"""
+
+from fastapi import Request
+
+from src.core.config import (
+    LOGIN_RATE_LIMIT_PER_ACCOUNT,
+    LOGIN_RATE_LIMIT_PER_IP,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_WINDOW_SECONDS,
+    REGISTER_RATE_LIMIT_PER_IP,
+)
+from src.core.ratelimit import PostgresRateLimitBackend, SlidingWindowLimiter
+
+if RATE_LIMIT_BACKEND not in ("memory", "postgres"):
+    raise ValueError(f"Unknown rate limit backend: {RATE_LIMIT_BACKEND}")
+_backend = PostgresRateLimitBackend() if RATE_LIMIT_BACKEND == "postgres" else None
+
+login_ip_limiter = SlidingWindowLimiter(
+    "login_ip",
+    LOGIN_RATE_LIMIT_PER_IP,
+    RATE_LIMIT_WINDOW_SECONDS,
+    max_keys=RATE_LIMIT_MAX_KEYS,
+    backend=_backend,
+)
+login_account_limiter = SlidingWindowLimiter(
+    "login_account",
+    LOGIN_RATE_LIMIT_PER_ACCOUNT,
+    RATE_LIMIT_WINDOW_SECONDS,
+    max_keys=RATE_LIMIT_MAX_KEYS,
+    backend=_backend,
+)
+register_ip_limiter = SlidingWindowLimiter(
+    "register_ip",
+    REGISTER_RATE_LIMIT_PER_IP,
+    RATE_LIMIT_WINDOW_SECONDS,
+    max_keys=RATE_LIMIT_MAX_KEYS,
+    backend=_backend,
+)
+
+limiters = (login_ip_limiter, login_account_limiter, register_ip_limiter)
+
+
+def client_ip(request: Request) -> str:
+    """Return the client address as seen by the ASGI server."""
+    return request.client.host if request.client else "unknown"
+
+
+async def throttle_login(request: Request, username: str) -> None:
+    """Count a login attempt against the IP and account limits."""
+    await login_ip_limiter.check(client_ip(request))
+    await login_account_limiter.check(username.strip().lower())
+
+
+async def throttle_register(request: Request) -> None:
+    """Count a registration attempt against the IP limit."""
+    await register_ip_limiter.check(client_ip(request))
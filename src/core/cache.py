@@ -0,0 +1,96 @@
+"""Module for in-process caching.
+
+This module provides a small LRU cache with time-based expiry that is used to
+keep hot, rarely changing data (such as authenticated principals) in memory.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .metrics import metrics
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A bounded LRU cache whose entries expire after a time-to-live.
+
+    The cache is not thread safe; it is meant to be used from the event loop.
+
+    Attributes:
+        maxsize (int): Maximum number of entries. A size of 0 disables the cache.
+        ttl (Optional[float]): Default time-to-live of an entry in seconds.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: Optional[float] = None):
+        """Initialize the TTLCache.
+
+        Args:
+            name: Name used as prefix of the cache metrics.
+            maxsize: Maximum number of entries.
+            ttl: Default time-to-live in seconds, or None for no expiry.
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = metrics.counter(f"{name}_cache_hits_total", f"{name} cache hits")
+        self.misses = metrics.counter(
+            f"{name}_cache_misses_total", f"{name} cache misses"
+        )
+        self.evictions = metrics.counter(
+            f"{name}_cache_evictions_total", f"{name} cache LRU evictions"
+        )
+        metrics.gauge(f"{name}_cache_size", f"{name} cache entries", callback=self.__len__)
+
+    def __len__(self) -> int:
+        """Return the number of entries, including expired ones not yet purged."""
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses.inc()
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses.inc()
+            return default
+        self._data.move_to_end(key)
+        self.hits.inc()
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl: Time-to-live of this entry in seconds. It is capped by the
+                cache-wide ttl when one is configured.
+        """
+        if self.maxsize <= 0:
+            return
+        if ttl is None:
+            ttl = self.ttl
+        elif self.ttl is not None:
+            ttl = min(ttl, self.ttl)
+        if ttl is not None and ttl <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions.inc()
+
+    def pop(self, key: Hashable) -> None:
+        """Remove an entry if it exists."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._data.clear()
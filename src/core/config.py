@@ -32,6 +32,22 @@ print(f"DATABASE_URL: {os.getenv('DATABASE_URL')}")
 print(f"DEV_DATABASE_URL: {os.getenv('DEV_DATABASE_URL')}")
 
 
+def get_bool_env(name: str, default: bool = False) -> bool:
+    """Read a boolean flag from the environment.
+
+    Args:
+        name: The environment variable name.
+        default: Value used when the variable is unset.
+
+    Returns:
+        bool: True for "1", "true", "yes" or "on" (case-insensitive).
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @lru_cache()
 def get_database_url() -> str:
     """Get the database URL from environment variables.
@@ -48,7 +64,119 @@ def get_database_url() -> str:
 
 # Export commonly used configuration
 DATABASE_URL = get_database_url()
+
+# Database engine and connection pool, per worker: connections kept open,
+# extra connections opened under load, seconds to wait for a free
+# connection, seconds after which a connection is replaced (-1 never), and
+# whether connections are checked before use. Statement cache sizes apply to
+# each connection (0 behind PgBouncer in transaction mode), and the command
+# timeout in seconds (0 for none) to each statement.
+DB_ECHO = get_bool_env("DB_ECHO")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = get_bool_env("DB_POOL_PRE_PING")
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "0"))
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your_secret_key_here")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+REFRESH_TOKEN_PURGE_SECONDS = float(os.getenv("REFRESH_TOKEN_PURGE_SECONDS", "3600"))
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+JWKS_MAX_AGE_SECONDS = int(os.getenv("JWKS_MAX_AGE_SECONDS", "300"))
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
+
+# Password hashing; the first scheme hashes new passwords, the others are
+# still accepted and upgraded on the next successful login
+PASSWORD_HASH_SCHEMES = [
+    scheme.strip()
+    for scheme in os.getenv("PASSWORD_HASH_SCHEMES", "bcrypt").split(",")
+    if scheme.strip()
+]
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "3"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "65536"))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "4"))
+
+# Password hashing worker pool
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+
+# Bulk user import
+USER_IMPORT_BATCH_SIZE = int(os.getenv("USER_IMPORT_BATCH_SIZE", "500"))
+USER_IMPORT_HASH_CONCURRENCY = int(
+    os.getenv("USER_IMPORT_HASH_CONCURRENCY", str(PASSWORD_HASH_WORKERS))
+)
+USER_IMPORT_MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", "100000"))
+USER_IMPORT_MAX_BYTES = int(os.getenv("USER_IMPORT_MAX_BYTES", "67108864"))
+
+# Authenticated principal cache
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_NOTIFY = get_bool_env("PRINCIPAL_CACHE_NOTIFY")
+
+# Login throttling, limits are attempts per window and 0 disables a limit
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+LOGIN_RATE_LIMIT_PER_IP = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "30"))
+LOGIN_RATE_LIMIT_PER_ACCOUNT = int(os.getenv("LOGIN_RATE_LIMIT_PER_ACCOUNT", "5"))
+REGISTER_RATE_LIMIT_PER_IP = int(os.getenv("REGISTER_RATE_LIMIT_PER_IP", "10"))
+
+# Bulk item endpoints
+ITEM_BULK_MAX_ITEMS = int(os.getenv("ITEM_BULK_MAX_ITEMS", "1000"))
+ITEM_BULK_MAX_BYTES = int(os.getenv("ITEM_BULK_MAX_BYTES", "4194304"))
+ITEM_BULK_CHUNK_SIZE = int(os.getenv("ITEM_BULK_CHUNK_SIZE", "5000"))
+
+# Item lookup by ids, maximum ids per request
+ITEM_LOOKUP_MAX_IDS = int(os.getenv("ITEM_LOOKUP_MAX_IDS", "1000"))
+
+# Item list totals, exact counts stop at this many rows
+ITEM_COUNT_EXACT_CAP = int(os.getenv("ITEM_COUNT_EXACT_CAP", "10000"))
+
+# Item change feed: events kept for resuming clients, events a client may
+# fall behind before it is reset, and seconds between keepalive comments
+ITEM_CHANGES_BUFFER_SIZE = int(os.getenv("ITEM_CHANGES_BUFFER_SIZE", "1000"))
+ITEM_CHANGES_QUEUE_SIZE = int(os.getenv("ITEM_CHANGES_QUEUE_SIZE", "100"))
+ITEM_CHANGES_KEEPALIVE_SECONDS = float(
+    os.getenv("ITEM_CHANGES_KEEPALIVE_SECONDS", "15")
+)
+
+# Monthly item partitions: months created ahead, months kept before a
+# partition is archived to ITEM_ARCHIVE_DIR (0 keeps all), and seconds
+# between maintenance runs
+ITEM_PARTITIONS_AHEAD = int(os.getenv("ITEM_PARTITIONS_AHEAD", "3"))
+ITEM_PARTITION_RETENTION_MONTHS = int(os.getenv("ITEM_PARTITION_RETENTION_MONTHS", "0"))
+ITEM_PARTITION_MAINTENANCE_SECONDS = float(
+    os.getenv("ITEM_PARTITION_MAINTENANCE_SECONDS", "3600")
+)
+ITEM_ARCHIVE_DIR = os.getenv("ITEM_ARCHIVE_DIR", str(PROJECT_ROOT / "archive"))
+
+# Asynchronous item creation (Prefer: respond-async): items that may wait to
+# be written, items per insert and commit, seconds a batch waits to fill up,
+# Retry-After seconds when the queue is full, and seconds items that failed
+# to be written are reported as such
+ITEM_INGEST_QUEUE_SIZE = int(os.getenv("ITEM_INGEST_QUEUE_SIZE", "10000"))
+ITEM_INGEST_BATCH_SIZE = int(os.getenv("ITEM_INGEST_BATCH_SIZE", "500"))
+ITEM_INGEST_FLUSH_SECONDS = float(os.getenv("ITEM_INGEST_FLUSH_SECONDS", "0.05"))
+ITEM_INGEST_RETRY_AFTER = int(os.getenv("ITEM_INGEST_RETRY_AFTER", "1"))
+ITEM_INGEST_FAILURE_TTL_SECONDS = float(
+    os.getenv("ITEM_INGEST_FAILURE_TTL_SECONDS", "86400")
+)
+
+# Idempotency-Key on item writes: seconds a response is kept for retries,
+# seconds between deletions of expired keys, responses cached per worker, and
+# maximum key length
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_PURGE_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_SECONDS", "60"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_KEY_MAX_LENGTH = int(os.getenv("IDEMPOTENCY_KEY_MAX_LENGTH", "255"))
+
+# Item export, rows fetched per round trip from the server-side cursor
+ITEM_EXPORT_FETCH_SIZE = int(os.getenv("ITEM_EXPORT_FETCH_SIZE", "1000"))
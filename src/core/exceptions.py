@@ -4,6 +4,8 @@ This module defines custom exception classes and exception handlers
 used throughout the application for consistent error handling.
 """
 
+from typing import Dict, Optional
+
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 
@@ -11,9 +13,19 @@ from fastapi.responses import JSONResponse
 class AppException(HTTPException):
     """Base exception class for application-specific exceptions."""
 
-    def __init__(self, status_code: int, detail: str):
+    def __init__(
+        self, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None
+    ):
         """Initialize the AppException."""
-        super().__init__(status_code=status_code, detail=detail)
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
+
+
+class BadRequestException(AppException):
+    """Exception raised for malformed client input."""
+
+    def __init__(self, detail: str):
+        """Initialize the BadRequestException."""
+        super().__init__(status_code=400, detail=detail)
 
 
 class DatabaseException(AppException):
@@ -40,11 +52,50 @@ class NotFoundException(AppException):
         super().__init__(status_code=404, detail=detail)
 
 
+class PreconditionFailedException(AppException):
+    """Exception raised when a conditional request's precondition fails."""
+
+    def __init__(self, detail: str):
+        """Initialize the PreconditionFailedException."""
+        super().__init__(status_code=412, detail=detail)
+
+
+class UnprocessableEntityException(AppException):
+    """Exception raised for well-formed requests that cannot be processed."""
+
+    def __init__(self, detail: str):
+        """Initialize the UnprocessableEntityException."""
+        super().__init__(status_code=422, detail=detail)
+
+
+class ServiceUnavailableException(AppException):
+    """Exception raised when a resource is temporarily saturated."""
+
+    def __init__(self, detail: str, retry_after: int = 1):
+        """Initialize the ServiceUnavailableException."""
+        super().__init__(
+            status_code=503, detail=detail, headers={"Retry-After": str(retry_after)}
+        )
+
+
+class TooManyRequestsException(AppException):
+    """Exception raised when a client exceeds a rate limit."""
+
+    def __init__(self, retry_after: int):
+        """Initialize the TooManyRequestsException."""
+        super().__init__(
+            status_code=429,
+            detail="Too many requests, please retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 async def app_exception_handler(request: Request, exc: AppException):
     """Handle AppExceptions and return appropriate JSON responses."""
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=exc.headers,
     )
 
 
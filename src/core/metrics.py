@@ -0,0 +1,170 @@
+"""Module for lightweight in-process application metrics.
+
+This module provides simple counters, gauges and histograms that are kept in
+memory per worker process and can be exported as a JSON snapshot through the
+internal metrics endpoint.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Sequence
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Counter:
+    """A monotonically increasing counter."""
+
+    def __init__(self, name: str, description: str = ""):
+        """Initialize the Counter."""
+        self.name = name
+        self.description = description
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        """Increment the counter by the given amount."""
+        self.value += amount
+
+    def snapshot(self) -> int:
+        """Return the current value of the counter."""
+        return self.value
+
+
+class Gauge:
+    """A value that can go up and down.
+
+    A gauge can either be set explicitly or read lazily from a callback,
+    which is useful for values owned by another object (e.g. a pool size).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        callback: Optional[Callable[[], float]] = None,
+    ):
+        """Initialize the Gauge."""
+        self.name = name
+        self.description = description
+        self.callback = callback
+        self.value = 0
+
+    def set(self, value: float) -> None:
+        """Set the gauge to the given value."""
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment the gauge by the given amount."""
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrement the gauge by the given amount."""
+        self.value -= amount
+
+    def snapshot(self) -> float:
+        """Return the current value of the gauge."""
+        if self.callback is not None:
+            return self.callback()
+        return self.value
+
+
+class Histogram:
+    """A histogram of observed values with fixed, cumulative buckets."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str = "",
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        """Initialize the Histogram."""
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self) -> dict:
+        """Return count, sum, max and cumulative bucket counts."""
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, self.counts, strict=False):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    """Registry holding every metric of the current worker process."""
+
+    def __init__(self):
+        """Initialize an empty MetricsRegistry."""
+        self._metrics: Dict[str, Counter | Gauge | Histogram] = {}
+
+    def register(self, metric):
+        """Add a metric created elsewhere, or get the one of the same name."""
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name!r} is already registered")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        """Get or create a counter."""
+        return self.register(Counter(name, description))
+
+    def gauge(
+        self,
+        name: str,
+        description: str = "",
+        callback: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        """Get or create a gauge."""
+        return self.register(Gauge(name, description, callback))
+
+    def histogram(
+        self,
+        name: str,
+        description: str = "",
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self.register(Histogram(name, description, buckets))
+
+    def snapshot(self) -> dict:
+        """Return the current value of every registered metric."""
+        return {name: metric.snapshot() for name, metric in sorted(self._metrics.items())}
+
+
+# Process-wide registry used by the application
+metrics = MetricsRegistry()
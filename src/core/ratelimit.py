@@ -0,0 +1,170 @@
+"""Module for request rate limiting.
+
+The limiter uses the sliding window counter algorithm: for every key it keeps
+the hit counts of the current and the previous fixed window and weights the
+previous one by how much of it still overlaps the sliding window. State is
+split across shards of bounded LRU dictionaries, so memory stays capped no
+matter how many distinct keys (IPs, accounts) are seen, and rejecting a
+request is a couple of dictionary operations.
+
+The in-memory state is per worker. With RATE_LIMIT_BACKEND=postgres, requests
+that pass the local check are also counted in a shared UNLOGGED table so the
+limit holds across workers.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import BigInteger, Column, Integer, String, Table, and_, delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.exceptions import TooManyRequestsException
+from src.core.metrics import metrics
+from src.database.database import Base, engine
+
+rate_limit_counters = Table(
+    "rate_limit_counters",
+    Base.metadata,
+    Column("key", String, primary_key=True),
+    Column("window", BigInteger, primary_key=True),
+    Column("count", Integer, nullable=False),
+    prefixes=["UNLOGGED"],
+)
+
+
+def _retry_after(previous: float, current: int, limit: int, elapsed: float) -> float:
+    """Fraction of a window until the weighted count drops below the limit."""
+    if current >= limit or previous <= 0:
+        # Only the next window start can bring the count down.
+        return 1.0 - elapsed
+    # previous * (1 - elapsed - t) + current < limit
+    return max(0.0, 1.0 - elapsed - (limit - current) / previous)
+
+
+class PostgresRateLimitBackend:
+    """Count hits in a shared table so limits hold across worker processes."""
+
+    def __init__(self):
+        """Initialize the PostgresRateLimitBackend."""
+        self._last_purge = 0
+
+    async def hit(self, key: str, window: int) -> tuple[int, int]:
+        """Count a hit and return the current and previous window counts."""
+        upsert = insert(rate_limit_counters).values(key=key, window=window, count=1)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=["key", "window"],
+            set_={"count": rate_limit_counters.c.count + 1},
+        )
+        previous = (
+            select(rate_limit_counters.c.count)
+            .where(
+                and_(
+                    rate_limit_counters.c.key == key,
+                    rate_limit_counters.c.window == window - 1,
+                )
+            )
+            .scalar_subquery()
+        )
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                upsert.returning(rate_limit_counters.c.count, previous)
+            )
+            current, previous_count = result.one()
+            if window > self._last_purge:
+                self._last_purge = window
+                await conn.execute(
+                    delete(rate_limit_counters).where(
+                        rate_limit_counters.c.window < window - 1
+                    )
+                )
+        return current, previous_count or 0
+
+
+class SlidingWindowLimiter:
+    """Limit hits per key within a sliding time window.
+
+    Attributes:
+        name (str): Name of the limiter, used in keys and metrics.
+        limit (int): Maximum hits per key and window. 0 disables the limiter.
+        window (float): Window length in seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        window: float,
+        max_keys: int = 100_000,
+        shards: int = 16,
+        backend: Optional[PostgresRateLimitBackend] = None,
+    ):
+        """Initialize the SlidingWindowLimiter."""
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.backend = backend
+        self._shard_size = max(1, max_keys // shards)
+        # key -> [window index, current window count, previous window count]
+        self._shards: list[OrderedDict[str, list[int]]] = [
+            OrderedDict() for _ in range(shards)
+        ]
+        self.rejected = metrics.counter(
+            f"rate_limit_{name}_rejected_total", f"Requests rejected by {name} limiter"
+        )
+
+    def _check_local(self, key: str, now: float) -> Optional[float]:
+        """Count a hit in memory; return None if allowed, else the seconds to wait."""
+        shard = self._shards[hash(key) % len(self._shards)]
+        position = now / self.window
+        window = int(position)
+        elapsed = position - window
+
+        state = shard.get(key)
+        if state is None:
+            state = [window, 0, 0]
+            shard[key] = state
+            if len(shard) > self._shard_size:
+                shard.popitem(last=False)
+        else:
+            shard.move_to_end(key)
+            if state[0] != window:
+                state[2] = state[1] if state[0] == window - 1 else 0
+                state[0], state[1] = window, 0
+
+        previous = state[2] * (1.0 - elapsed)
+        if previous + state[1] >= self.limit:
+            return _retry_after(state[2], state[1], self.limit, elapsed) * self.window
+        state[1] += 1
+        return None
+
+    async def _check_shared(self, key: str, now: float) -> Optional[float]:
+        position = now / self.window
+        window = int(position)
+        elapsed = position - window
+        current, previous = await self.backend.hit(f"{self.name}:{key}", window)
+        if previous * (1.0 - elapsed) + current > self.limit:
+            return _retry_after(previous, current, self.limit, elapsed) * self.window
+        return None
+
+    async def check(self, key: str) -> None:
+        """Count a hit for key.
+
+        Raises:
+            TooManyRequestsException: If the key exceeded the limit.
+        """
+        if self.limit <= 0:
+            return
+        now = time.time()
+        wait = self._check_local(key, now)
+        if wait is None and self.backend is not None:
+            wait = await self._check_shared(key, now)
+        if wait is not None:
+            self.rejected.inc()
+            raise TooManyRequestsException(retry_after=max(1, math.ceil(wait)))
+
+    def reset(self) -> None:
+        """Forget every key tracked in memory."""
+        for shard in self._shards:
+            shard.clear()
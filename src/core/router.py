@@ -0,0 +1,24 @@
+"""Module for internal operational routes.
+
+The routes expose worker internals and are only served to superusers.
+"""
+
+from fastapi import APIRouter
+
+from src.database.database import engine, pool_status
+
+from .metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def read_metrics():
+    """Return a snapshot of the in-process metrics of this worker."""
+    return metrics.snapshot()
+
+
+@router.get("/pool")
+async def read_pool():
+    """Return the usage of the database connection pool of this worker."""
+    return pool_status(engine.pool)
@@ -3,14 +3,133 @@ Module for database configuration and session management.
 
 This module sets up the database connection, creates the engine,
 and provides a function to get database sessions.
+
+The engine and its connection pool are configured from the environment. The
+pool records how long checkouts wait for a connection, and reports its size
+and usage through the in-process metrics, so pools can be sized per worker.
+Each pool keeps its own checkout metrics; only those of the application's
+engine are registered.
 """
 
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.config import (
+    DATABASE_URL,
+    DB_COMMAND_TIMEOUT,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+)
+from src.core.metrics import Counter, Histogram, metrics
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that times every checkout.
+
+    Attributes:
+        checkout_seconds (Histogram): Time to get a connection from the pool.
+        checkout_timeouts (Counter): Checkouts that gave up waiting.
+    """
 
-from src.core.config import DATABASE_URL
+    def __init__(self, *args, **kwargs):
+        """Initialize the InstrumentedPool."""
+        super().__init__(*args, **kwargs)
+        self.checkout_seconds = Histogram(
+            "db_pool_checkout_seconds",
+            "Time to get a pooled connection, including opening a new one",
+        )
+        self.checkout_timeouts = Counter(
+            "db_pool_checkout_timeouts_total",
+            "Checkouts that gave up after DB_POOL_TIMEOUT seconds",
+        )
+
+    def recreate(self) -> "InstrumentedPool":
+        """Return a new pool with the same settings and metrics."""
+        pool = super().recreate()
+        # The engine replaces its pool on dispose(); the metrics carry over.
+        pool.checkout_seconds = self.checkout_seconds
+        pool.checkout_timeouts = self.checkout_timeouts
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_timeouts.inc()
+            raise
+        finally:
+            self.checkout_seconds.observe(time.perf_counter() - start)
+
+
+def pool_status(pool: InstrumentedPool, max_overflow: int = DB_MAX_OVERFLOW) -> dict:
+    """
+    Describe the usage of a connection pool.
+
+    Args:
+        pool: The pool, e.g. engine.pool.
+        max_overflow: The max_overflow the pool was created with.
+
+    Returns:
+        dict: The configured size and overflow, the checked out and idle
+        connections, the current overflow and the checkout wait times.
+    """
+    return {
+        "size": pool.size(),
+        "max_overflow": max_overflow,
+        "timeout": pool.timeout(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "checkout_seconds": pool.checkout_seconds.snapshot(),
+        "checkout_timeouts": pool.checkout_timeouts.snapshot(),
+    }
+
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    poolclass=InstrumentedPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        # asyncpg's own cache and the one of SQLAlchemy's asyncpg adapter
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "command_timeout": DB_COMMAND_TIMEOUT or None,
+    },
+)
+
+metrics.register(engine.pool.checkout_seconds)
+metrics.register(engine.pool.checkout_timeouts)
+metrics.gauge(
+    "db_pool_checked_out",
+    "Pooled connections in use",
+    callback=lambda: engine.pool.checkedout(),
+)
+metrics.gauge(
+    "db_pool_idle",
+    "Pooled connections open and idle",
+    callback=lambda: engine.pool.checkedin(),
+)
+metrics.gauge(
+    "db_pool_overflow",
+    "Connections open beyond DB_POOL_SIZE",
+    callback=lambda: max(0, engine.pool.overflow()),
+)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
@@ -31,3 +150,20 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+def streaming_session(db: AsyncSession) -> AsyncSession:
+    """
+    Open a new session on the same engine as a request session.
+
+    Request-scoped sessions are closed before the body of a StreamingResponse
+    is sent, so generators feeding a streaming response must use (and close)
+    a session of their own.
+
+    Args:
+        db: The request session.
+
+    Returns:
+        AsyncSession: A new session bound to the same engine.
+    """
+    return AsyncSessionLocal(bind=db.bind)
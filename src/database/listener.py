@@ -0,0 +1,122 @@
+"""Module for receiving PostgreSQL notifications.
+
+This module keeps a single dedicated LISTEN connection per worker process and
+fans the notifications it receives out to in-process subscribers, so features
+that need cross-worker signals do not each hold their own connection.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from src.core.config import DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Called with the notification payload, or with None after a reconnect to
+# signal that notifications may have been missed.
+NotificationCallback = Callable[[Optional[str]], None]
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """Convert an SQLAlchemy database URL into a plain asyncpg DSN."""
+    url = make_url(database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class PgListener:
+    """A shared LISTEN connection dispatching notifications to callbacks."""
+
+    def __init__(self, dsn: str, reconnect_delay: float = 1.0):
+        """Initialize the PgListener."""
+        self.dsn = dsn
+        self.reconnect_delay = reconnect_delay
+        self._callbacks: Dict[str, List[NotificationCallback]] = defaultdict(list)
+        self._connection: Optional[asyncpg.Connection] = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        for callback in list(self._callbacks.get(channel, ())):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Notification callback for %s failed", channel)
+
+    def _on_termination(self, connection) -> None:
+        if self._closed or connection is not self._connection:
+            return
+        logger.warning("LISTEN connection lost, reconnecting")
+        self._connection = None
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self.dsn)
+        connection.add_termination_listener(self._on_termination)
+        for channel in self._callbacks:
+            await connection.add_listener(channel, self._dispatch)
+        self._connection = connection
+
+    async def _reconnect(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                async with self._lock:
+                    await self._connect()
+            except (OSError, asyncpg.PostgresError):
+                logger.warning("Reconnecting LISTEN connection failed, retrying")
+                continue
+            for channel, callbacks in list(self._callbacks.items()):
+                for callback in list(callbacks):
+                    try:
+                        callback(None)
+                    except Exception:
+                        logger.exception("Notification callback for %s failed", channel)
+            return
+
+    async def subscribe(self, channel: str, callback: NotificationCallback) -> None:
+        """Start delivering notifications on channel to callback.
+
+        The LISTEN connection is opened on the first subscription.
+        """
+        async with self._lock:
+            self._closed = False
+            first = not self._callbacks.get(channel)
+            self._callbacks[channel].append(callback)
+            if self._connection is None:
+                if self._reconnect_task is None or self._reconnect_task.done():
+                    await self._connect()
+            elif first:
+                await self._connection.add_listener(channel, self._dispatch)
+
+    async def unsubscribe(self, channel: str, callback: NotificationCallback) -> None:
+        """Stop delivering notifications on channel to callback."""
+        async with self._lock:
+            callbacks = self._callbacks.get(channel)
+            if not callbacks or callback not in callbacks:
+                return
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._callbacks[channel]
+                if self._connection is not None:
+                    await self._connection.remove_listener(channel, self._dispatch)
+
+    async def close(self) -> None:
+        """Close the LISTEN connection and drop every subscription."""
+        self._closed = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        async with self._lock:
+            self._callbacks.clear()
+            if self._connection is not None:
+                connection, self._connection = self._connection, None
+                await connection.close()
+
+
+listener = PgListener(asyncpg_dsn(DATABASE_URL))
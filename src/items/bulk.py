@@ -0,0 +1,206 @@
+"""Module for bulk item operations.
+
+A bulk creation body is a JSON array or an NDJSON stream of item payloads,
+capped in bytes and in rows.
+The payloads are validated together with a single TypeAdapter call and the
+valid ones are inserted with one multi-row ``INSERT ... RETURNING``.
+
+Bulk updates and deletes select items by id list or filter and run as
+set-based statements over chunks of the matching rows.
+"""
+
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+from fastapi import HTTPException, Request, status
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import CTE, ColumnElement, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import (
+    ITEM_BULK_CHUNK_SIZE,
+    ITEM_BULK_MAX_BYTES,
+    ITEM_BULK_MAX_ITEMS,
+)
+from src.core.exceptions import BadRequestException
+
+from .changes import ChangeOp, publish_bulk_change
+from .filters import item_conditions
+from .models import Item
+from .schemas import ItemCreate, ItemFilter
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
+_items_adapter = TypeAdapter(List[ItemCreate])
+
+
+def _payload_too_large(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail
+    )
+
+
+async def _body_chunks(request: Request) -> AsyncIterator[bytes]:
+    """Yield the chunks of the request body, up to ITEM_BULK_MAX_BYTES."""
+    too_large = f"Request body must not exceed {ITEM_BULK_MAX_BYTES} bytes"
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > ITEM_BULK_MAX_BYTES:
+        raise _payload_too_large(too_large)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > ITEM_BULK_MAX_BYTES:
+            raise _payload_too_large(too_large)
+        yield chunk
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a stream of chunks into lines."""
+    pending = b""
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    yield pending
+
+
+async def read_bulk_payloads(request: Request) -> List[Any]:
+    """Parse the rows of a bulk request body.
+
+    The body is read as it arrives. NDJSON rows are parsed line by line, and
+    reading stops at the first row past ITEM_BULK_MAX_ITEMS.
+
+    Raises:
+        BadRequestException: If the body is not a JSON array or valid NDJSON.
+        HTTPException: If the body exceeds ITEM_BULK_MAX_BYTES or holds more
+            than ITEM_BULK_MAX_ITEMS rows.
+    """
+    too_many = f"At most {ITEM_BULK_MAX_ITEMS} items can be created at once"
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    chunks = _body_chunks(request)
+    try:
+        if media_type in NDJSON_MEDIA_TYPES:
+            rows = []
+            async for line in _lines(chunks):
+                if not line.strip():
+                    continue
+                if len(rows) == ITEM_BULK_MAX_ITEMS:
+                    raise _payload_too_large(too_many)
+                rows.append(json.loads(line))
+        else:
+            rows = json.loads(b"".join([chunk async for chunk in chunks]))
+    except ValueError as e:
+        raise BadRequestException("Request body is not valid JSON") from e
+    finally:
+        await chunks.aclose()
+    if not isinstance(rows, list):
+        raise BadRequestException("Request body must be a JSON array or NDJSON")
+    if len(rows) > ITEM_BULK_MAX_ITEMS:
+        raise _payload_too_large(too_many)
+    return rows
+
+
+def validate_bulk_payloads(
+    rows: List[Any],
+) -> Tuple[List[Tuple[int, ItemCreate]], Dict[int, List[dict]]]:
+    """Validate every row at once.
+
+    Returns:
+        The valid items with their row index, and the validation errors of
+        the invalid rows keyed by row index.
+    """
+    try:
+        return list(enumerate(_items_adapter.validate_python(rows))), {}
+    except ValidationError as e:
+        errors: Dict[int, List[dict]] = {}
+        for error in json.loads(e.json(include_url=False, include_input=False)):
+            index, *loc = error["loc"]
+            errors.setdefault(index, []).append({**error, "loc": loc})
+    # Rows without errors are valid on their own, validate just those again.
+    valid = [
+        (index, ItemCreate.model_validate(row))
+        for index, row in enumerate(rows)
+        if index not in errors
+    ]
+    return valid, errors
+
+
+def filter_conditions(criteria: ItemFilter) -> List[ColumnElement[bool]]:
+    """Translate a bulk filter into WHERE conditions on the items table."""
+    return item_conditions(**criteria.model_dump())
+
+
+async def _run_in_chunks(
+    db: AsyncSession,
+    conditions: List[ColumnElement[bool]],
+    make_statement: Callable[[CTE], Any],
+    op: ChangeOp,
+    chunk_size: int,
+) -> int:
+    """Apply a statement to the matching items chunk by chunk.
+
+    Each chunk is the next chunk_size matching ids in id order, selected in a
+    CTE and changed by one statement in a transaction of its own, so row
+    locks are held only briefly. Walking the ids keeps every chunk an index
+    range scan and guarantees progress even when the change makes rows stop
+    matching the filter. A change event is published for every chunk.
+    """
+    affected = 0
+    last_id = None
+    while True:
+        chunk = select(Item.id).where(*conditions)
+        if last_id is not None:
+            chunk = chunk.where(Item.id > last_id)
+        chunk = chunk.order_by(Item.id).limit(chunk_size).cte("chunk")
+        result = await db.execute(
+            make_statement(chunk).execution_options(synchronize_session=False)
+        )
+        ids = result.scalars().all()
+        await publish_bulk_change(db, op, ids)
+        await db.commit()
+        affected += len(ids)
+        if len(ids) < chunk_size:
+            return affected
+        last_id = max(ids)
+
+
+async def update_items(
+    db: AsyncSession,
+    criteria: ItemFilter,
+    values: Dict[str, Any],
+    chunk_size: int = ITEM_BULK_CHUNK_SIZE,
+) -> int:
+    """Set values on every item matching criteria.
+
+    Returns:
+        int: The number of updated items.
+    """
+    return await _run_in_chunks(
+        db,
+        filter_conditions(criteria),
+        lambda chunk: update(Item)
+        .where(Item.id == chunk.c.id)
+        .values(**values, updated_at=func.now())
+        .returning(Item.id),
+        "update",
+        chunk_size,
+    )
+
+
+async def delete_items(
+    db: AsyncSession, criteria: ItemFilter, chunk_size: int = ITEM_BULK_CHUNK_SIZE
+) -> int:
+    """Delete every item matching criteria.
+
+    Returns:
+        int: The number of deleted items.
+    """
+    return await _run_in_chunks(
+        db,
+        filter_conditions(criteria),
+        lambda chunk: delete(Item)
+        .where(Item.id.in_(select(chunk.c.id)))
+        .returning(Item.id),
+        "delete",
+        chunk_size,
+    )
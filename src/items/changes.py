@@ -0,0 +1,280 @@
+"""Module for the real-time item change feed.
+
+The item write paths publish a compact event per changed item through
+PostgreSQL NOTIFY, in the transaction of the change, so events are only
+delivered once the change is committed. Each event carries a sequence
+number shared by all workers, the operation and the item id; clients fetch
+the items they care about themselves. Bulk operations publish one event per
+chunk instead, listing the ids of a small chunk and only counting those of a
+larger one, so a bulk change of millions of rows neither fills the NOTIFY
+queue nor floods the subscribers.
+
+Every worker receives the events on the shared LISTEN connection and fans
+them out to its Server-Sent Events subscribers. Each subscriber has a
+bounded queue: a client that falls behind gets a reset event, telling it to
+reload the list, instead of holding unbounded memory. The latest events are
+kept in a ring buffer, so a client reconnecting with the id of the last
+event it saw receives what it missed, or a reset if that is no longer known.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import (
+    AsyncIterator,
+    Deque,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+)
+from uuid import UUID
+
+from sqlalchemy import Sequence as DbSequence
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import (
+    ITEM_CHANGES_BUFFER_SIZE,
+    ITEM_CHANGES_KEEPALIVE_SECONDS,
+    ITEM_CHANGES_QUEUE_SIZE,
+)
+from src.core.metrics import metrics
+from src.database.database import Base
+from src.database.listener import PgListener, listener
+
+from .models import Item
+
+ITEM_CHANGES_CHANNEL = "item_changes"
+
+ChangeOp = Literal["create", "update", "delete"]
+
+# Ids listed by a bulk event; beyond this they are only counted, which keeps
+# the payload well below the 8000 byte limit of NOTIFY.
+BULK_EVENT_MAX_IDS = 100
+
+# Numbers the events across workers, so any worker can resume a client.
+item_change_seq = DbSequence("item_change_seq", metadata=Base.metadata)
+
+_NOTIFY_CHANGES = text(
+    "SELECT pg_notify(:channel, json_build_object('seq', nextval('item_change_seq'), "
+    "'op', CAST(:op AS text), 'id', id)::text) FROM unnest(:ids) AS id"
+).bindparams(bindparam("ids", type_=ARRAY(Item.id.type)))
+
+_NOTIFY_CHANGE = text(
+    "SELECT pg_notify(:channel, (jsonb_build_object('seq', nextval('item_change_seq')) "
+    "|| CAST(:change AS jsonb))::text)"
+)
+
+
+async def publish_changes(
+    db: AsyncSession, op: ChangeOp, ids: Sequence[UUID]
+) -> None:
+    """Publish a change event per item id, delivered when db commits.
+
+    All events are queued with a single statement.
+    """
+    if ids:
+        await db.execute(
+            _NOTIFY_CHANGES,
+            {"channel": ITEM_CHANGES_CHANNEL, "op": op, "ids": list(ids)},
+        )
+
+
+async def publish_bulk_change(
+    db: AsyncSession, op: ChangeOp, ids: Sequence[UUID]
+) -> None:
+    """Publish a single change event for a chunk of a bulk operation.
+
+    The event lists the ids if there are at most BULK_EVENT_MAX_IDS of them,
+    and otherwise only has their count; clients then reload the items they
+    show, as after a reset.
+    """
+    if not ids:
+        return
+    if len(ids) <= BULK_EVENT_MAX_IDS:
+        change = {"op": op, "ids": [str(item_id) for item_id in ids]}
+    else:
+        change = {"op": op, "count": len(ids)}
+    await db.execute(
+        _NOTIFY_CHANGE,
+        {"channel": ITEM_CHANGES_CHANNEL, "change": json.dumps(change)},
+    )
+
+
+class ChangeEvent(NamedTuple):
+    """A Server-Sent Event of the change feed.
+
+    Attributes:
+        id: The sequence number of the change, None for control events.
+        event: The event type, the change operation or "reset".
+        data: The JSON event data.
+    """
+
+    id: Optional[str]
+    event: str
+    data: str
+
+    def encode(self) -> bytes:
+        """Return the event in the text/event-stream format."""
+        lines = [] if self.id is None else [f"id: {self.id}"]
+        lines += [f"event: {self.event}", f"data: {self.data}", "", ""]
+        return "\n".join(lines).encode()
+
+
+# Tells the client that events were lost and its view must be reloaded.
+RESET = ChangeEvent(None, "reset", "{}")
+KEEPALIVE = b": keepalive\n\n"
+
+subscriber_overflows = metrics.counter(
+    "item_changes_overflows_total",
+    "Change feed subscribers reset because their queue was full",
+)
+
+
+class ChangeFeed:
+    """Fan out the change notifications of a channel to SSE subscribers.
+
+    Attributes:
+        channel (str): The NOTIFY channel of the events.
+        buffer_size (int): Number of recent events kept for resuming clients.
+        queue_size (int): Number of events a subscriber may fall behind.
+        listener (PgListener): The LISTEN connection delivering the events.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        buffer_size: int,
+        queue_size: int,
+        pg_listener: PgListener = listener,
+    ):
+        """Initialize the ChangeFeed."""
+        self.channel = channel
+        self.listener = pg_listener
+        self.queue_size = max(1, queue_size)
+        self._buffer: Deque[ChangeEvent] = deque(maxlen=max(1, buffer_size))
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._listening = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of connected subscribers."""
+        return len(self._subscribers)
+
+    def _put(self, queue: asyncio.Queue, event: ChangeEvent) -> None:
+        if queue.full():
+            # Replace the backlog with a reset, which supersedes all of it.
+            while not queue.empty():
+                queue.get_nowait()
+            subscriber_overflows.inc()
+            event = RESET
+        queue.put_nowait(event)
+
+    def _on_notification(self, payload: Optional[str]) -> None:
+        if payload is None:
+            # The LISTEN connection was re-established; events may be lost.
+            event = RESET
+            self._buffer.clear()
+        else:
+            change = json.loads(payload)
+            event = ChangeEvent(
+                str(change.pop("seq")),
+                change["op"],
+                json.dumps(change, separators=(",", ":")),
+            )
+            self._buffer.append(event)
+        for queue in self._subscribers:
+            self._put(queue, event)
+
+    def _since(self, last_event_id: str) -> Optional[list]:
+        """Return the buffered events after last_event_id, None if unknown."""
+        # Events are buffered in delivery order, which is commit order and
+        # may differ from sequence order; resume by position, not by number.
+        for position, event in enumerate(self._buffer):
+            if event.id == last_event_id:
+                return list(self._buffer)[position + 1 :]
+        return None
+
+    async def subscribe(self, last_event_id: Optional[str] = None) -> asyncio.Queue:
+        """Register a subscriber and return its event queue.
+
+        The channel is listened to from the first subscription on, so later
+        subscribers can resume from the buffer.
+
+        Args:
+            last_event_id: The id of the last event the client received, to
+                replay the events it missed.
+        """
+        async with self._lock:
+            if not self._listening:
+                await self.listener.subscribe(self.channel, self._on_notification)
+                self._listening = True
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if last_event_id is not None:
+            missed = self._since(last_event_id)
+            if missed is None:
+                queue.put_nowait(RESET)
+            for event in missed or ():
+                self._put(queue, event)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Remove a subscriber."""
+        self._subscribers.discard(queue)
+
+    async def stream(
+        self,
+        last_event_id: Optional[str] = None,
+        keepalive: float = ITEM_CHANGES_KEEPALIVE_SECONDS,
+    ) -> AsyncIterator[bytes]:
+        """Subscribe and yield the events as an event stream.
+
+        The subscriber is registered once the stream is iterated and removed
+        when it ends, e.g. because the client disconnected, so a response
+        that is never sent leaves no subscriber behind. A comment is sent
+        after keepalive seconds without events, so proxies keep the
+        connection open.
+
+        Args:
+            last_event_id: The id of the last event the client received, to
+                replay the events it missed.
+            keepalive: Seconds without events before a comment is sent.
+        """
+        queue = await self.subscribe(last_event_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                yield event.encode()
+        finally:
+            self.unsubscribe(queue)
+
+    async def close(self) -> None:
+        """Stop listening and drop every subscriber and buffered event."""
+        async with self._lock:
+            if self._listening:
+                await self.listener.unsubscribe(self.channel, self._on_notification)
+                self._listening = False
+        self._subscribers.clear()
+        self._buffer.clear()
+
+
+change_feed = ChangeFeed(
+    ITEM_CHANGES_CHANNEL,
+    buffer_size=ITEM_CHANGES_BUFFER_SIZE,
+    queue_size=ITEM_CHANGES_QUEUE_SIZE,
+)
+
+metrics.gauge(
+    "item_changes_subscribers",
+    "Clients connected to the item change feed",
+    callback=lambda: change_feed.subscriber_count,
+)
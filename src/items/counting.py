@@ -0,0 +1,96 @@
+"""Module for item list totals.
+
+Counting every matching row is a full scan at scale, so the list offers
+cheaper ways to get a total and reports which one it used:
+
+- exact: a real count that stops at ITEM_COUNT_EXACT_CAP rows; beyond that
+  the total is reported as capped, meaning "at least".
+- estimated: the planner's row estimate, from ``pg_class.reltuples`` of the
+  partitions for the whole table or from ``EXPLAIN`` for a filtered list.
+- cached: the row count kept by the items triggers, for the whole table.
+  Filtered lists fall back to an estimate.
+"""
+
+import json
+from typing import List, Literal, Tuple
+
+from sqlalchemy import ColumnElement, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import ITEM_COUNT_EXACT_CAP
+
+from .etag import collection_versions
+from .models import Item
+
+CountMode = Literal["exact", "estimated", "cached"]
+
+
+async def _exact_count(
+    db: AsyncSession, conditions: List[ColumnElement[bool]], cap: int
+) -> Tuple[int, str]:
+    capped = select(Item.id).where(*conditions).limit(cap + 1).subquery()
+    result = await db.execute(select(func.count()).select_from(capped))
+    total = result.scalar_one()
+    if total > cap:
+        return cap, "capped"
+    return total, "exact"
+
+
+async def _estimated_count(
+    db: AsyncSession, conditions: List[ColumnElement[bool]]
+) -> Tuple[int, str]:
+    if not conditions:
+        # reltuples is -1 until a partition was first vacuumed or analyzed.
+        result = await db.execute(
+            text(
+                "SELECT CASE WHEN bool_and(c.reltuples >= 0) "
+                "THEN sum(c.reltuples) END "
+                "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'items'::regclass"
+            )
+        )
+        reltuples = result.scalar_one()
+        if reltuples is not None:
+            return int(reltuples), "estimated"
+    conn = await db.connection()
+    compiled = select(Item.id).where(*conditions).compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"]), "estimated"
+
+
+async def _cached_count(db: AsyncSession) -> Tuple[int, str]:
+    # Shards may go negative on their own, only their sum is meaningful.
+    result = await db.execute(
+        select(func.sum(collection_versions.c.row_count)).where(
+            collection_versions.c.name == Item.__tablename__
+        )
+    )
+    return max(int(result.scalar_one() or 0), 0), "cached"
+
+
+async def count_items(
+    db: AsyncSession,
+    conditions: List[ColumnElement[bool]],
+    mode: CountMode,
+    cap: int = ITEM_COUNT_EXACT_CAP,
+) -> Tuple[int, str]:
+    """Count the items matching conditions.
+
+    Args:
+        db: The database session.
+        conditions: The list filters.
+        mode: The requested count mode.
+        cap: Row limit of exact counts.
+
+    Returns:
+        Tuple[int, str]: The total and the mode actually used.
+    """
+    if mode == "exact":
+        return await _exact_count(db, conditions, cap)
+    if mode == "cached" and not conditions:
+        return await _cached_count(db)
+    return await _estimated_count(db, conditions)
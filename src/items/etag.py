@@ -0,0 +1,181 @@
+"""Module for item ETags and conditional requests.
+
+An item's ETag is its id and the time it last changed, so it can be checked
+against the database with a lookup of two columns instead of loading and
+serializing the item.
+
+List ETags come from a per-table collection version. Statement-level
+triggers bump the version inside every transaction that writes to items, so
+the version only becomes visible together with the change. The version is
+kept in COLLECTION_VERSION_SHARDS rows per table and read as their sum; each
+transaction bumps the row picked by its transaction id, so concurrent
+writers rarely wait on each other's row until commit. The same triggers keep
+the row count of the table on those rows, from the inserted and deleted rows
+of each statement.
+"""
+
+from datetime import UTC, datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    SmallInteger,
+    String,
+    Table,
+    event,
+    func,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.database import Base
+
+from .models import Item
+
+# Rows the version and row count of a table are spread over.
+COLLECTION_VERSION_SHARDS = 16
+
+collection_versions = Table(
+    "collection_versions",
+    Base.metadata,
+    Column("name", String, primary_key=True),
+    Column("shard", SmallInteger, primary_key=True, server_default="0"),
+    Column("version", BigInteger, nullable=False),
+    Column("row_count", BigInteger, nullable=False, server_default="0"),
+)
+
+BUMP_COLLECTION_VERSION = DDL(
+    f"""
+    CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger AS $$
+    DECLARE
+        delta bigint := 0;
+    BEGIN
+        IF TG_OP = 'TRUNCATE' THEN
+            UPDATE collection_versions SET row_count = 0
+            WHERE name = TG_TABLE_NAME;
+        ELSIF TG_OP = 'INSERT' THEN
+            SELECT count(*) INTO delta FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            SELECT -count(*) INTO delta FROM old_rows;
+        END IF;
+        -- The shard is fixed per transaction, so writers never lock two
+        -- shards in opposite orders.
+        INSERT INTO collection_versions (name, shard, version, row_count)
+        VALUES (
+            TG_TABLE_NAME, txid_current() %% {COLLECTION_VERSION_SHARDS}, 1, delta
+        )
+        ON CONFLICT (name, shard) DO UPDATE SET
+            version = collection_versions.version + 1,
+            row_count = collection_versions.row_count + delta;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """
+)
+# Transition tables are only allowed on single-event triggers.
+ITEMS_VERSION_TRIGGERS = [
+    DDL(
+        "CREATE TRIGGER items_collection_version_insert AFTER INSERT ON items "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()"
+    ),
+    DDL(
+        "CREATE TRIGGER items_collection_version_delete AFTER DELETE ON items "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()"
+    ),
+    DDL(
+        "CREATE TRIGGER items_collection_version AFTER UPDATE OR TRUNCATE ON items "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_collection_version()"
+    ),
+]
+event.listen(Item.__table__, "after_create", BUMP_COLLECTION_VERSION)
+for trigger in ITEMS_VERSION_TRIGGERS:
+    event.listen(Item.__table__, "after_create", trigger)
+
+# When an item last changed; items that were never updated have no updated_at.
+item_version = func.coalesce(Item.updated_at, Item.created_at)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def item_etag(item_id: UUID, version: datetime, weak: bool = False) -> str:
+    """Return the ETag of an item version.
+
+    Partial representations of an item get weak ETags, as they are not
+    byte-identical to the full one.
+    """
+    etag = f'"{item_id.hex}-{(version - _EPOCH) // _MICROSECOND}"'
+    return f"W/{etag}" if weak else etag
+
+
+def parse_item_etag(etag: str) -> Optional[Tuple[UUID, datetime]]:
+    """Return the item id and version of an item ETag, None if malformed."""
+    try:
+        item_hex, micros = etag.strip().strip('"').split("-")
+        return UUID(hex=item_hex), _EPOCH + int(micros) * _MICROSECOND
+    except ValueError:
+        return None
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Tell whether an If-None-Match header matches an ETag.
+
+    Uses the weak comparison of If-None-Match, which ignores W/ prefixes.
+
+    Args:
+        header: The header value, a list of ETags or "*".
+        etag: The current ETag of the resource.
+    """
+    if header is None:
+        return False
+    opaque_tag = etag.removeprefix("W/")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque_tag:
+            return True
+    return False
+
+
+def if_match_versions(
+    header: Optional[str], item_id: UUID
+) -> Optional[List[datetime]]:
+    """Return the item versions an If-Match header accepts.
+
+    If-Match uses the strong comparison, so weak ETags never match.
+
+    Returns:
+        None if any version is accepted (no header or "*"), else the versions
+        of the item listed in the header, possibly none.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            continue
+        parsed = parse_item_etag(candidate)
+        if parsed is not None and parsed[0] == item_id:
+            versions.append(parsed[1])
+    return versions
+
+
+async def collection_version(db: AsyncSession, name: str) -> int:
+    """Return the current version of a collection, 0 before its first write."""
+    result = await db.execute(
+        select(func.sum(collection_versions.c.version)).where(
+            collection_versions.c.name == name
+        )
+    )
+    return int(result.scalar_one() or 0)
+
+
+def collection_etag(name: str, version: int, weak: bool = False) -> str:
+    """Return the ETag of a collection version."""
+    etag = f'"{name}-{version}"'
+    return f"W/{etag}" if weak else etag
@@ -0,0 +1,95 @@
+"""Module for streaming item exports.
+
+Exports read the items through a server-side cursor and write each fetched
+batch of rows to the response as soon as it arrives, so memory use does not
+depend on the number of items. Rows are plain column tuples; no ORM objects
+are built.
+"""
+
+import csv
+import io
+import json
+from typing import AsyncIterator, Callable, Dict, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import ITEM_EXPORT_FETCH_SIZE
+
+from .models import Item
+
+EXPORT_COLUMNS = (
+    Item.id,
+    Item.name,
+    Item.description,
+    Item.is_active,
+    Item.created_at,
+    Item.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_ndjson(rows: Sequence[Row]) -> bytes:
+    """Encode rows as NDJSON lines."""
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, map(_jsonable, row), strict=True))) + "\n"
+        for row in rows
+    ).encode()
+
+
+def encode_csv(rows: Sequence[Row]) -> bytes:
+    """Encode rows as CSV lines, without a header."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_jsonable(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def csv_header() -> bytes:
+    """Return the CSV header line of an export."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue().encode()
+
+
+EXPORT_FORMATS: Dict[str, tuple[str, Callable[[Sequence[Row]], bytes]]] = {
+    "ndjson": ("application/x-ndjson", encode_ndjson),
+    "csv": ("text/csv", encode_csv),
+}
+
+
+async def export_items(
+    db: AsyncSession, format: str, fetch_size: int = ITEM_EXPORT_FETCH_SIZE
+) -> AsyncIterator[bytes]:
+    """Stream every item in the requested format.
+
+    When the client disconnects, the response task is cancelled and leaving
+    the session block closes the cursor and its transaction.
+
+    Args:
+        db: A session owned by the export; it is closed when the export ends.
+        format: "ndjson" or "csv".
+        fetch_size: Rows fetched from the server-side cursor per round trip.
+
+    Yields:
+        bytes: The encoded rows of each fetched batch.
+    """
+    encode = EXPORT_FORMATS[format][1]
+    async with db:
+        if format == "csv":
+            yield csv_header()
+        result = await db.stream(
+            select(*EXPORT_COLUMNS)
+            .order_by(Item.created_at, Item.id)
+            .execution_options(yield_per=fetch_size)
+        )
+        async for rows in result.partitions():
+            yield encode(rows)
@@ -0,0 +1,71 @@
+"""Module for item list filters.
+
+Every filter is written so that it can be served by one of the indexes of
+the items table: the active flag as a plain boolean condition, matching the
+partial ``WHERE is_active`` indexes, and name prefixes in the "C" collation,
+matching the byte-ordered name indexes.
+"""
+
+from datetime import datetime
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, select
+
+from .etag import item_version
+from .models import Item
+from .partitions import item_ids
+
+
+def item_conditions(
+    ids: Optional[Sequence[UUID]] = None,
+    is_active: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    updated_after: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None,
+) -> List[ColumnElement[bool]]:
+    """Translate item filters into WHERE conditions.
+
+    Args:
+        ids: Only items with one of these ids.
+        is_active: Only items with this active status.
+        name_prefix: Only items whose name starts with this, case-sensitive.
+        created_after: Only items created at or after this time.
+        created_before: Only items created before this time.
+        updated_after: Only items last changed at or after this time.
+        updated_before: Only items last changed before this time.
+
+    Returns:
+        List[ColumnElement[bool]]: The conditions, all of which must hold.
+    """
+    conditions = []
+    if ids is not None:
+        conditions.append(Item.id.in_(ids))
+    if is_active is not None:
+        # Literal conditions, so the planner can use the partial indexes.
+        conditions.append(Item.is_active if is_active else ~Item.is_active)
+    if name_prefix is not None:
+        conditions.append(
+            Item.name.collate("C").startswith(name_prefix, autoescape=True)
+        )
+    if created_after is not None:
+        conditions.append(Item.created_at >= created_after)
+    if created_before is not None:
+        conditions.append(Item.created_at < created_before)
+    if updated_after is not None:
+        conditions.append(item_version >= updated_after)
+    if updated_before is not None:
+        conditions.append(item_version < updated_before)
+    return conditions
+
+
+def item_id_conditions(item_id: UUID) -> List[ColumnElement[bool]]:
+    """Translate an item id into WHERE conditions visiting one partition.
+
+    The created_at of the item is read from item_ids, so the executor skips
+    every other partition instead of probing the id index of each.
+    """
+    created_at = select(item_ids.c.created_at).where(item_ids.c.id == item_id)
+    return [Item.id == item_id, Item.created_at == created_at.scalar_subquery()]
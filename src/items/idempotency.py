@@ -0,0 +1,295 @@
+"""Module for idempotent item writes.
+
+Clients retrying a write after a timeout cannot tell whether the first attempt
+took effect. Sending the same ``Idempotency-Key`` header with every attempt
+makes the write happen at most once: the first attempt claims the key and
+stores its response in the transaction of the write, and retries are answered
+with the stored response, without running the handler or touching the items
+table.
+
+Keys are scoped to the authenticated user and stored as a hash, next to a
+hash of the request they were used with; reusing a key for a different
+request is answered with 422. A retry that arrives while the first attempt
+is still running waits on the claim and then gets its response. Stored
+responses expire after IDEMPOTENCY_TTL_SECONDS, and the most recently used
+ones are also kept in memory. Expired keys are deleted in the background,
+outside the transactions of the writes.
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Dict, NamedTuple, Optional
+
+from fastapi import Depends, Header, Request, Response
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    LargeBinary,
+    SmallInteger,
+    Table,
+    delete,
+    func,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.dependencies import get_current_active_user
+from src.auth.principal import Principal
+from src.core.cache import TTLCache
+from src.core.config import (
+    IDEMPOTENCY_CACHE_SIZE,
+    IDEMPOTENCY_KEY_MAX_LENGTH,
+    IDEMPOTENCY_PURGE_SECONDS,
+    IDEMPOTENCY_TTL_SECONDS,
+)
+from src.core.exceptions import BadRequestException, UnprocessableEntityException
+from src.database.database import AsyncSessionLocal, Base
+
+logger = logging.getLogger(__name__)
+
+idempotency_keys = Table(
+    "idempotency_keys",
+    Base.metadata,
+    Column("key_hash", LargeBinary, primary_key=True),
+    Column("request_hash", LargeBinary, nullable=False),
+    # Empty while the claiming transaction runs, so never seen by others.
+    Column("status_code", SmallInteger, nullable=True),
+    Column("body", LargeBinary, nullable=True),
+    Column("headers", JSONB, nullable=True),
+    Column("expires_at", DateTime(timezone=True), nullable=False),
+    Index("ix_idempotency_keys_expires_at", "expires_at"),
+)
+
+# Response headers replayed along with the body.
+STORED_HEADERS = ("ETag", "Location", "Preference-Applied")
+# Expired keys deleted per transaction when purging.
+PURGE_BATCH_SIZE = 1000
+
+
+class StoredResponse(NamedTuple):
+    """The response of the request that claimed an idempotency key.
+
+    Attributes:
+        request_hash: Hash of the method, path and body of the request.
+        status_code: The response status code.
+        body: The response body.
+        headers: The replayed response headers.
+    """
+
+    request_hash: bytes
+    status_code: int
+    body: bytes
+    headers: Dict[str, str]
+
+    def to_response(self) -> Response:
+        """Build the replayed response."""
+        headers = {**self.headers, "Idempotent-Replayed": "true"}
+        return Response(
+            self.body,
+            status_code=self.status_code,
+            media_type="application/json" if self.body else None,
+            headers=headers,
+        )
+
+
+class IdempotencyStore:
+    """The in-memory front and the upkeep of the idempotency_keys table.
+
+    Attributes:
+        ttl (float): Seconds a stored response is kept.
+        cache (TTLCache): The most recently used stored responses by key hash.
+    """
+
+    def __init__(self, cache_size: int, ttl: float):
+        """Initialize the IdempotencyStore."""
+        self.ttl = ttl
+        self.cache = TTLCache("idempotency", maxsize=cache_size, ttl=ttl)
+
+
+idempotency_store = IdempotencyStore(IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_TTL_SECONDS)
+
+
+class IdempotentRequest:
+    """A write request carrying an Idempotency-Key.
+
+    Attributes:
+        key_hash (bytes): Hash of the user id and the key.
+        request_hash (bytes): Hash of the method, path and body.
+        store (IdempotencyStore): Where the response is kept.
+    """
+
+    def __init__(
+        self,
+        key_hash: bytes,
+        request_hash: bytes,
+        store: IdempotencyStore = idempotency_store,
+    ):
+        """Initialize the IdempotentRequest."""
+        self.key_hash = key_hash
+        self.request_hash = request_hash
+        self.store = store
+
+    def _replay(self, stored: StoredResponse) -> Response:
+        if stored.request_hash != self.request_hash:
+            raise UnprocessableEntityException(
+                "Idempotency-Key was already used for a different request"
+            )
+        return stored.to_response()
+
+    async def claim(self, db: AsyncSession) -> Optional[Response]:
+        """Claim the key in the transaction of db, or return the stored response.
+
+        Waits while another transaction holds the claim. Once claimed, the key
+        stays claimed until db commits or rolls back.
+
+        Returns:
+            Optional[Response]: The response of an earlier request with the
+                key, None if this request claimed it.
+
+        Raises:
+            UnprocessableEntityException: If the key was used for another
+                request.
+        """
+        stored = self.store.cache.get(self.key_hash)
+        if stored is not None:
+            return self._replay(stored)
+        now = datetime.now(UTC)
+        table = idempotency_keys
+        claim = insert(table).values(
+            key_hash=self.key_hash,
+            request_hash=self.request_hash,
+            expires_at=now + timedelta(seconds=self.store.ttl),
+        )
+        # An expired key is claimed again, as if it did not exist.
+        claim = claim.on_conflict_do_update(
+            index_elements=[table.c.key_hash],
+            set_={
+                "request_hash": claim.excluded.request_hash,
+                "status_code": None,
+                "body": None,
+                "headers": None,
+                "expires_at": claim.excluded.expires_at,
+            },
+            where=table.c.expires_at <= func.now(),
+        )
+        result = await db.execute(claim.returning(table.c.key_hash))
+        if result.scalar() is not None:
+            return None
+        result = await db.execute(
+            select(
+                table.c.request_hash,
+                table.c.status_code,
+                table.c.body,
+                table.c.headers,
+                table.c.expires_at,
+            ).where(table.c.key_hash == self.key_hash)
+        )
+        row = result.one()
+        await db.rollback()
+        stored = StoredResponse(
+            row.request_hash, row.status_code, row.body, row.headers
+        )
+        self.store.cache.set(
+            self.key_hash, stored, ttl=(row.expires_at - now).total_seconds()
+        )
+        return self._replay(stored)
+
+    async def commit(self, db: AsyncSession, response: Response) -> None:
+        """Store the response of the claimed key and commit db."""
+        headers = {
+            name: response.headers[name]
+            for name in STORED_HEADERS
+            if name in response.headers
+        }
+        stored = StoredResponse(
+            self.request_hash, response.status_code, bytes(response.body), headers
+        )
+        await db.execute(
+            idempotency_keys.update()
+            .where(idempotency_keys.c.key_hash == self.key_hash)
+            .values(status_code=stored.status_code, body=stored.body, headers=headers)
+        )
+        await db.commit()
+        self.store.cache.set(self.key_hash, stored)
+
+
+async def commit_response(
+    db: AsyncSession, idempotency: Optional[IdempotentRequest], response: Response
+) -> Response:
+    """Commit db, storing the response first if the request has a key."""
+    if idempotency is None:
+        await db.commit()
+    else:
+        await idempotency.commit(db, response)
+    return response
+
+
+async def purge_expired_idempotency_keys(
+    db: AsyncSession, batch_size: int = PURGE_BATCH_SIZE
+) -> int:
+    """Delete the expired keys, batch_size at a time.
+
+    Each batch is a transaction of its own, so no lock is held on more than
+    batch_size keys at once.
+
+    Returns:
+        int: The number of deleted keys.
+    """
+    ctid = literal_column("ctid")
+    expired = (
+        select(ctid)
+        .select_from(idempotency_keys)
+        .where(idempotency_keys.c.expires_at <= func.now())
+        .limit(batch_size)
+    )
+    deleted = 0
+    while True:
+        result = await db.execute(
+            delete(idempotency_keys).where(ctid.in_(expired.scalar_subquery()))
+        )
+        await db.commit()
+        if not result.rowcount:
+            return deleted
+        deleted += result.rowcount
+
+
+async def purge_idempotency_keys(
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    interval: float = IDEMPOTENCY_PURGE_SECONDS,
+) -> None:
+    """Purge expired idempotency keys every interval seconds until cancelled."""
+    while True:
+        try:
+            async with session_factory() as db:
+                deleted = await purge_expired_idempotency_keys(db)
+            if deleted:
+                logger.info("Purged %d expired idempotency keys", deleted)
+        except Exception:
+            logger.exception("Purging expired idempotency keys failed")
+        await asyncio.sleep(interval)
+
+
+async def get_idempotency(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: Principal = Depends(get_current_active_user),
+) -> Optional[IdempotentRequest]:
+    """Provide the IdempotentRequest of a request with an Idempotency-Key."""
+    if idempotency_key is None:
+        return None
+    if not 0 < len(idempotency_key) <= IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise BadRequestException(
+            f"Idempotency-Key must have 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters"
+        )
+    key_hash = hashlib.sha256(
+        f"{current_user.id}:{idempotency_key}".encode()
+    ).digest()
+    request_hash = hashlib.sha256(
+        f"{request.method} {request.url.path}\n".encode() + await request.body()
+    ).digest()
+    return IdempotentRequest(key_hash, request_hash)
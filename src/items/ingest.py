@@ -0,0 +1,254 @@
+"""Module for asynchronous, write-behind item creation.
+
+Creating items one request and one transaction at a time costs a commit, and
+so a WAL flush, per item. Clients that send ``Prefer: respond-async`` have
+their validated items queued instead and get 202 Accepted with the id of the
+item right away. A background task writes the queue in batches, one
+multi-row INSERT and one commit per batch, once batch_size items are queued
+or flush_interval seconds after the first item of a batch arrived.
+
+A batch that keeps failing is written again one item per transaction, so a
+single bad item does not take the others down with it. Items that still
+fail are recorded in item_ingest_failures for ITEM_INGEST_FAILURE_TTL_SECONDS,
+and reading them answers 422 with the error instead of 404.
+
+The queue is bounded: when it is full, clients get a 503 with a Retry-After
+header. Queued items are written before the application shuts down, but are
+lost if the process dies first; clients needing durability on response use
+the synchronous mode.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import Column, DateTime, Index, Table, Text, delete, func, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import (
+    ITEM_INGEST_BATCH_SIZE,
+    ITEM_INGEST_FAILURE_TTL_SECONDS,
+    ITEM_INGEST_FLUSH_SECONDS,
+    ITEM_INGEST_QUEUE_SIZE,
+    ITEM_INGEST_RETRY_AFTER,
+)
+from src.core.exceptions import ServiceUnavailableException
+from src.core.metrics import metrics
+from src.database.database import AsyncSessionLocal, Base
+
+from .changes import publish_changes
+from .models import Item
+from .schemas import ItemCreate
+
+logger = logging.getLogger(__name__)
+
+# Attempts at writing a batch before its items are written one by one.
+WRITE_ATTEMPTS = 3
+
+item_ingest_failures = Table(
+    "item_ingest_failures",
+    Base.metadata,
+    Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+    Column("error", Text, nullable=False),
+    Column(
+        "failed_at", DateTime(timezone=True), nullable=False, server_default=func.now()
+    ),
+    Index("ix_item_ingest_failures_failed_at", "failed_at"),
+)
+
+batch_sizes = metrics.histogram(
+    "item_ingest_batch_size",
+    "Items written per write-behind batch",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 5000),
+)
+batch_seconds = metrics.histogram(
+    "item_ingest_batch_seconds", "Time spent inserting and committing a batch"
+)
+ingest_rejected = metrics.counter(
+    "item_ingest_rejected_total",
+    "Asynchronous creations rejected because the queue was full",
+)
+ingest_failed = metrics.counter(
+    "item_ingest_failed_total", "Queued items that could not be written"
+)
+
+
+def prefers_async(prefer: Optional[str]) -> bool:
+    """Tell whether a Prefer header asks for asynchronous processing."""
+    if not prefer:
+        return False
+    preferences = (token.split(";")[0].strip().lower() for token in prefer.split(","))
+    return "respond-async" in preferences
+
+
+class ItemWriteQueue:
+    """Queue item creations and write them in batches.
+
+    Attributes:
+        max_size (int): Number of items that may wait to be written.
+        batch_size (int): Maximum number of items written per transaction.
+        flush_interval (float): Seconds a batch waits to fill up.
+        retry_after (int): Seconds advertised to rejected clients.
+        failure_ttl (float): Seconds failed items are remembered.
+    """
+
+    def __init__(
+        self,
+        max_size: int = ITEM_INGEST_QUEUE_SIZE,
+        batch_size: int = ITEM_INGEST_BATCH_SIZE,
+        flush_interval: float = ITEM_INGEST_FLUSH_SECONDS,
+        retry_after: int = ITEM_INGEST_RETRY_AFTER,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        failure_ttl: float = ITEM_INGEST_FAILURE_TTL_SECONDS,
+    ):
+        """Initialize the ItemWriteQueue."""
+        self.max_size = max(1, max_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retry_after = retry_after
+        self.failure_ttl = failure_ttl
+        self.session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        """Number of items waiting to be written."""
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def submit(self, item: ItemCreate) -> UUID:
+        """Queue an item for creation and return its id.
+
+        Raises:
+            ServiceUnavailableException: If the queue is full or closed.
+        """
+        if self._closed:
+            raise ServiceUnavailableException(
+                "Item ingestion is shutting down", retry_after=self.retry_after
+            )
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_batches())
+        # Stamped now rather than at write time, so the item keeps the time
+        # it was accepted, and the partition it belongs to.
+        row = {**item.model_dump(), "id": uuid4(), "created_at": datetime.now(UTC)}
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            ingest_rejected.inc()
+            raise ServiceUnavailableException(
+                "Item ingestion queue is full, please retry later",
+                retry_after=self.retry_after,
+            ) from None
+        return row["id"]
+
+    async def _next_batch(self) -> List[dict]:
+        queue = self._queue
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _insert(self, rows: List[dict]) -> None:
+        async with self.session_factory() as db:
+            await db.execute(insert(Item), rows)
+            await publish_changes(db, "create", [row["id"] for row in rows])
+            await db.commit()
+
+    async def _record_failures(self, failures: Dict[UUID, str]) -> None:
+        ingest_failed.inc(len(failures))
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    postgresql.insert(item_ingest_failures).on_conflict_do_nothing(),
+                    [{"id": item_id, "error": e} for item_id, e in failures.items()],
+                )
+                expired = datetime.now(UTC) - timedelta(seconds=self.failure_ttl)
+                await db.execute(
+                    delete(item_ingest_failures).where(
+                        item_ingest_failures.c.failed_at < expired
+                    )
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Lost %d queued items that failed", len(failures))
+            return
+        logger.error("Failed to write %d queued items", len(failures))
+
+    async def _write(self, batch: List[dict]) -> None:
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            start = time.perf_counter()
+            try:
+                await self._insert(batch)
+                batch_seconds.observe(time.perf_counter() - start)
+                batch_sizes.observe(len(batch))
+                return
+            except Exception:
+                logger.warning("Writing queued items failed", exc_info=True)
+                if attempt < WRITE_ATTEMPTS:
+                    await asyncio.sleep(0.1 * 2**attempt)
+        # The batch may hold an item that can never be written; write the
+        # items one by one, so only that item fails.
+        failures = {}
+        for row in batch:
+            try:
+                await self._insert([row])
+            except Exception as e:
+                failures[row["id"]] = str(e)
+        if failures:
+            await self._record_failures(failures)
+
+    async def _write_batches(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def drain(self) -> None:
+        """Wait until every queued item was written."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Reject new items, write the queued ones and stop the writer."""
+        self._closed = True
+        if self._writer is not None and not self._writer.done():
+            await self.drain()
+            self._writer.cancel()
+        self._writer = None
+
+
+item_write_queue = ItemWriteQueue()
+
+metrics.gauge(
+    "item_ingest_queue_depth",
+    "Items queued for write-behind creation",
+    callback=lambda: item_write_queue.depth,
+)
+
+
+def get_item_write_queue() -> ItemWriteQueue:
+    """Provide the process-wide item write queue."""
+    return item_write_queue
@@ -0,0 +1,136 @@
+"""Module for batched item lookups by id.
+
+fetch_items resolves many ids with a single ``WHERE id = ANY(:ids)`` query.
+The ids travel as one array parameter, so the statement text is the same for
+any number of ids and its prepared statement is reused.
+
+ItemLoader builds on it as a DataLoader-style batching primitive: loads
+requested in the same event loop iteration, e.g. by routes or resolvers that
+each need a few items, are collected and resolved with one query, and every
+item is read at most once per loader.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Sequence, Set
+from uuid import UUID
+
+from sqlalchemy import RowMapping, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Item
+from .projection import projection_columns
+
+
+async def fetch_items(
+    db: AsyncSession, ids: Sequence[UUID], fields: Optional[Sequence[str]] = None
+) -> Dict[UUID, RowMapping]:
+    """Read the items with the given ids in one query.
+
+    Args:
+        db: The database session.
+        ids: The ids to look up; duplicates are allowed.
+        fields: The ItemOut fields to read, None for all of them.
+
+    Returns:
+        The rows of the existing items by id; missing ids have no entry.
+    """
+    if not ids:
+        return {}
+    columns = projection_columns(fields, Item.id)
+    ids_param = bindparam("ids", list(set(ids)), type_=ARRAY(Item.id.type))
+    result = await db.execute(select(*columns).where(Item.id == any_(ids_param)))
+    return {row["id"]: row for row in result.mappings()}
+
+
+class ItemLoader:
+    """Batch and cache item lookups by id for the lifetime of a session.
+
+    The loader is not thread safe; it is meant to be used from the event loop,
+    one per request.
+
+    Attributes:
+        db (AsyncSession): The session the items are read with.
+        fields (Optional[Sequence[str]]): The ItemOut fields to read.
+    """
+
+    def __init__(self, db: AsyncSession, fields: Optional[Sequence[str]] = None):
+        """Initialize the ItemLoader."""
+        self.db = db
+        self.fields = fields
+        self._rows: Dict[UUID, asyncio.Future] = {}
+        self._pending: List[UUID] = []
+        self._dispatches: Set[asyncio.Task] = set()
+        # A session runs one query at a time; batches queue up behind each other.
+        self._lock = asyncio.Lock()
+
+    def _future(self, item_id: UUID) -> asyncio.Future:
+        future = self._rows.get(item_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._rows[item_id] = future
+            if not self._pending:
+                loop.call_soon(self._schedule)
+            self._pending.append(item_id)
+        return future
+
+    async def load(self, item_id: UUID) -> Optional[RowMapping]:
+        """Return the row of an item, or None if it does not exist."""
+        return await asyncio.shield(self._future(item_id))
+
+    async def load_many(self, ids: Sequence[UUID]) -> List[Optional[RowMapping]]:
+        """Return the rows of items in the order of ids, None for missing ones."""
+        futures = [self._future(item_id) for item_id in ids]
+        return list(await asyncio.shield(asyncio.gather(*futures)))
+
+    def prime(self, item_id: UUID, row: Optional[RowMapping]) -> None:
+        """Cache a row read elsewhere, so loading it does not query again."""
+        if item_id not in self._rows:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(row)
+            self._rows[item_id] = future
+
+    def clear(self, item_id: UUID) -> None:
+        """Forget a cached item, e.g. after it was changed."""
+        future = self._rows.get(item_id)
+        if future is not None and future.done():
+            del self._rows[item_id]
+
+    def _schedule(self) -> None:
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[UUID]) -> None:
+        try:
+            async with self._lock:
+                rows = await fetch_items(self.db, batch, self.fields)
+        except Exception as e:
+            for item_id in batch:
+                self._rows.pop(item_id).set_exception(e)
+        else:
+            for item_id in batch:
+                self._rows[item_id].set_result(rows.get(item_id))
+        finally:
+            # When cancelled, cancel the waiters instead of leaving them
+            # hanging, and forget the loads so they can be retried.
+            for item_id in batch:
+                future = self._rows.get(item_id)
+                if future is not None and not future.done():
+                    del self._rows[item_id]
+                    future.cancel()
+
+    async def close(self) -> None:
+        """Cancel the loads still in flight and wait for their batches to stop."""
+        dispatches = list(self._dispatches)
+        for task in dispatches:
+            task.cancel()
+        await asyncio.gather(*dispatches, return_exceptions=True)
+        # Loads whose batch was not dispatched yet.
+        self._pending.clear()
+        for item_id, future in list(self._rows.items()):
+            if not future.done():
+                del self._rows[item_id]
+                future.cancel()
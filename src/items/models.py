@@ -5,11 +5,30 @@ This module defines the Item model which represents the items table in the datab
 
 import uuid
 
-from sqlalchemy import Boolean, Column, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    Index,
+    String,
+    Text,
+    event,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 
 from src.database.models import BaseModel
 
+from .partitions import (
+    ITEM_IDS_TRIGGERS,
+    TRACK_ITEM_IDS,
+    create_initial_partitions,
+)
+
 
 class Item(BaseModel):
     """Item model representing an item in the system.
@@ -19,11 +38,75 @@ class Item(BaseModel):
         name (str): The name of the item.
         description (str): A detailed description of the item.
         is_active (bool): Indicates whether the item is active or not.
+        search_vector (str): Generated full-text search document of the name
+            (weight A) and description (weight B). Deferred, it is only read
+            by search queries.
+
+    The table is partitioned by month of created_at (see partitions), so
+    created_at is part of the primary key; ids are kept unique by item_ids.
     """
 
     __tablename__ = "items"
+    __table_args__ = (
+        # One (sort key, id) index per sort order of the items listing, plus
+        # partial copies for the common listing of active items only.
+        Index("ix_items_created_at_id", "created_at", "id"),
+        Index("ix_items_name_c_id", text('name COLLATE "C"'), "id"),
+        Index("ix_items_version_id", text("coalesce(updated_at, created_at)"), "id"),
+        Index(
+            "ix_items_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_items_active_name_c_id",
+            text('name COLLATE "C"'),
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_items_active_version_id",
+            text("coalesce(updated_at, created_at)"),
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     name = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
+    created_at = Column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
+    )
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
+
+
+# Trigram index of fuzzy search. As in the migration, pg_trgm and the index
+# are only set up where the extension is available.
+NAME_TRIGRAM_INDEX = DDL(
+    "DO $$ BEGIN "
+    "IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') "
+    "THEN CREATE EXTENSION IF NOT EXISTS pg_trgm; "
+    "CREATE INDEX IF NOT EXISTS ix_items_name_trgm "
+    "ON items USING gin (name gin_trgm_ops); END IF; "
+    "END $$"
+)
+
+event.listen(Item.__table__, "after_create", create_initial_partitions)
+event.listen(Item.__table__, "after_create", TRACK_ITEM_IDS)
+for trigger in ITEM_IDS_TRIGGERS:
+    event.listen(Item.__table__, "after_create", trigger)
+event.listen(Item.__table__, "after_create", NAME_TRIGRAM_INDEX)
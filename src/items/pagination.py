@@ -0,0 +1,142 @@
+"""Module for keyset pagination of item listings.
+
+Pages are ordered on a whitelisted sort key plus ``id`` as tie-breaker, and
+continue after the last row of the previous page instead of skipping an
+offset. Every sort key has a matching ``(key, id)`` index, so every page
+costs the same as the first one and rows do not shift between pages when
+items are added or deleted.
+
+Cursors are opaque to clients: the sort and the sort key of the last row of
+a page, encoded as URL-safe base64 JSON.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Literal, Mapping, NamedTuple, Tuple
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, Select, tuple_
+
+from src.core.exceptions import BadRequestException
+
+from .etag import item_version
+from .models import Item
+
+ItemSort = Literal[
+    "created_at", "-created_at", "name", "-name", "updated_at", "-updated_at"
+]
+
+
+class SortKey(NamedTuple):
+    """A sort order of the items listing.
+
+    Attributes:
+        expression: The SQL expression sorted on, matching an index.
+        columns: The columns a row needs to compute its sort key.
+        value: Returns the JSON-compatible sort key of a row mapping.
+        parse: Restores a sort key read from a cursor.
+    """
+
+    expression: ColumnElement
+    columns: tuple
+    value: Callable[[Any], Any]
+    parse: Callable[[Any], Any]
+
+
+SORT_KEYS = {
+    "created_at": SortKey(
+        Item.created_at,
+        (Item.created_at,),
+        lambda row: row["created_at"].isoformat(),
+        datetime.fromisoformat,
+    ),
+    # Byte order, so the name indexes also serve name prefix filters.
+    "name": SortKey(
+        Item.name.collate("C"), (Item.name,), lambda row: row["name"], str
+    ),
+    "updated_at": SortKey(
+        item_version,
+        (Item.updated_at, Item.created_at),
+        lambda row: (row["updated_at"] or row["created_at"]).isoformat(),
+        datetime.fromisoformat,
+    ),
+}
+
+
+def encode_key(key: List[Any]) -> str:
+    """Encode a JSON-serializable sort key as an opaque cursor."""
+    data = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).rstrip(b"=").decode()
+
+
+def decode_key(cursor: str) -> List[Any]:
+    """Decode a cursor made by encode_key.
+
+    Raises:
+        BadRequestException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError) as e:
+        raise BadRequestException("Invalid cursor") from e
+    if not isinstance(key, list):
+        raise BadRequestException("Invalid cursor")
+    return key
+
+
+def sort_columns(sort: ItemSort) -> tuple:
+    """Return the columns a row needs to build a cursor for sort."""
+    return SORT_KEYS[sort.lstrip("-")].columns + (Item.id,)
+
+
+def encode_cursor(row: Mapping[str, Any], sort: ItemSort = "created_at") -> str:
+    """Encode the sort key of a row mapping as a page cursor."""
+    return encode_key([sort, SORT_KEYS[sort.lstrip("-")].value(row), str(row["id"])])
+
+
+def decode_cursor(cursor: str, sort: ItemSort = "created_at") -> Tuple[Any, UUID]:
+    """Decode a page cursor into the sort key it continues after.
+
+    Raises:
+        BadRequestException: If the cursor is malformed or was made for
+            another sort.
+    """
+    try:
+        cursor_sort, value, item_id = decode_key(cursor)
+        if cursor_sort != sort:
+            raise ValueError("The cursor belongs to another sort")
+        # Every sort key is encoded as a string, and so is the id.
+        if not isinstance(value, str) or not isinstance(item_id, str):
+            raise TypeError("The cursor holds a key of the wrong type")
+        return SORT_KEYS[sort.lstrip("-")].parse(value), UUID(item_id)
+    except (TypeError, ValueError) as e:
+        raise BadRequestException("Invalid cursor") from e
+
+
+def paginate(
+    query: Select, cursor: str | None, limit: int, sort: ItemSort = "created_at"
+) -> Select:
+    """Restrict an item query to the page following cursor.
+
+    One row more than limit is selected, which tells whether a next page
+    exists without a separate count. Pages sorted by created_at only visit
+    the partitions from the cursor on.
+    """
+    expression = SORT_KEYS[sort.lstrip("-")].expression
+    key = tuple_(expression, Item.id)
+    descending = sort.startswith("-")
+    if cursor is not None:
+        after = decode_cursor(cursor, sort)
+        query = query.where(key < after if descending else key > after)
+        if expression is Item.created_at:
+            # Row comparisons do not prune partitions, a plain bound does.
+            bound = after[0]
+            query = query.where(
+                Item.created_at <= bound if descending else Item.created_at >= bound
+            )
+    if descending:
+        return query.order_by(expression.desc(), Item.id.desc()).limit(limit + 1)
+    return query.order_by(expression, Item.id).limit(limit + 1)
@@ -0,0 +1,413 @@
+"""Module for the monthly partitions of the items table.
+
+The items table is range partitioned on ``created_at``, one partition per
+calendar month (UTC) named ``items_pYYYY_MM``, plus a default partition that
+catches rows outside every monthly partition. Queries bounded on
+``created_at`` only visit the partitions of that range, and vacuum and index
+maintenance work per partition, so the cost of recent data does not grow with
+the total history.
+
+A primary key on a partitioned table must include the partition key, so
+the (id, created_at) key of items cannot keep ids unique across partitions.
+The item_ids table does: triggers on items record the id and created_at of
+every inserted item there, and a reused id fails the insert. By-id queries
+read created_at from item_ids first, so only one partition is visited.
+Items are never moved by changing their id or created_at.
+
+Partitions for the coming months are created ahead of time. Should rows
+still land in the default partition, they are moved into their monthly
+partition when it is created. Old partitions can be archived: their rows
+are copied to a gzipped CSV file, and the partition is detached and dropped
+in the same transaction, so rows are never lost between the two.
+
+Run maintenance by hand with::
+
+    python -m src.items.partitions ensure
+    python -m src.items.partitions archive --before 2025-01-01
+"""
+
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import re
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import DDL, Column, DateTime, Table, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.core.config import (
+    ITEM_ARCHIVE_DIR,
+    ITEM_PARTITION_MAINTENANCE_SECONDS,
+    ITEM_PARTITION_RETENTION_MONTHS,
+    ITEM_PARTITIONS_AHEAD,
+)
+from src.database.database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLE = "items"
+DEFAULT_PARTITION = "items_default"
+# Columns written to archives; the generated search_vector is left out.
+ARCHIVE_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+
+item_ids = Table(
+    "item_ids",
+    Base.metadata,
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+)
+
+TRACK_ITEM_IDS = DDL(
+    """
+    CREATE OR REPLACE FUNCTION track_item_ids() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO item_ids (id, created_at)
+            SELECT id, created_at FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            DELETE FROM item_ids USING old_rows WHERE item_ids.id = old_rows.id;
+        ELSE
+            TRUNCATE item_ids;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """
+)
+# Transition tables are only allowed on single-event triggers.
+ITEM_IDS_TRIGGERS = [
+    DDL(
+        "CREATE TRIGGER items_ids_insert AFTER INSERT ON items "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION track_item_ids()"
+    ),
+    DDL(
+        "CREATE TRIGGER items_ids_delete AFTER DELETE ON items "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION track_item_ids()"
+    ),
+    DDL(
+        "CREATE TRIGGER items_ids_truncate AFTER TRUNCATE ON items "
+        "FOR EACH STATEMENT EXECUTE FUNCTION track_item_ids()"
+    ),
+]
+
+_PARTITION_NAME = re.compile(r"^items_p(\d{4})_(\d{2})$")
+# Serializes partition maintenance across workers.
+_MAINTENANCE_LOCK = 0x6974656D73
+
+
+def month_start(moment: datetime) -> datetime:
+    """Return the start of the UTC month of a moment."""
+    return moment.astimezone(UTC).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    """Return the start of the month count months after a month start."""
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Return the name of the partition of a month."""
+    return f"{PARTITIONED_TABLE}_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Return the month of a monthly partition name, None for other names."""
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return datetime(int(match[1]), int(match[2]), 1, tzinfo=UTC)
+
+
+def is_partition(name: str) -> bool:
+    """Tell whether a table name is a partition of the items table."""
+    return name == DEFAULT_PARTITION or partition_month(name) is not None
+
+
+def _bounds(month: datetime) -> Tuple[str, str]:
+    return month.isoformat(), add_months(month, 1).isoformat()
+
+
+def create_partition_sql(month: datetime) -> str:
+    """Return the DDL creating the partition of a month."""
+    lower, upper = _bounds(month)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {PARTITIONED_TABLE} "
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    )
+
+
+def create_initial_partitions(target, connection: Connection, **kw) -> None:
+    """Create the default and upcoming partitions of a newly created items table.
+
+    Registered for the after_create event of the table, so tables made by
+    create_all can take rows right away.
+    """
+    connection.execute(
+        text(
+            f"CREATE TABLE {DEFAULT_PARTITION} "
+            f"PARTITION OF {PARTITIONED_TABLE} DEFAULT"
+        )
+    )
+    current = month_start(datetime.now(UTC))
+    for offset in range(ITEM_PARTITIONS_AHEAD + 1):
+        connection.execute(text(create_partition_sql(add_months(current, offset))))
+
+
+async def list_partitions(conn: AsyncConnection) -> List[str]:
+    """Return the names of the partitions attached to the items table."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": PARTITIONED_TABLE},
+    )
+    return list(result.scalars())
+
+
+async def _lock_maintenance(conn: AsyncConnection) -> None:
+    await conn.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": _MAINTENANCE_LOCK}
+    )
+
+
+async def _add_partition(conn: AsyncConnection, month: datetime) -> None:
+    name = partition_name(month)
+    lower, upper = _bounds(month)
+    in_month = {"lower": month, "upper": add_months(month, 1)}
+    result = await conn.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :lower AND created_at < :upper)"
+        ),
+        in_month,
+    )
+    if not result.scalar():
+        await conn.execute(text(create_partition_sql(month)))
+        return
+    # A partition cannot be created over rows of the default partition, so
+    # they are moved into a new table first, which is then attached.
+    columns = ", ".join(ARCHIVE_COLUMNS)
+    await conn.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING GENERATED)"
+        )
+    )
+    await conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :lower AND created_at < :upper "
+            f"RETURNING {columns}) "
+            f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+        ),
+        in_month,
+    )
+    await conn.execute(
+        text(
+            f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+    )
+
+
+async def ensure_partitions(
+    engine: AsyncEngine,
+    ahead: int = ITEM_PARTITIONS_AHEAD,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """Create the partitions of the current and the next ahead months.
+
+    Months with rows in the default partition, up to the last of those
+    months, get their partition too.
+
+    Returns:
+        List[str]: The names of the created partitions.
+    """
+    current = month_start(now or datetime.now(UTC))
+    last = add_months(current, ahead)
+    created = []
+    async with engine.begin() as conn:
+        await _lock_maintenance(conn)
+        existing = set(await list_partitions(conn))
+        months = {add_months(current, offset) for offset in range(ahead + 1)}
+        result = await conn.execute(
+            text(
+                "SELECT DISTINCT date_trunc('month', created_at, 'UTC') "
+                f"FROM {DEFAULT_PARTITION} WHERE created_at < :last"
+            ),
+            {"last": add_months(last, 1)},
+        )
+        months.update(month_start(month) for month in result.scalars())
+        for month in sorted(months):
+            if partition_name(month) not in existing:
+                await _add_partition(conn, month)
+                created.append(partition_name(month))
+    return created
+
+
+async def archive_partition(
+    engine: AsyncEngine, name: str, directory: Path
+) -> Path:
+    """Archive a monthly partition to directory and drop it.
+
+    The rows are written to ``<name>.csv.gz`` with a header row. Writes to
+    the partition wait while it is copied; its ids are then removed from
+    item_ids, the partition detached, the cached item count adjusted and
+    the partition dropped, all in one transaction. The file only gets its
+    final name once that transaction committed.
+
+    Returns:
+        Path: The archive file.
+
+    Raises:
+        ValueError: If name is not an attached monthly partition.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.csv.gz"
+    partial = directory / f"{name}.csv.gz.partial"
+    try:
+        async with engine.begin() as conn:
+            await _lock_maintenance(conn)
+            partitions = await list_partitions(conn)
+            if partition_month(name) is None or name not in partitions:
+                raise ValueError(f"{name} is not a monthly partition of items")
+            await conn.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+            raw = await conn.get_raw_connection()
+            with gzip.open(partial, "wb") as archive:
+
+                async def write(chunk: bytes) -> None:
+                    await asyncio.to_thread(archive.write, chunk)
+
+                status = await raw.driver_connection.copy_from_table(
+                    name,
+                    columns=ARCHIVE_COLUMNS,
+                    output=write,
+                    format="csv",
+                    header=True,
+                )
+            rows = int(status.split()[-1])
+            # Rows leave the table without a DELETE, so the triggers that keep
+            # the ids, version and count of the collection do not fire.
+            await conn.execute(
+                text(
+                    f"DELETE FROM item_ids USING {name} AS archived "
+                    "WHERE item_ids.id = archived.id"
+                )
+            )
+            await conn.execute(
+                text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}")
+            )
+            await conn.execute(
+                text(
+                    "INSERT INTO collection_versions "
+                    "(name, shard, version, row_count) "
+                    "VALUES (:table, 0, 1, -CAST(:rows AS bigint)) "
+                    "ON CONFLICT (name, shard) DO UPDATE SET "
+                    "version = collection_versions.version + 1, "
+                    "row_count = collection_versions.row_count + excluded.row_count"
+                ),
+                {"rows": rows, "table": PARTITIONED_TABLE},
+            )
+            await conn.execute(text(f"DROP TABLE {name}"))
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, path)
+    logger.info("Archived %d items of %s to %s", rows, name, path)
+    return path
+
+
+async def archive_partitions(
+    engine: AsyncEngine, before: datetime, directory: Path
+) -> List[Path]:
+    """Archive every monthly partition that ends before the month of before.
+
+    Returns:
+        List[Path]: The archive files, oldest month first.
+    """
+    cutoff = month_start(before)
+    async with engine.connect() as conn:
+        names = await list_partitions(conn)
+    old = sorted(
+        name
+        for name in names
+        if (month := partition_month(name)) is not None
+        and add_months(month, 1) <= cutoff
+    )
+    return [await archive_partition(engine, name, directory) for name in old]
+
+
+async def maintain_partitions(
+    engine: AsyncEngine,
+    interval: float = ITEM_PARTITION_MAINTENANCE_SECONDS,
+    retention_months: int = ITEM_PARTITION_RETENTION_MONTHS,
+    directory: Path = Path(ITEM_ARCHIVE_DIR),
+) -> None:
+    """Create upcoming partitions and archive expired ones every interval.
+
+    Partitions are archived once they ended retention_months months ago;
+    0 keeps every partition. Runs until cancelled.
+    """
+    while True:
+        try:
+            created = await ensure_partitions(engine)
+            if created:
+                logger.info("Created item partitions %s", ", ".join(created))
+            if retention_months > 0:
+                before = add_months(month_start(datetime.now(UTC)), -retention_months)
+                await archive_partitions(engine, before, directory)
+        except Exception:
+            logger.exception("Item partition maintenance failed")
+        await asyncio.sleep(interval)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    try:
+        if args.command == "ensure":
+            for name in await ensure_partitions(engine, args.ahead):
+                print(f"created {name}")
+        else:
+            before = datetime.fromisoformat(args.before).replace(tzinfo=UTC)
+            for path in await archive_partitions(engine, before, Path(args.dir)):
+                print(f"archived {path}")
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    """Run partition maintenance from the command line."""
+    parser = argparse.ArgumentParser(description="Maintain the items partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="create upcoming partitions")
+    ensure.add_argument("--ahead", type=int, default=ITEM_PARTITIONS_AHEAD)
+    archive = commands.add_parser("archive", help="archive and drop old partitions")
+    archive.add_argument(
+        "--before", required=True, help="archive months ending by this date"
+    )
+    archive.add_argument("--dir", default=ITEM_ARCHIVE_DIR)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
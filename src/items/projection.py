@@ -0,0 +1,111 @@
+"""Module for item reads built from rows instead of ORM objects.
+
+Read endpoints select item columns with Core statements and serialize the
+resulting rows straight to JSON bytes through precompiled TypeAdapters. No
+ORM instances or identity map entries are created, and the ``response_model``
+validation pass is skipped: the response_model of a read route only
+documents the response.
+
+A ``fields`` query parameter names the ItemOut fields a client needs. Only
+those columns (plus the ones needed for pagination and ETags) are selected.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import RowMapping
+from typing_extensions import TypedDict
+
+from src.core.exceptions import BadRequestException
+
+from .models import Item
+
+ITEM_FIELDS = {
+    "id": Item.id,
+    "name": Item.name,
+    "description": Item.description,
+    "is_active": Item.is_active,
+}
+
+
+class ItemRow(TypedDict, total=False):
+    """JSON shape of an item read, every ItemOut field optional for fields=."""
+
+    id: UUID
+    name: str
+    description: Optional[str]
+    is_active: bool
+
+
+class ItemRowPage(TypedDict):
+    """JSON shape of an ItemPage built from rows."""
+
+    items: List[ItemRow]
+    next_cursor: Optional[str]
+    total: Optional[int]
+    total_mode: Optional[str]
+
+
+class ItemRowLookup(TypedDict):
+    """JSON shape of an ItemLookupResult built from rows."""
+
+    items: List[ItemRow]
+    missing: List[UUID]
+
+
+item_adapter = TypeAdapter(ItemRow)
+item_page_adapter = TypeAdapter(ItemRowPage)
+item_lookup_adapter = TypeAdapter(ItemRowLookup)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated fields parameter.
+
+    Returns:
+        The requested fields in ItemOut order, or None for every field.
+
+    Raises:
+        BadRequestException: If a field is unknown or none is given.
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - ITEM_FIELDS.keys()
+    if unknown or not requested:
+        raise BadRequestException(
+            f"Invalid fields, choose from: {', '.join(ITEM_FIELDS)}"
+        )
+    return [field for field in ITEM_FIELDS if field in requested]
+
+
+def projection_columns(fields: Optional[Sequence[str]], *extra) -> list:
+    """Return the columns to select for fields (None for all), plus extra columns."""
+    columns = [ITEM_FIELDS[field] for field in fields or ITEM_FIELDS]
+    return columns + [column for column in extra if column not in columns]
+
+
+def project(row: RowMapping, fields: Optional[Sequence[str]]) -> ItemRow:
+    """Build the representation of a row, restricted to fields if given."""
+    return {field: row[field] for field in fields or ITEM_FIELDS}
+
+
+def project_item(item: Item) -> ItemRow:
+    """Build the representation of an Item instance."""
+    return {field: getattr(item, field) for field in ITEM_FIELDS}
+
+
+def json_response(
+    data: Any,
+    adapter: TypeAdapter,
+    headers: Optional[Dict[str, str]] = None,
+    status_code: int = 200,
+) -> Response:
+    """Serialize data with a precompiled adapter into a JSON response."""
+    return Response(
+        adapter.dump_json(data),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
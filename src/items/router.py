@@ -1,35 +1,140 @@
 """Module for handling item-related routes in the application."""
 
-from typing import List
-from uuid import UUID
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.dependencies import get_current_active_user
-from src.auth.models import User
-from src.database.database import get_db
+from src.auth.principal import Principal
+from src.core.exceptions import (
+    PreconditionFailedException,
+    UnprocessableEntityException,
+)
+from src.database.database import get_db, streaming_session
 
+from .bulk import (
+    delete_items,
+    read_bulk_payloads,
+    update_items,
+    validate_bulk_payloads,
+)
+from .changes import change_feed, publish_bulk_change, publish_changes
+from .counting import CountMode, count_items
+from .etag import (
+    collection_etag,
+    collection_version,
+    etag_matches,
+    if_match_versions,
+    item_etag,
+    item_version,
+)
+from .export import EXPORT_FORMATS, export_items
+from .filters import item_conditions, item_id_conditions
+from .idempotency import IdempotentRequest, commit_response, get_idempotency
+from .ingest import (
+    ItemWriteQueue,
+    get_item_write_queue,
+    item_ingest_failures,
+    prefers_async,
+)
+from .loader import fetch_items
 from .models import Item
-from .schemas import ItemCreate, ItemOut, ItemUpdate
+from .pagination import ItemSort, encode_cursor, paginate, sort_columns
+from .projection import (
+    item_adapter,
+    item_lookup_adapter,
+    item_page_adapter,
+    json_response,
+    parse_fields,
+    project,
+    project_item,
+    projection_columns,
+)
+from .schemas import (
+    ItemAccepted,
+    ItemBulkCount,
+    ItemBulkResult,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemFilter,
+    ItemLookup,
+    ItemLookupResult,
+    ItemOut,
+    ItemPage,
+    ItemUpdate,
+)
+from .search import encode_search_cursor, search_query
 
 router = APIRouter()
 
 
-@router.post("/items", response_model=ItemOut, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/items",
+    response_model=ItemOut,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": ItemAccepted,
+            "description": "Queued for creation (Prefer: respond-async)",
+        }
+    },
+)
 async def create_item(
     item: ItemCreate,
+    request: Request,
+    prefer: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    write_queue: ItemWriteQueue = Depends(get_item_write_queue),
+    idempotency: Optional[IdempotentRequest] = Depends(get_idempotency),
+    current_user: Principal = Depends(get_current_active_user),
 ):
-    """Create a new item."""
+    """Create a new item.
+
+    With ``Prefer: respond-async`` the item is queued and written in a batch
+    with other items shortly after; the response is 202 with the id of the
+    item, or 503 when the queue is full.
+
+    Retries sending the Idempotency-Key of an earlier request get its
+    response instead of creating another item.
+    """
+    if idempotency is not None:
+        replayed = await idempotency.claim(db)
+        if replayed is not None:
+            return replayed
+    if prefers_async(prefer):
+        item_id = write_queue.submit(item)
+        response = JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"id": str(item_id)},
+            headers={
+                "Location": str(request.url_for("read_item", item_id=item_id)),
+                "Preference-Applied": "respond-async",
+            },
+        )
+        return await commit_response(db, idempotency, response)
     try:
-        db_item = Item(**item.model_dump())
+        db_item = Item(**item.model_dump(), id=uuid4())
         db.add(db_item)
-        await db.commit()
-        await db.refresh(db_item)
-        return db_item
+        await publish_changes(db, "create", [db_item.id])
+        await db.flush()
+        response = json_response(
+            project_item(db_item), item_adapter, status_code=status.HTTP_201_CREATED
+        )
+        return await commit_response(db, idempotency, response)
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -38,18 +143,177 @@ async def create_item(
         ) from e
 
 
-@router.get("/items", response_model=List[ItemOut])
+@router.post(
+    "/items/bulk", response_model=ItemBulkResult, status_code=status.HTTP_201_CREATED
+)
+async def create_items_bulk(
+    request: Request,
+    on_error: Literal["abort", "skip"] = "abort",
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """Create many items in one transaction.
+
+    The body is a JSON array or an NDJSON stream of items. With on_error=abort
+    (the default) any invalid row fails the request with 422 and the errors of
+    every invalid row; with on_error=skip the valid rows are created and the
+    invalid ones are reported in errors.
+    """
+    rows = await read_bulk_payloads(request)
+    valid, errors = validate_bulk_payloads(rows)
+    bulk_errors = [
+        {"index": index, "errors": row_errors}
+        for index, row_errors in sorted(errors.items())
+    ]
+    if bulk_errors and on_error == "abort":
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=bulk_errors
+        )
+    if not valid:
+        return {"items": [], "errors": bulk_errors}
+
+    try:
+        # A single multi-row INSERT ... RETURNING for the whole batch.
+        result = await db.scalars(
+            insert(Item).returning(Item, sort_by_parameter_order=True),
+            [item.model_dump() for _, item in valid],
+        )
+        items = result.all()
+        await publish_bulk_change(db, "create", [item.id for item in items])
+        await db.commit()
+        return {"items": items, "errors": bulk_errors}
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while creating the items: {str(e)}",
+        ) from e
+
+
+@router.patch("/items", response_model=ItemBulkCount)
+async def update_items_bulk(
+    request: ItemBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """Update every item matching a filter or id list.
+
+    The matching items are updated in chunks, each committed on its own, so
+    an interrupted request may have updated only part of them; repeating it
+    is safe.
+    """
+    try:
+        affected = await update_items(
+            db, request.filter, request.values.model_dump(exclude_unset=True)
+        )
+        return {"affected": affected}
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while updating the items: {str(e)}",
+        ) from e
+
+
+@router.delete("/items", response_model=ItemBulkCount)
+async def delete_items_bulk(
+    criteria: ItemFilter,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """Delete every item matching a filter or id list.
+
+    The matching items are deleted in chunks, each committed on its own, so
+    an interrupted request may have deleted only part of them; repeating it
+    is safe.
+    """
+    try:
+        return {"affected": await delete_items(db, criteria)}
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while deleting the items: {str(e)}",
+        ) from e
+
+
+@router.get("/items", response_model=ItemPage)
 async def read_items(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: ItemSort = Query(
+        "created_at", description="Sort key, prefix with - for descending order"
+    ),
+    is_active: Optional[bool] = None,
+    name_prefix: Optional[str] = Query(None, min_length=1),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    updated_after: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated item fields to return, e.g. id,name"
+    ),
+    count: Optional[CountMode] = Query(
+        None, description="Also return the number of matching items"
+    ),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ):
-    """Retrieve a list of items."""
+    """Retrieve a page of items, oldest first unless sort says otherwise.
+
+    Pass the next_cursor of a page as cursor to get the following page, with
+    the same sort. Filters combine with AND; updated_at of an item that was
+    never updated is its creation time, and names sort and match by
+    code point.
+
+    The ETag changes whenever any item changes; a request with a matching
+    If-None-Match gets a 304 without the page being read. Only the item
+    columns are read, serialized straight from the rows; with fields, only
+    those columns are read and returned.
+
+    With count, the page also carries total and the total_mode used: exact
+    (capped beyond a threshold), estimated from planner statistics, or
+    cached from a trigger-maintained counter (unfiltered lists only).
+    """
     try:
-        query = select(Item).offset(skip).limit(limit)
+        projection = parse_fields(fields)
+        conditions = item_conditions(
+            is_active=is_active,
+            name_prefix=name_prefix,
+            created_after=created_after,
+            created_before=created_before,
+            updated_after=updated_after,
+            updated_before=updated_before,
+        )
+        # Read before the page, so the ETag is never newer than the page.
+        version = await collection_version(db, Item.__tablename__)
+        etag = collection_etag(Item.__tablename__, version, weak=bool(projection))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+
+        total = total_mode = None
+        if count is not None:
+            total, total_mode = await count_items(db, conditions, count)
+
+        columns = projection_columns(projection, *sort_columns(sort))
+        query = paginate(select(*columns).where(*conditions), cursor, limit, sort)
         result = await db.execute(query)
-        return result.scalars().all()
+        rows = result.mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(rows[limit - 1], sort)
+        page = {
+            "items": [project(row, projection) for row in rows[:limit]],
+            "next_cursor": next_cursor,
+            "total": total,
+            "total_mode": total_mode,
+        }
+        return json_response(page, item_page_adapter, headers={"ETag": etag})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -57,20 +321,183 @@ async def read_items(
         ) from e
 
 
+@router.get("/items/export")
+async def export_items_route(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """Export every item as NDJSON or CSV.
+
+    The export is streamed from a server-side cursor, so it works for tables
+    of any size without paging.
+    """
+    media_type = EXPORT_FORMATS[format][0]
+    return StreamingResponse(
+        export_items(streaming_session(db), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
+    )
+
+
+@router.get("/items/search", response_model=ItemPage)
+async def search_items(
+    q: str = Query(..., min_length=1),
+    fuzzy: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """Search items, best matches first.
+
+    By default q is a web-style full-text query (quoted phrases, or, -word)
+    over name and description. With fuzzy=true, q is matched against the
+    name tolerating typos and partial words.
+    """
+    try:
+        query = await search_query(db, q, fuzzy, cursor, limit)
+        result = await db.execute(query)
+        rows = result.mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_search_cursor(last["score"], last["id"])
+        page = {
+            "items": [project(row, None) for row in rows[:limit]],
+            "next_cursor": next_cursor,
+            "total": None,
+            "total_mode": None,
+        }
+        return json_response(page, item_page_adapter)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while searching items: {str(e)}",
+        ) from e
+
+
+@router.post("/items/lookup", response_model=ItemLookupResult)
+async def lookup_items(
+    lookup: ItemLookup,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated item fields to return, e.g. id,name"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """Retrieve many items by id with a single query.
+
+    Items are returned in the order of the requested ids, each once; ids that
+    match no item are listed in missing. With fields, only those columns are
+    read and returned.
+    """
+    try:
+        projection = parse_fields(fields)
+        rows = await fetch_items(db, lookup.ids, projection)
+        found = {}
+        missing = {}
+        for item_id in lookup.ids:
+            row = rows.get(item_id)
+            if row is None:
+                missing[item_id] = None
+            elif item_id not in found:
+                found[item_id] = project(row, projection)
+        return json_response(
+            {"items": list(found.values()), "missing": list(missing)},
+            item_lookup_adapter,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while looking up items: {str(e)}",
+        ) from e
+
+
+@router.get("/items/changes")
+async def item_changes(
+    last_event_id: Optional[str] = Query(
+        None, description="Resume after this event, instead of Last-Event-ID"
+    ),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """Stream item changes as Server-Sent Events.
+
+    Every created, updated or deleted item produces an event named after the
+    operation, with the item id as data and a sequence number as event id.
+    A client that reconnects with Last-Event-ID gets the events it missed.
+    A reset event means events were lost and the client should reload the
+    items it shows.
+    """
+    return StreamingResponse(
+        change_feed.stream(last_event_id or last_event_id_header),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/items/{item_id}", response_model=ItemOut)
 async def read_item(
     item_id: UUID,
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated item fields to return, e.g. id,name"
+    ),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
 ):
-    """Retrieve a specific item by ID."""
+    """Retrieve a specific item by ID.
+
+    The response carries a strong ETag, or a weak one with fields. With a
+    matching If-None-Match only the item's version is read and a 304 is
+    returned. With fields, only those columns are read and returned. An item
+    queued with respond-async that could not be written answers 422.
+    """
     try:
-        query = select(Item).where(Item.id == item_id)
-        result = await db.execute(query)
-        db_item = result.scalar_one_or_none()
-        if db_item is None:
+        projection = parse_fields(fields)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            result = await db.execute(
+                select(item_version).where(*item_id_conditions(item_id))
+            )
+            version = result.scalar_one_or_none()
+            if version is not None:
+                etag = item_etag(item_id, version, weak=bool(projection))
+                if etag_matches(if_none_match, etag):
+                    return Response(
+                        status_code=status.HTTP_304_NOT_MODIFIED,
+                        headers={"ETag": etag},
+                    )
+
+        columns = projection_columns(projection, Item.id)
+        result = await db.execute(
+            select(*columns, item_version.label("version")).where(
+                *item_id_conditions(item_id)
+            )
+        )
+        row = result.mappings().one_or_none()
+        if row is None:
+            # A queued creation that could not be written is not just missing.
+            result = await db.execute(
+                select(item_ingest_failures.c.error).where(
+                    item_ingest_failures.c.id == item_id
+                )
+            )
+            error = result.scalar_one_or_none()
+            if error is not None:
+                raise UnprocessableEntityException(
+                    f"The item could not be created: {error}"
+                )
             raise HTTPException(status_code=404, detail="Item not found")
-        return db_item
+        etag = item_etag(row["id"], row["version"], weak=bool(projection))
+        return json_response(
+            project(row, projection), item_adapter, headers={"ETag": etag}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -80,28 +507,60 @@ async def read_item(
         ) from e
 
 
+def _raise_missing_or_modified(request: Request) -> None:
+    """Fail a conditional write that matched no row."""
+    if request.headers.get("if-match") is not None:
+        raise PreconditionFailedException("Item was modified or deleted")
+    raise HTTPException(status_code=404, detail="Item not found")
+
+
 @router.put("/items/{item_id}", response_model=ItemOut)
 async def update_item(
     item_id: UUID,
     item: ItemUpdate,
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    idempotency: Optional[IdempotentRequest] = Depends(get_idempotency),
+    current_user: Principal = Depends(get_current_active_user),
 ):
-    """Update an existing item."""
+    """Update an existing item.
+
+    The update is a single UPDATE ... RETURNING statement. Concurrent updates
+    of the same item are serialized by the row lock the statement takes: the
+    later one waits for the earlier to commit, then applies its fields on top,
+    so each field ends up with the value of the last writer.
+
+    To avoid overwriting a concurrent change, send the item's ETag in
+    If-Match; the update then only applies to that version and answers 412
+    if the item changed in the meantime. Retries sending the Idempotency-Key
+    of an earlier request get its response.
+    """
+    if idempotency is not None:
+        replayed = await idempotency.claim(db)
+        if replayed is not None:
+            return replayed
     try:
-        query = select(Item).where(Item.id == item_id)
+        update_data = item.model_dump(exclude_unset=True)
+        query = update(Item).where(*item_id_conditions(item_id))
+        versions = if_match_versions(request.headers.get("if-match"), item_id)
+        if versions is not None:
+            query = query.where(item_version.in_(versions))
+        query = (
+            query.values(**update_data, updated_at=func.now())
+            .returning(Item)
+            .execution_options(synchronize_session=False)
+        )
         result = await db.execute(query)
         db_item = result.scalar_one_or_none()
         if db_item is None:
-            raise HTTPException(status_code=404, detail="Item not found")
-
-        update_data = item.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(db_item, key, value)
-
-        await db.commit()
-        await db.refresh(db_item)
-        return db_item
+            _raise_missing_or_modified(request)
+        await publish_changes(db, "update", [db_item.id])
+        response = json_response(
+            project_item(db_item),
+            item_adapter,
+            headers={"ETag": item_etag(db_item.id, db_item.updated_at)},
+        )
+        return await commit_response(db, idempotency, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -115,20 +574,36 @@ async def update_item(
 @router.delete("/items/{item_id}", response_model=ItemOut)
 async def delete_item(
     item_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    idempotency: Optional[IdempotentRequest] = Depends(get_idempotency),
+    current_user: Principal = Depends(get_current_active_user),
 ):
-    """Delete an item."""
+    """Delete an item.
+
+    The deletion is a single DELETE ... RETURNING statement; when two requests
+    delete the same item, the second one finds no row and gets a 404, unless
+    it is a retry sending the Idempotency-Key of the first, which gets the
+    response of the first. With If-Match, only the given version is deleted,
+    otherwise the answer is 412.
+    """
+    if idempotency is not None:
+        replayed = await idempotency.claim(db)
+        if replayed is not None:
+            return replayed
     try:
-        query = select(Item).where(Item.id == item_id)
+        query = delete(Item).where(*item_id_conditions(item_id))
+        versions = if_match_versions(request.headers.get("if-match"), item_id)
+        if versions is not None:
+            query = query.where(item_version.in_(versions))
+        query = query.returning(Item).execution_options(synchronize_session=False)
         result = await db.execute(query)
         db_item = result.scalar_one_or_none()
         if db_item is None:
-            raise HTTPException(status_code=404, detail="Item not found")
-
-        await db.delete(db_item)
-        await db.commit()
-        return db_item
+            _raise_missing_or_modified(request)
+        await publish_changes(db, "delete", [db_item.id])
+        response = json_response(project_item(db_item), item_adapter)
+        return await commit_response(db, idempotency, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -4,9 +4,12 @@ This module defines the Pydantic models used for data validation and serializati
 for item-related operations.
 """
 
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict, UUID4
+from pydantic import BaseModel, ConfigDict, Field, UUID4, model_validator
+
+from src.core.config import ITEM_BULK_MAX_ITEMS, ITEM_LOOKUP_MAX_IDS
 
 
 class ItemCreate(BaseModel):
@@ -51,3 +54,134 @@ class ItemOut(BaseModel):
     name: str
     description: Optional[str]
     is_active: bool
+
+
+class ItemAccepted(BaseModel):
+    """Pydantic model for an item queued for asynchronous creation.
+
+    Attributes:
+        id (UUID4): The id the item will be created with.
+    """
+
+    id: UUID4
+
+
+class ItemPage(BaseModel):
+    """Pydantic model for a page of items.
+
+    Attributes:
+        items (List[ItemOut]): The items of the page.
+        next_cursor (Optional[str]): Cursor of the next page, None on the last page.
+        total (Optional[int]): Number of matching items, if a count was requested.
+        total_mode (Optional[str]): How total was obtained: exact, capped
+            (at least total), estimated or cached.
+    """
+
+    items: List[ItemOut]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_mode: Optional[str] = None
+
+
+class ItemLookup(BaseModel):
+    """Pydantic model for looking up many items by id.
+
+    Attributes:
+        ids (List[UUID4]): The ids of the items to return.
+    """
+
+    ids: List[UUID4] = Field(..., min_length=1, max_length=ITEM_LOOKUP_MAX_IDS)
+
+
+class ItemLookupResult(BaseModel):
+    """Pydantic model for the result of an item lookup.
+
+    Attributes:
+        items (List[ItemOut]): The found items, in the order of the requested
+            ids, each once.
+        missing (List[UUID4]): The requested ids that match no item.
+    """
+
+    items: List[ItemOut]
+    missing: List[UUID4]
+
+
+class ItemBulkError(BaseModel):
+    """Pydantic model for the validation errors of one bulk row.
+
+    Attributes:
+        index (int): Position of the row in the request body.
+        errors (List[dict]): The validation errors of the row.
+    """
+
+    index: int
+    errors: List[dict]
+
+
+class ItemBulkResult(BaseModel):
+    """Pydantic model for the result of a bulk item creation.
+
+    Attributes:
+        items (List[ItemOut]): The created items, in request order.
+        errors (List[ItemBulkError]): The rows that were skipped as invalid.
+    """
+
+    items: List[ItemOut]
+    errors: List[ItemBulkError] = []
+
+
+class ItemFilter(BaseModel):
+    """Pydantic model selecting the items of a bulk update or delete.
+
+    Every given criterion must match. At least one is required, so a whole
+    table is never changed by accident.
+
+    Attributes:
+        ids (Optional[List[UUID4]]): Only items with one of these ids.
+        is_active (Optional[bool]): Only items with this active status.
+        name_prefix (Optional[str]): Only items whose name starts with this.
+        created_after (Optional[datetime]): Only items created at or after this.
+        created_before (Optional[datetime]): Only items created before this.
+    """
+
+    ids: Optional[List[UUID4]] = Field(None, max_length=ITEM_BULK_MAX_ITEMS)
+    is_active: Optional[bool] = None
+    name_prefix: Optional[str] = Field(None, min_length=1)
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "ItemFilter":
+        """Require at least one criterion."""
+        if all(getattr(self, name) is None for name in type(self).model_fields):
+            raise ValueError("At least one filter criterion is required")
+        return self
+
+
+class ItemBulkUpdate(BaseModel):
+    """Pydantic model for updating every item matching a filter.
+
+    Attributes:
+        filter (ItemFilter): The items to update.
+        values (ItemUpdate): The fields to set on every matching item.
+    """
+
+    filter: ItemFilter
+    values: ItemUpdate
+
+    @model_validator(mode="after")
+    def check_values(self) -> "ItemBulkUpdate":
+        """Require at least one field to set."""
+        if not self.values.model_fields_set:
+            raise ValueError("At least one value to set is required")
+        return self
+
+
+class ItemBulkCount(BaseModel):
+    """Pydantic model for the result of a bulk update or delete.
+
+    Attributes:
+        affected (int): Number of items updated or deleted.
+    """
+
+    affected: int
@@ -0,0 +1,86 @@
+"""Module for item search.
+
+Full-text search matches the query against the generated ``search_vector``
+column through its GIN index and ranks the matches with ``ts_rank_cd``, so
+name matches outrank description matches. Fuzzy search uses pg_trgm word
+similarity on the name, which tolerates typos and matches prefixes; it is
+backed by a trigram GIN index and needs the pg_trgm extension.
+
+Results are paginated with a keyset on (score, id), score descending.
+"""
+
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.exceptions import BadRequestException
+
+from .models import Item
+from .pagination import decode_key, encode_key
+from .projection import projection_columns
+
+# Text search configuration of Item.search_vector.
+SEARCH_CONFIG = "english"
+
+_has_trigram: Optional[bool] = None
+
+
+async def has_trigram(db: AsyncSession) -> bool:
+    """Tell whether the pg_trgm extension is installed, checked once."""
+    global _has_trigram
+    if _has_trigram is None:
+        result = await db.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        )
+        _has_trigram = result.scalar() is not None
+    return _has_trigram
+
+
+def _decode_search_cursor(cursor: str) -> tuple[float, UUID]:
+    try:
+        score, item_id = decode_key(cursor)
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            raise TypeError("The cursor score is not a number")
+        if not isinstance(item_id, str):
+            raise TypeError("The cursor id is not a string")
+        return float(score), UUID(item_id)
+    except (TypeError, ValueError) as e:
+        raise BadRequestException("Invalid cursor") from e
+
+
+def encode_search_cursor(score: float, item_id: UUID) -> str:
+    """Encode the sort key of a search result as a page cursor."""
+    return encode_key([score, str(item_id)])
+
+
+async def search_query(
+    db: AsyncSession, q: str, fuzzy: bool, cursor: Optional[str], limit: int
+) -> Select:
+    """Build the query for a page of search results.
+
+    The query selects the item columns and their score, one row more than
+    limit.
+
+    Raises:
+        HTTPException: If fuzzy search is requested without pg_trgm.
+    """
+    if fuzzy:
+        if not await has_trigram(db):
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="Fuzzy search requires the pg_trgm extension",
+            )
+        score = func.word_similarity(q, Item.name)
+        match = literal(q).op("<%")(Item.name)
+    else:
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        score = func.ts_rank_cd(Item.search_vector, tsquery)
+        match = Item.search_vector.op("@@")(tsquery)
+
+    query = select(*projection_columns(None), score.label("score")).where(match)
+    if cursor is not None:
+        query = query.where(tuple_(score, Item.id) < _decode_search_cursor(cursor))
+    return query.order_by(score.desc(), Item.id.desc()).limit(limit + 1)
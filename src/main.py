@@ -4,17 +4,28 @@ This module sets up the FastAPI application, including middleware,
 routers, and event handlers for startup and shutdown.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 
+from src.auth.dependencies import get_current_superuser
+from src.auth.hashing import password_hasher
+from src.auth.principal import start_invalidation_listener
+from src.auth.refresh import purge_refresh_tokens
 from src.auth.router import router as auth_router
 from src.core.exceptions import add_exception_handlers
 from src.core.logging import logger
+from src.core.router import router as internal_router
 from src.database.database import Base, engine
+from src.database.listener import listener
+from src.items.changes import change_feed
+from src.items.idempotency import purge_idempotency_keys
+from src.items.ingest import item_write_queue
+from src.items.partitions import maintain_partitions
 from src.items.router import router as items_router
 
 load_dotenv()
@@ -26,12 +37,26 @@ async def lifespan(app: FastAPI):
     # Startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await start_invalidation_listener()
+    background_tasks = [
+        asyncio.create_task(maintain_partitions(engine)),
+        asyncio.create_task(purge_refresh_tokens()),
+        asyncio.create_task(purge_idempotency_keys()),
+    ]
     logger.info("Application started")
 
     yield
 
     # Shutdown
     logger.info("Application shutting down")
+    for task in background_tasks:
+        task.cancel()
+    # Let the tasks unwind before the connections they use are closed.
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await item_write_queue.close()
+    await change_feed.close()
+    await listener.close()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -56,6 +81,12 @@ app.add_middleware(
 # Include routers
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(items_router, prefix="/api", tags=["Items"])
+app.include_router(
+    internal_router,
+    prefix="/internal",
+    tags=["Internal"],
+    dependencies=[Depends(get_current_superuser)],
+)
 
 # Add exception handlers
 add_exception_handlers(app)
@@ -1,7 +1,25 @@
 """Tests for authentication endpoints."""
 
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
+from sqlalchemy import select
+
+from src.auth import importer
+from src.auth.hashing import PasswordHasher, build_crypt_context, pwd_context
+from src.auth.jwt import create_access_token, decode_token, token_cache
+from src.auth.models import RefreshToken, User
+from src.auth.principal import principal_cache
+from src.auth.refresh import hash_refresh_token, purge_expired_refresh_tokens
+from src.auth.throttling import login_account_limiter
+from src.core.exceptions import ServiceUnavailableException
+from src.core.ratelimit import SlidingWindowLimiter
+from src.database.database import streaming_session
 
 pytestmark = pytest.mark.asyncio
 
@@ -102,3 +120,387 @@ async def test_get_current_user_no_token(client):
     response = await client.get("/auth/me")
     assert response.status_code == 401
     assert response.json()["detail"] == "Not authenticated"
+
+
+async def test_password_hasher_rejects_when_queue_full():
+    """Test that a saturated hashing pool fails fast with a 503."""
+    hasher = PasswordHasher(max_workers=1, max_queue=0, retry_after=3)
+    try:
+        results = await asyncio.gather(
+            hasher.hash("first-password"),
+            hasher.hash("second-password"),
+            return_exceptions=True,
+        )
+    finally:
+        hasher.shutdown()
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], ServiceUnavailableException)
+    assert results[1].status_code == 503
+    assert results[1].headers == {"Retry-After": "3"}
+    assert await asyncio.to_thread(pwd_context.verify, "first-password", results[0])
+
+
+async def test_hashing_metrics(client, superuser_client):
+    """Test that hashing latency is reported by the internal metrics endpoint."""
+    await client.post(
+        "/auth/register",
+        json={"email": "metrics@example.com", "password": "testpassword123"},
+    )
+    response = await superuser_client.get("/internal/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["password_hash_seconds"]["count"] >= 1
+    assert data["password_hash_queue_depth"] == 0
+
+
+async def test_internal_routes_require_superuser(authenticated_client):
+    """Test that internal routes are hidden from anonymous and regular users."""
+    for path in ("/internal/metrics", "/internal/pool"):
+        response = await authenticated_client.get(path)
+        assert response.status_code == 403
+        response = await authenticated_client.get(path, headers={"Authorization": ""})
+        assert response.status_code == 401
+
+
+async def test_principal_cache(client, test_session):
+    """Test that the principal is cached and invalidated on deactivation."""
+    await client.post(
+        "/auth/register",
+        json={"email": "cached@example.com", "password": "testpassword123"},
+    )
+    login_response = await client.post(
+        "/auth/token",
+        data={"username": "cached@example.com", "password": "testpassword123"},
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    await client.get("/auth/me", headers=headers)
+    hits = principal_cache.hits.value
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert principal_cache.hits.value == hits + 1
+
+    result = await test_session.execute(
+        select(User).where(User.email == "cached@example.com")
+    )
+    user = result.scalar_one()
+    user.is_active = False
+    await test_session.commit()
+
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+async def test_token_verification_is_memoized():
+    """Test that a reused token is only verified once."""
+    token = create_access_token({"sub": "memo@example.com"})
+    hits = token_cache.hits.value
+    assert decode_token(token) == decode_token(token)
+    assert decode_token(token).email == "memo@example.com"
+    assert token_cache.hits.value == hits + 2
+
+
+async def test_expired_token_rejected():
+    """Test that an expired token is rejected and never cached."""
+    token = create_access_token(
+        {"sub": "expired@example.com"}, expires_delta=timedelta(seconds=-1)
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        decode_token(token)
+    assert exc_info.value.status_code == 401
+    with pytest.raises(HTTPException):
+        decode_token(token)
+
+
+async def test_principal_cache_uncommitted_deactivation(client, test_session):
+    """Test that a principal cached during a deactivation is dropped on commit."""
+    email = "deactivating@example.com"
+    await client.post(
+        "/auth/register", json={"email": email, "password": "testpassword123"}
+    )
+    login_response = await client.post(
+        "/auth/token", data={"username": email, "password": "testpassword123"}
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    async with streaming_session(test_session) as other:
+        user = (
+            await other.execute(select(User).where(User.email == email))
+        ).scalar_one()
+        user.is_active = False
+        await other.flush()
+        # A concurrent request still reads, and caches, the committed row
+        principal_cache.pop(email)
+        response = await client.get("/auth/me", headers=headers)
+        assert response.status_code == 200
+        await other.commit()
+
+    response = await client.get("/auth/me", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+async def test_refresh_token_rotation(client):
+    """Test refreshing tokens, rotation and reuse detection."""
+    await client.post(
+        "/auth/register",
+        json={"email": "refresh@example.com", "password": "testpassword123"},
+    )
+    login_response = await client.post(
+        "/auth/token",
+        data={"username": "refresh@example.com", "password": "testpassword123"},
+    )
+    first_refresh_token = login_response.json()["refresh_token"]
+
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": first_refresh_token}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["token_type"] == "bearer"
+    assert data["refresh_token"] != first_refresh_token
+    me_response = await client.get(
+        "/auth/me", headers={"Authorization": f"Bearer {data['access_token']}"}
+    )
+    assert me_response.json()["email"] == "refresh@example.com"
+
+    # Replaying the consumed token revokes the whole family
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": first_refresh_token}
+    )
+    assert response.status_code == 401
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": data["refresh_token"]}
+    )
+    assert response.status_code == 401
+
+
+async def test_logout_revokes_refresh_token(client):
+    """Test that a logged out refresh token can no longer be used."""
+    await client.post(
+        "/auth/register",
+        json={"email": "logout@example.com", "password": "testpassword123"},
+    )
+    login_response = await client.post(
+        "/auth/token",
+        data={"username": "logout@example.com", "password": "testpassword123"},
+    )
+    refresh_token = login_response.json()["refresh_token"]
+
+    response = await client.post("/auth/logout", json={"refresh_token": refresh_token})
+    assert response.status_code == 204
+    response = await client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid refresh token"
+
+
+async def test_purge_expired_refresh_tokens(client, test_session):
+    """Test that only families without an unexpired token are purged."""
+    await client.post(
+        "/auth/register",
+        json={"email": "purge@example.com", "password": "testpassword123"},
+    )
+    user = (
+        await test_session.execute(
+            select(User).where(User.email == "purge@example.com")
+        )
+    ).scalar_one()
+    now = datetime.now(UTC)
+    expired_family, live_family = uuid.uuid4(), uuid.uuid4()
+    test_session.add_all(
+        [
+            RefreshToken(
+                token_hash=hash_refresh_token(str(expires)),
+                family_id=family_id,
+                user_id=user.id,
+                expires_at=now + timedelta(days=expires),
+            )
+            for family_id, expires in (
+                (expired_family, -2),
+                (expired_family, -1),
+                (live_family, -3),
+                (live_family, 1),
+            )
+        ]
+    )
+    await test_session.commit()
+
+    assert await purge_expired_refresh_tokens(test_session, batch_size=1) == 2
+    result = await test_session.execute(
+        select(RefreshToken.family_id).where(RefreshToken.user_id == user.id)
+    )
+    assert result.scalars().all() == [live_family, live_family]
+
+
+async def test_login_throttled_per_account(client):
+    """Test that repeated logins to one account are rejected with a 429."""
+    for _ in range(login_account_limiter.limit):
+        response = await client.post(
+            "/auth/token",
+            data={"username": "Throttled@example.com", "password": "wrongpassword"},
+        )
+        assert response.status_code == 401
+
+    response = await client.post(
+        "/auth/token",
+        data={"username": "throttled@example.com", "password": "wrongpassword"},
+    )
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+async def test_sliding_window_limiter_memory_is_bounded():
+    """Test that the limiter evicts old keys and lets the window slide."""
+    limiter = SlidingWindowLimiter("test", limit=2, window=10, max_keys=4, shards=2)
+    for i in range(100):
+        assert limiter._check_local(f"key-{i}", now=0.0) is None
+    assert sum(len(shard) for shard in limiter._shards) <= 4
+
+    assert limiter._check_local("ip", now=0.0) is None
+    assert limiter._check_local("ip", now=1.0) is None
+    assert limiter._check_local("ip", now=2.0) == pytest.approx(8.0)
+    # Halfway through the next window, half of the previous hits still count
+    assert limiter._check_local("ip", now=15.0) is None
+    assert limiter._check_local("ip", now=15.0) is not None
+    assert limiter._check_local("ip", now=25.0) is None
+
+
+async def test_login_upgrades_outdated_hash(client, test_session):
+    """Test that a hash below the configured cost is replaced on login."""
+    weak_hash = build_crypt_context(["bcrypt"], bcrypt_rounds=4).hash("testpassword123")
+    test_session.add(User(email="rehash@example.com", hashed_password=weak_hash))
+    await test_session.commit()
+
+    response = await client.post(
+        "/auth/token",
+        data={"username": "rehash@example.com", "password": "testpassword123"},
+    )
+    assert response.status_code == 200
+
+    result = await test_session.execute(
+        select(User.hashed_password).where(User.email == "rehash@example.com")
+    )
+    upgraded_hash = result.scalar_one()
+    assert upgraded_hash != weak_hash
+    assert not pwd_context.needs_update(upgraded_hash)
+    assert pwd_context.verify("testpassword123", upgraded_hash)
+
+
+async def _login_superuser(client, test_session, email):
+    hashed_password = pwd_context.hash("testpassword123")
+    test_session.add(
+        User(email=email, hashed_password=hashed_password, is_superuser=True)
+    )
+    await test_session.commit()
+    response = await client.post(
+        "/auth/token", data={"username": email, "password": "testpassword123"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def test_import_users(client, test_session):
+    """Test that a bulk import reports created, duplicate and invalid rows."""
+    headers = await _login_superuser(client, test_session, "importer@example.com")
+    rows = [
+        '{"email": "import1@example.com", "password": "testpassword123"}',
+        '{"email": "import2@example.com", "password": "pw", "is_active": false}',
+        '{"email": "import1@example.com", "password": "testpassword123"}',
+        '{"email": "importer@example.com", "password": "testpassword123"}',
+        '{"email": "not-an-email", "password": "testpassword123"}',
+        "not json",
+    ]
+    response = await client.post(
+        "/auth/users/import",
+        content="\n".join(rows),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    statuses = {line["row"]: line["status"] for line in lines[:-1]}
+    assert statuses == {
+        1: "created",
+        2: "created",
+        3: "duplicate",
+        4: "duplicate",
+        5: "invalid",
+        6: "invalid",
+    }
+    assert lines[-1] == {"summary": {"created": 2, "duplicate": 2, "invalid": 2}}
+
+    result = await test_session.execute(
+        select(User).where(User.email == "import2@example.com")
+    )
+    user = result.scalar_one()
+    assert user.is_active is False
+    assert pwd_context.verify("pw", user.hashed_password)
+
+
+async def test_import_users_csv(client, test_session):
+    """Test that users can be imported from CSV."""
+    headers = await _login_superuser(client, test_session, "csvimporter@example.com")
+    response = await client.post(
+        "/auth/users/import",
+        content="email,password\ncsv1@example.com,testpassword123\n",
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert response.text.splitlines()[-1] == (
+        '{"summary": {"created": 1, "duplicate": 0, "invalid": 0}}'
+    )
+
+
+async def test_import_users_json_and_limits(client, test_session, monkeypatch):
+    """Test JSON array imports and the 413 of oversized imports."""
+    headers = await _login_superuser(client, test_session, "jsonimporter@example.com")
+    headers["Content-Type"] = "application/json"
+    rows = [{"email": "json1@example.com", "password": "testpassword123"}, "x"]
+    response = await client.post("/auth/users/import", json=rows, headers=headers)
+    assert response.status_code == 200
+    assert response.text.splitlines()[-1] == (
+        '{"summary": {"created": 1, "duplicate": 0, "invalid": 1}}'
+    )
+    response = await client.post(
+        "/auth/users/import", content='{"email": "a"}', headers=headers
+    )
+    assert response.status_code == 400
+
+    monkeypatch.setattr(importer, "USER_IMPORT_MAX_ROWS", 1)
+    response = await client.post("/auth/users/import", json=rows, headers=headers)
+    assert response.status_code == 413
+    body = "".join(f'{{"email": "cap{i}@example.com"}}\n' for i in range(2))
+    headers["Content-Type"] = "application/x-ndjson"
+    response = await client.post("/auth/users/import", content=body, headers=headers)
+    assert response.status_code == 413
+
+    monkeypatch.setattr(importer, "USER_IMPORT_MAX_BYTES", 10)
+
+    async def chunked():
+        yield body.encode()
+
+    response = await client.post(
+        "/auth/users/import", content=chunked(), headers=headers
+    )
+    assert response.status_code == 413
+
+
+async def test_import_users_requires_superuser(client):
+    """Test that only superusers can import users."""
+    await client.post(
+        "/auth/register",
+        json={"email": "notsuper@example.com", "password": "testpassword123"},
+    )
+    login_response = await client.post(
+        "/auth/token",
+        data={"username": "notsuper@example.com", "password": "testpassword123"},
+    )
+    response = await client.post(
+        "/auth/users/import",
+        content="{}",
+        headers={
+            "Authorization": f"Bearer {login_response.json()['access_token']}",
+            "Content-Type": "application/x-ndjson",
+        },
+    )
+    assert response.status_code == 403
@@ -0,0 +1,48 @@
+"""Tests for the database engine and connection pool."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.config import DATABASE_URL
+from src.core.metrics import metrics
+from src.database.database import InstrumentedPool, pool_status
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_pool_metrics(superuser_client: AsyncClient):
+    """Test that pool usage and checkout waits are reported."""
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    app_metrics = metrics.snapshot()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            status = pool_status(engine.pool, max_overflow=0)
+            assert (status["size"], status["checked_out"], status["idle"]) == (1, 1, 0)
+            assert status["max_overflow"] == 0
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+        status = pool_status(engine.pool, max_overflow=0)
+        assert status["idle"] == 1
+        assert status["checkout_seconds"]["count"] == 2
+        assert status["checkout_timeouts"] == 1
+    finally:
+        await engine.dispose()
+    # The checkouts of another pool are not counted for the application's
+    for name in ("db_pool_checkout_seconds", "db_pool_checkout_timeouts_total"):
+        assert metrics.snapshot()[name] == app_metrics[name]
+
+    response = await superuser_client.get("/internal/pool")
+    assert response.status_code == 200
+    assert {"size", "checked_out", "idle", "overflow"} <= response.json().keys()
+    response = await superuser_client.get("/internal/metrics")
+    assert "db_pool_checked_out" in response.json()
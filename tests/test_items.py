@@ -1,7 +1,58 @@
 """Tests for item-related endpoints."""
 
+import asyncio
+import csv
+import gzip
+import io
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import get_args
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from src.core.config import DATABASE_URL
+from src.core.exceptions import ServiceUnavailableException
+from src.database.database import streaming_session
+from src.database.listener import PgListener, asyncpg_dsn
+from src.items import bulk
+from src.items.bulk import delete_items, update_items
+from src.items.changes import (
+    BULK_EVENT_MAX_IDS,
+    ITEM_CHANGES_CHANNEL,
+    KEEPALIVE,
+    RESET,
+    ChangeFeed,
+    publish_bulk_change,
+    publish_changes,
+)
+from src.items.counting import count_items
+from src.items.etag import collection_version
+from src.items.export import export_items
+from src.items.filters import item_conditions, item_id_conditions
+from src.items.idempotency import (
+    idempotency_keys,
+    idempotency_store,
+    purge_expired_idempotency_keys,
+)
+from src.items.ingest import ItemWriteQueue, get_item_write_queue
+from src.items.loader import ItemLoader
+from src.items.models import Item
+from src.items.pagination import ItemSort, encode_cursor, encode_key, paginate
+from src.items.partitions import (
+    DEFAULT_PARTITION,
+    archive_partitions,
+    ensure_partitions,
+    item_ids,
+    month_start,
+    partition_name,
+)
+from src.items.schemas import ItemCreate, ItemFilter, ItemOut, ItemPage
+from src.main import app
 
 pytestmark = pytest.mark.asyncio
 
@@ -35,9 +86,11 @@ async def test_read_items(authenticated_client: AsyncClient, test_item: dict):
     response = await authenticated_client.get("/api/items")
     assert response.status_code == 200
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) >= 1
-    assert any(item["id"] == test_item["id"] for item in data)
+    assert isinstance(data["items"], list)
+    assert len(data["items"]) >= 1
+    assert any(item["id"] == test_item["id"] for item in data["items"])
+    # Rows are serialized without the response model, but must match it.
+    assert ItemPage.model_validate(data).model_dump(mode="json") == data
 
 
 async def test_read_items_pagination(authenticated_client: AsyncClient):
@@ -49,11 +102,41 @@ async def test_read_items_pagination(authenticated_client: AsyncClient):
             json={"name": f"Item {i}", "description": f"Description {i}"},
         )
 
-    # Test pagination
-    response = await authenticated_client.get("/api/items?skip=2&limit=2")
-    assert response.status_code == 200
-    data = response.json()
-    assert len(data) == 2
+    # Walk every page and check that no item is skipped or repeated
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await authenticated_client.get("/api/items", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= 2
+        seen.extend(item["id"] for item in data["items"])
+        if data["next_cursor"] is None:
+            break
+        params["cursor"] = data["next_cursor"]
+
+    assert len(seen) == len(set(seen))
+    response = await authenticated_client.get("/api/items", params={"limit": 1000})
+    assert seen == [item["id"] for item in response.json()["items"]]
+
+
+async def test_read_items_invalid_cursor(authenticated_client: AsyncClient):
+    """Test that a malformed cursor is rejected."""
+    response = await authenticated_client.get("/api/items?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+    # Well-formed cursors holding values of the wrong type
+    for key in (
+        ["created_at", "2024-01-01T00:00:00", 5],
+        ["created_at", 5, str(uuid.uuid4())],
+        ["name", ["Item"], str(uuid.uuid4())],
+    ):
+        response = await authenticated_client.get(
+            "/api/items", params={"cursor": encode_key(key), "sort": key[0]}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
 
 
 async def test_read_item(authenticated_client: AsyncClient, test_item: dict):
@@ -64,6 +147,7 @@ async def test_read_item(authenticated_client: AsyncClient, test_item: dict):
     assert data["id"] == test_item["id"]
     assert data["name"] == test_item["name"]
     assert data["description"] == test_item["description"]
+    assert ItemOut.model_validate(data).model_dump(mode="json") == data
 
 
 async def test_read_item_not_found(authenticated_client: AsyncClient):
@@ -152,3 +236,748 @@ async def test_update_item_invalid_data(
         json={"name": ["invalid"]},  # name should be a string
     )
     assert response.status_code == 422  # Validation error
+
+
+async def test_create_items_bulk(authenticated_client: AsyncClient):
+    """Test creating many items from a JSON array."""
+    payload = [{"name": f"Bulk {i}", "description": f"Bulk {i}"} for i in range(3)]
+    response = await authenticated_client.post("/api/items/bulk", json=payload)
+    assert response.status_code == 201
+    data = response.json()
+    assert [item["name"] for item in data["items"]] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    assert data["errors"] == []
+
+    response = await authenticated_client.get(f"/api/items/{data['items'][0]['id']}")
+    assert response.status_code == 200
+
+
+async def test_create_items_bulk_ndjson_skip_errors(authenticated_client: AsyncClient):
+    """Test that invalid NDJSON rows are reported and skipped on request."""
+    body = '{"name": "Ndjson 0"}\n{"description": "no name"}\n{"name": "Ndjson 2"}\n'
+    response = await authenticated_client.post(
+        "/api/items/bulk?on_error=skip",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert [item["name"] for item in data["items"]] == ["Ndjson 0", "Ndjson 2"]
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["errors"][0]["loc"] == ["name"]
+
+
+async def test_create_items_bulk_aborts_on_error(authenticated_client: AsyncClient):
+    """Test that an invalid row fails the whole request by default."""
+    response = await authenticated_client.post(
+        "/api/items/bulk", json=[{"name": "Aborted"}, {"name": ["invalid"]}]
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["index"] == 1
+
+    response = await authenticated_client.get("/api/items", params={"limit": 1000})
+    assert all(item["name"] != "Aborted" for item in response.json()["items"])
+
+
+async def test_create_items_bulk_limits(
+    authenticated_client: AsyncClient, monkeypatch
+):
+    """Test that oversized bulk bodies are rejected with 413."""
+    monkeypatch.setattr(bulk, "ITEM_BULK_MAX_ITEMS", 2)
+    body = "".join(f'{{"name": "Limit {i}"}}\n' for i in range(3))
+    response = await authenticated_client.post(
+        "/api/items/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 413
+
+    monkeypatch.setattr(bulk, "ITEM_BULK_MAX_BYTES", len(body) - 1)
+    response = await authenticated_client.post("/api/items/bulk", content=body)
+    assert response.status_code == 413
+
+    async def chunked():
+        yield body.encode()
+
+    response = await authenticated_client.post(
+        "/api/items/bulk",
+        content=chunked(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 413
+
+
+async def test_bulk_update_and_delete_items(authenticated_client: AsyncClient):
+    """Test updating and deleting items selected by a filter."""
+    payload = [{"name": f"Cleanup_{i}"} for i in range(5)]
+    response = await authenticated_client.post("/api/items/bulk", json=payload)
+    ids = [item["id"] for item in response.json()["items"]]
+
+    response = await authenticated_client.patch(
+        "/api/items",
+        json={"filter": {"name_prefix": "Cleanup_"}, "values": {"is_active": False}},
+    )
+    assert response.status_code == 200
+    assert response.json() == {"affected": 5}
+    response = await authenticated_client.get(f"/api/items/{ids[0]}")
+    assert response.json()["is_active"] is False
+
+    response = await authenticated_client.request(
+        "DELETE", "/api/items", json={"ids": ids[:2]}
+    )
+    assert response.json() == {"affected": 2}
+    response = await authenticated_client.request(
+        "DELETE", "/api/items", json={"name_prefix": "Cleanup_", "is_active": False}
+    )
+    assert response.json() == {"affected": 3}
+    response = await authenticated_client.get(f"/api/items/{ids[4]}")
+    assert response.status_code == 404
+
+
+async def test_bulk_items_chunks(test_session):
+    """Test that bulk changes walk every chunk of matching items."""
+    test_session.add_all(Item(name=f"Chunked {i}") for i in range(7))
+    await test_session.commit()
+    criteria = ItemFilter(name_prefix="Chunked ")
+
+    assert await update_items(test_session, criteria, {"is_active": False}, 3) == 7
+    assert await delete_items(test_session, criteria, chunk_size=3) == 7
+
+
+async def test_bulk_delete_requires_filter(authenticated_client: AsyncClient):
+    """Test that a bulk delete without criteria is rejected."""
+    response = await authenticated_client.request("DELETE", "/api/items", json={})
+    assert response.status_code == 422
+
+
+async def test_export_items(authenticated_client: AsyncClient, test_item: dict):
+    """Test streaming every item as NDJSON and CSV."""
+    response = await authenticated_client.get("/api/items/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert any(row["id"] == test_item["id"] for row in rows)
+
+    response = await authenticated_client.get("/api/items/export?format=csv")
+    assert response.status_code == 200
+    lines = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(lines) == len(rows)
+    assert any(line["id"] == test_item["id"] for line in lines)
+
+
+async def test_export_items_in_batches(test_session):
+    """Test that an export is produced one fetched batch at a time."""
+    test_session.add_all(Item(name=f"Export {i}") for i in range(5))
+    await test_session.commit()
+    session = streaming_session(test_session)
+    chunks = [chunk async for chunk in export_items(session, "ndjson", fetch_size=2)]
+    assert len(chunks) > 2
+    assert all(chunk.count(b"\n") <= 2 for chunk in chunks)
+
+
+async def test_search_items(authenticated_client: AsyncClient):
+    """Test ranked full-text search with keyset pagination."""
+    await authenticated_client.post(
+        "/api/items/bulk",
+        json=[
+            {"name": "Walnut bookshelf", "description": "Solid wood"},
+            {"name": "Desk lamp", "description": "Fits on a walnut bookshelf"},
+            {"name": "Walnut side table"},
+        ],
+    )
+    response = await authenticated_client.get(
+        "/api/items/search", params={"q": "walnut bookshelf", "limit": 1}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    # Name matches rank above description matches
+    assert [item["name"] for item in data["items"]] == ["Walnut bookshelf"]
+
+    response = await authenticated_client.get(
+        "/api/items/search",
+        params={"q": "walnut bookshelf", "cursor": data["next_cursor"]},
+    )
+    data = response.json()
+    assert [item["name"] for item in data["items"]] == ["Desk lamp"]
+    assert data["next_cursor"] is None
+
+    # Well-formed cursors holding values of the wrong type
+    for key in ([1.0, 5], ["1.0", str(uuid.uuid4())], [True, str(uuid.uuid4())]):
+        response = await authenticated_client.get(
+            "/api/items/search", params={"q": "walnut", "cursor": encode_key(key)}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+
+async def test_search_items_fuzzy(authenticated_client: AsyncClient):
+    """Test typo-tolerant search on the name."""
+    await authenticated_client.post("/api/items", json={"name": "Mahogany wardrobe"})
+    response = await authenticated_client.get(
+        "/api/items/search", params={"q": "mahogny", "fuzzy": True}
+    )
+    if response.status_code == 501:
+        pytest.skip("pg_trgm is not installed")
+    assert response.status_code == 200
+    assert "Mahogany wardrobe" in [item["name"] for item in response.json()["items"]]
+
+
+async def test_read_item_etag(authenticated_client: AsyncClient, test_item: dict):
+    """Test conditional GETs of an item."""
+    url = f"/api/items/{test_item['id']}"
+    response = await authenticated_client.get(url)
+    etag = response.headers["etag"]
+
+    response = await authenticated_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    await authenticated_client.put(url, json={"name": "Changed"})
+    response = await authenticated_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+async def test_read_items_etag(authenticated_client: AsyncClient, test_item: dict):
+    """Test that the list ETag changes with any item change."""
+    response = await authenticated_client.get("/api/items")
+    etag = response.headers["etag"]
+    response = await authenticated_client.get(
+        "/api/items", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    await authenticated_client.delete(f"/api/items/{test_item['id']}")
+    response = await authenticated_client.get(
+        "/api/items", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+async def test_concurrent_writers_bump_separate_versions(test_session):
+    """Test that concurrent item writers do not wait on one version row."""
+    version = await collection_version(test_session, "items")
+    await test_session.commit()
+
+    async with (
+        streaming_session(test_session) as first,
+        streaming_session(test_session) as second,
+    ):
+        await second.execute(text("SET LOCAL lock_timeout = '1s'"))
+        first.add(Item(name="Writer 1"))
+        await first.flush()
+        # Would wait for the first writer to commit on a shared row
+        second.add(Item(name="Writer 2"))
+        await second.flush()
+        await first.commit()
+        await second.commit()
+
+    assert await collection_version(test_session, "items") == version + 2
+
+
+async def test_update_item_if_match(authenticated_client: AsyncClient, test_item: dict):
+    """Test optimistic concurrency with If-Match."""
+    url = f"/api/items/{test_item['id']}"
+    etag = (await authenticated_client.get(url)).headers["etag"]
+
+    response = await authenticated_client.put(
+        url, json={"name": "First"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    new_etag = response.headers["etag"]
+
+    # A writer still holding the old version is rejected
+    response = await authenticated_client.put(
+        url, json={"name": "Second"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+    response = await authenticated_client.delete(url, headers={"If-Match": etag})
+    assert response.status_code == 412
+
+    response = await authenticated_client.delete(url, headers={"If-Match": new_etag})
+    assert response.status_code == 200
+
+
+async def test_read_items_fields(authenticated_client: AsyncClient, test_item: dict):
+    """Test sparse fieldsets on item reads."""
+    response = await authenticated_client.get(
+        "/api/items", params={"fields": "id,name", "limit": 1000}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert all(set(item) == {"id", "name"} for item in data["items"])
+    assert any(item["id"] == test_item["id"] for item in data["items"])
+    assert response.headers["etag"].startswith("W/")
+
+    response = await authenticated_client.get(
+        f"/api/items/{test_item['id']}", params={"fields": "name"}
+    )
+    assert response.json() == {"name": test_item["name"]}
+    response = await authenticated_client.get(
+        f"/api/items/{test_item['id']}",
+        params={"fields": "name"},
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+    response = await authenticated_client.get("/api/items?fields=name,secret")
+    assert response.status_code == 400
+
+
+async def test_read_items_fields_pagination(authenticated_client: AsyncClient):
+    """Test that projected pages follow the same cursors."""
+    await authenticated_client.post(
+        "/api/items/bulk", json=[{"name": f"Projected {i}"} for i in range(3)]
+    )
+    full = await authenticated_client.get("/api/items", params={"limit": 2})
+    projected = await authenticated_client.get(
+        "/api/items", params={"limit": 2, "fields": "id"}
+    )
+    assert projected.json()["next_cursor"] == full.json()["next_cursor"]
+    assert projected.json()["items"] == [
+        {"id": item["id"]} for item in full.json()["items"]
+    ]
+
+
+async def test_read_items_filters_and_sort(authenticated_client: AsyncClient):
+    """Test filtering and sorting the items list."""
+    response = await authenticated_client.post(
+        "/api/items/bulk",
+        json=[{"name": "Sorted b"}, {"name": "Sorted a"}, {"name": "Sorted c"}],
+    )
+    ids = [item["id"] for item in response.json()["items"]]
+    await authenticated_client.put(f"/api/items/{ids[2]}", json={"is_active": False})
+
+    params = {"name_prefix": "Sorted ", "sort": "-name", "limit": 1}
+    names = []
+    while True:
+        data = (await authenticated_client.get("/api/items", params=params)).json()
+        names.extend(item["name"] for item in data["items"])
+        if data["next_cursor"] is None:
+            break
+        params["cursor"] = data["next_cursor"]
+    assert names == ["Sorted c", "Sorted b", "Sorted a"]
+
+    await authenticated_client.put(f"/api/items/{ids[1]}", json={"description": "x"})
+    response = await authenticated_client.get(
+        "/api/items",
+        params={"name_prefix": "Sorted ", "is_active": True, "sort": "-updated_at"},
+    )
+    assert [item["name"] for item in response.json()["items"]] == [
+        "Sorted a",
+        "Sorted b",
+    ]
+
+    # A cursor only continues the sort it was made for
+    response = await authenticated_client.get(
+        "/api/items", params={"cursor": data["next_cursor"] or params["cursor"]}
+    )
+    assert response.status_code == 400
+
+
+async def test_read_items_queries_use_indexes(test_session):
+    """Test that every supported filter and sort combination uses an index."""
+    # Plan against statistics of a realistically sized table: a month of
+    # items, most of them active and half of them updated since.
+    await test_session.execute(
+        text(
+            "INSERT INTO items (id, name, is_active, created_at, updated_at) "
+            "SELECT gen_random_uuid(), md5(i::text), i % 10 <> 0, "
+            "now() - i * interval '2 minutes', "
+            "CASE WHEN i % 2 = 0 THEN now() - i * interval '1 minute' END "
+            "FROM generate_series(1, 20000) AS i"
+        )
+    )
+    await test_session.execute(text("ANALYZE items"))
+    result = await test_session.execute(
+        text("SELECT DISTINCT tableoid::regclass::text FROM items")
+    )
+    # Empty partitions are scanned sequentially at no cost
+    populated = result.scalars().all()
+    now = datetime.now(UTC)
+    filter_sets = [
+        {},
+        {"is_active": True},
+        {"is_active": False},
+        {"name_prefix": "abc"},
+        {"is_active": True, "name_prefix": "abc"},
+        {"created_after": now - timedelta(days=1), "created_before": now},
+        {"updated_after": now - timedelta(days=1)},
+        {"is_active": True, "updated_before": now},
+    ]
+    row = {"name": "cursor", "created_at": now, "updated_at": now, "id": uuid.uuid4()}
+    for sort in get_args(ItemSort):
+        for filters in filter_sets:
+            for cursor in (None, encode_cursor(row, sort)):
+                query = paginate(
+                    select(Item).where(*item_conditions(**filters)), cursor, 100, sort
+                )
+                compiled = query.compile(
+                    dialect=postgresql.dialect(),
+                    compile_kwargs={"literal_binds": True},
+                )
+                result = await test_session.execute(text(f"EXPLAIN {compiled}"))
+                plan = "\n".join(result.scalars())
+                assert not any(
+                    f"Seq Scan on {name} " in plan for name in populated
+                ), (sort, filters, cursor, plan)
+
+
+async def test_read_items_count(authenticated_client: AsyncClient, test_session):
+    """Test the total count modes of the items list."""
+    await authenticated_client.post(
+        "/api/items/bulk", json=[{"name": f"Counted {i}"} for i in range(3)]
+    )
+    params = {"name_prefix": "Counted ", "limit": 1}
+
+    data = (await authenticated_client.get("/api/items", params=params)).json()
+    assert "total" not in data or data["total"] is None
+
+    data = (
+        await authenticated_client.get("/api/items", params={**params, "count": "exact"})
+    ).json()
+    assert (data["total"], data["total_mode"]) == (3, "exact")
+
+    total, mode = await count_items(
+        test_session, item_conditions(name_prefix="Counted "), "exact", cap=2
+    )
+    assert (total, mode) == (2, "capped")
+
+    data = (
+        await authenticated_client.get(
+            "/api/items", params={**params, "count": "estimated"}
+        )
+    ).json()
+    assert data["total_mode"] == "estimated"
+    assert data["total"] >= 0
+
+    # The cached count is the exact size of the whole table
+    data = (await authenticated_client.get("/api/items?count=cached")).json()
+    assert data["total_mode"] == "cached"
+    result = await test_session.execute(select(func.count()).select_from(Item))
+    assert data["total"] == result.scalar_one()
+
+    # Filtered lists have no cached count and fall back to an estimate
+    data = (
+        await authenticated_client.get("/api/items", params={**params, "count": "cached"})
+    ).json()
+    assert data["total_mode"] == "estimated"
+
+
+async def test_lookup_items(authenticated_client: AsyncClient):
+    """Test looking up many items by id in request order."""
+    response = await authenticated_client.post(
+        "/api/items/bulk", json=[{"name": f"Lookup {i}"} for i in range(3)]
+    )
+    ids = [item["id"] for item in response.json()["items"]]
+    unknown = str(uuid.uuid4())
+
+    response = await authenticated_client.post(
+        "/api/items/lookup", json={"ids": [ids[2], unknown, ids[0], ids[2]]}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [ids[2], ids[0]]
+    assert data["items"][0]["name"] == "Lookup 2"
+    assert data["missing"] == [unknown]
+
+    response = await authenticated_client.post(
+        "/api/items/lookup?fields=name", json={"ids": [ids[1]]}
+    )
+    assert response.json() == {"items": [{"name": "Lookup 1"}], "missing": []}
+
+    response = await authenticated_client.post("/api/items/lookup", json={"ids": []})
+    assert response.status_code == 422
+
+
+async def test_item_loader_batches(test_session):
+    """Test that loads from one event loop iteration share a query."""
+    ids = list(
+        await test_session.scalars(
+            insert(Item).returning(Item.id), [{"name": f"Loaded {i}"} for i in range(3)]
+        )
+    )
+    await test_session.commit()
+    queries = []
+    sync_engine = test_session.bind.sync_engine
+
+    def count_query(conn, cursor, statement, *args):
+        queries.append(statement)
+
+    event.listen(sync_engine, "before_cursor_execute", count_query)
+    try:
+        loader = ItemLoader(test_session)
+        unknown = uuid.uuid4()
+        first, rows = await asyncio.gather(
+            loader.load(ids[0]), loader.load_many([ids[2], unknown, ids[1]])
+        )
+        again = await loader.load(ids[0])
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count_query)
+    assert len(queries) == 1
+    assert first["name"] == "Loaded 0" and again is first
+    assert [row and row["name"] for row in rows] == ["Loaded 2", None, "Loaded 1"]
+
+
+async def test_item_loader_close(test_session):
+    """Test that closing a loader cancels its loads instead of leaving them."""
+    async with streaming_session(test_session) as db:
+        loader = ItemLoader(db)
+        load = asyncio.ensure_future(loader.load(uuid.uuid4()))
+        # Let the batch be dispatched and its query start
+        for _ in range(3):
+            await asyncio.sleep(0)
+        await loader.close()
+        with pytest.raises(asyncio.CancelledError):
+            await load
+
+        result = await db.scalars(insert(Item).returning(Item.id), [{"name": "Again"}])
+        item_id = result.one()
+        assert (await loader.load(item_id))["name"] == "Again"
+
+
+async def test_item_changes_feed(authenticated_client: AsyncClient, test_session):
+    """Test that item writes reach change feed subscribers after commit."""
+    pg_listener = PgListener(asyncpg_dsn(DATABASE_URL))
+    feed = ChangeFeed(ITEM_CHANGES_CHANNEL, 10, queue_size=3, pg_listener=pg_listener)
+    try:
+        queue = await feed.subscribe()
+        response = await authenticated_client.post("/api/items", json={"name": "Fed"})
+        url = f"/api/items/{response.json()['id']}"
+        await authenticated_client.put(url, json={"name": "Fed again"})
+        await authenticated_client.delete(url)
+
+        events = [await asyncio.wait_for(queue.get(), 5) for _ in range(3)]
+        assert [event.event for event in events] == ["create", "update", "delete"]
+        assert {json.loads(event.data)["id"] for event in events} == {
+            response.json()["id"]
+        }
+        assert events[0].encode().startswith(f"id: {events[0].id}\n".encode())
+
+        # Resume after the first event, or reset from an unknown one
+        resumed = await feed.subscribe(last_event_id=events[0].id)
+        assert [resumed.get_nowait() for _ in range(2)] == events[1:]
+        reset = await feed.subscribe(last_event_id="unknown")
+        assert reset.get_nowait() == RESET
+
+        # Bulk changes publish one event listing or counting the ids
+        ids = [uuid.uuid4() for _ in range(BULK_EVENT_MAX_IDS + 1)]
+        await publish_bulk_change(test_session, "delete", ids[:2])
+        await publish_bulk_change(test_session, "delete", ids)
+        await test_session.commit()
+        events = [await asyncio.wait_for(queue.get(), 5) for _ in range(2)]
+        assert [json.loads(event.data) for event in events] == [
+            {"op": "delete", "ids": [str(item_id) for item_id in ids[:2]]},
+            {"op": "delete", "count": len(ids)},
+        ]
+
+        # A subscriber that falls behind is reset instead of growing
+        await publish_changes(test_session, "update", [uuid.uuid4() for _ in range(4)])
+        await test_session.commit()
+        assert await asyncio.wait_for(queue.get(), 5) == RESET
+        assert queue.empty()
+
+        # Streams subscribe when iterated and unsubscribe when closed
+        await feed.stream().aclose()
+        assert feed.subscriber_count == 3
+        stream = feed.stream(keepalive=0.01)
+        assert await anext(stream) == KEEPALIVE
+        assert feed.subscriber_count == 4
+        await stream.aclose()
+        assert feed.subscriber_count == 3
+    finally:
+        await feed.close()
+        await pg_listener.close()
+
+
+async def test_item_ids_unique_across_partitions(
+    authenticated_client: AsyncClient, test_session
+):
+    """Test that ids are unique across partitions and lead to one partition."""
+    response = await authenticated_client.post("/api/items", json={"name": "Pinned"})
+    item_id = uuid.UUID(response.json()["id"])
+    with pytest.raises(IntegrityError):
+        await test_session.execute(
+            insert(Item),
+            [{"id": item_id, "name": "Copy", "created_at": datetime(2001, 3, 1)}],
+        )
+    await test_session.rollback()
+
+    query = select(Item.id).where(*item_id_conditions(item_id))
+    compiled = query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    result = await test_session.execute(
+        text(f"EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF) {compiled}")
+    )
+    scans = [line for line in result.scalars() if " on items_" in line]
+    assert len(scans) > 1
+    assert len([scan for scan in scans if "never executed" not in scan]) == 1
+
+
+async def test_item_partitions(test_engine, test_session, tmp_path):
+    """Test partition pruning, creating partitions and archiving old ones."""
+    now = datetime.now(UTC)
+    result = await test_session.execute(
+        text(
+            "EXPLAIN SELECT * FROM items "
+            f"WHERE created_at >= '{month_start(now).isoformat()}' "
+            f"AND created_at < '{now.isoformat()}'"
+        )
+    )
+    plan = "\n".join(result.scalars())
+    assert partition_name(month_start(now)) in plan
+    assert DEFAULT_PARTITION not in plan, plan
+
+    # Rows outside every partition land in the default one until it exists
+    old = datetime(2001, 3, 15, tzinfo=UTC)
+    await test_session.execute(
+        insert(Item), [{"name": f"Old {i}", "created_at": old} for i in range(2)]
+    )
+    await test_session.commit()
+    created = await ensure_partitions(test_engine, ahead=1)
+    assert created == ["items_p2001_03"]
+    result = await test_session.execute(
+        text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE created_at = :old"),
+        {"old": old},
+    )
+    assert result.scalar() == 0
+    await test_session.commit()
+    assert await ensure_partitions(test_engine, ahead=1) == []
+
+    # Archiving copies the rows out, then drops the partition
+    paths = await archive_partitions(test_engine, datetime(2001, 4, 1), tmp_path)
+    assert paths == [tmp_path / "items_p2001_03.csv.gz"]
+    with gzip.open(paths[0], "rt") as archive:
+        rows = list(csv.DictReader(archive))
+    assert sorted(row["name"] for row in rows) == ["Old 0", "Old 1"]
+    result = await test_session.execute(
+        select(func.count()).select_from(Item).where(Item.created_at == old)
+    )
+    assert result.scalar() == 0
+    result = await test_session.execute(
+        select(func.count()).select_from(item_ids).where(item_ids.c.created_at == old)
+    )
+    assert result.scalar() == 0
+    total = await count_items(test_session, [], "cached")
+    result = await test_session.execute(select(func.count()).select_from(Item))
+    assert total == (result.scalar(), "cached")
+
+
+async def test_create_item_async(authenticated_client: AsyncClient, test_session):
+    """Test that respond-async creations are queued and written in batches."""
+    write_queue = ItemWriteQueue(
+        max_size=3,
+        batch_size=2,
+        flush_interval=0.01,
+        session_factory=lambda: streaming_session(test_session),
+    )
+    app.dependency_overrides[get_item_write_queue] = lambda: write_queue
+    headers = {"Prefer": "respond-async"}
+    try:
+        responses = [
+            await authenticated_client.post(
+                "/api/items", json={"name": f"Queued {i}"}, headers=headers
+            )
+            for i in range(3)
+        ]
+        assert {response.status_code for response in responses} == {202}
+        assert responses[0].headers["Preference-Applied"] == "respond-async"
+        ids = [response.json()["id"] for response in responses]
+        assert responses[0].headers["Location"].endswith(f"/api/items/{ids[0]}")
+        await write_queue.drain()
+        response = await authenticated_client.post(
+            "/api/items/lookup", json={"ids": ids}
+        )
+        assert [item["name"] for item in response.json()["items"]] == [
+            f"Queued {i}" for i in range(3)
+        ]
+
+        # An item that cannot be written fails alone and is reported
+        bad = [
+            write_queue.submit(ItemCreate(name="Fine")),
+            write_queue.submit(ItemCreate(name="Broken", description="nul \x00")),
+        ]
+        await write_queue.drain()
+        response = await authenticated_client.get(f"/api/items/{bad[0]}")
+        assert response.status_code == 200
+        response = await authenticated_client.get(f"/api/items/{bad[1]}")
+        assert response.status_code == 422
+        assert response.json()["detail"].startswith("The item could not be created")
+
+        # A full queue pushes back instead of growing
+        for i in range(3):
+            write_queue.submit(ItemCreate(name=f"Backlog {i}"))
+        with pytest.raises(ServiceUnavailableException):
+            write_queue.submit(ItemCreate(name="Rejected"))
+
+        # Closing writes the backlog, then rejects new items
+        await write_queue.close()
+        result = await test_session.execute(
+            select(func.count()).select_from(Item).where(Item.name.like("Backlog %"))
+        )
+        assert result.scalar() == 3
+        response = await authenticated_client.post(
+            "/api/items", json={"name": "Late"}, headers=headers
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        del app.dependency_overrides[get_item_write_queue]
+
+
+async def test_item_writes_idempotency(authenticated_client: AsyncClient, test_session):
+    """Test that retried writes with an Idempotency-Key are answered once."""
+    headers = {"Idempotency-Key": "create-once"}
+    created = await authenticated_client.post(
+        "/api/items", json={"name": "Idempotent"}, headers=headers
+    )
+    assert created.status_code == 201
+    assert "Idempotent-Replayed" not in created.headers
+
+    for clear_cache in (False, True):
+        if clear_cache:
+            idempotency_store.cache.clear()
+        retried = await authenticated_client.post(
+            "/api/items", json={"name": "Idempotent"}, headers=headers
+        )
+        assert retried.status_code == 201
+        assert retried.headers["Idempotent-Replayed"] == "true"
+        assert retried.json() == created.json()
+    result = await test_session.execute(
+        select(func.count()).select_from(Item).where(Item.name == "Idempotent")
+    )
+    assert result.scalar() == 1
+
+    response = await authenticated_client.post(
+        "/api/items", json={"name": "Other"}, headers=headers
+    )
+    assert response.status_code == 422
+
+    url = f"/api/items/{created.json()['id']}"
+    headers = {"Idempotency-Key": "update-once"}
+    body = {"name": "Renamed"}
+    updated = await authenticated_client.put(url, json=body, headers=headers)
+    retried = await authenticated_client.put(url, json=body, headers=headers)
+    assert retried.json() == updated.json() == {**created.json(), "name": "Renamed"}
+    assert retried.headers["ETag"] == updated.headers["ETag"]
+
+    # The retry of a delete gets the response of the delete, not a 404
+    headers = {"Idempotency-Key": "delete-once"}
+    deleted = await authenticated_client.delete(url, headers=headers)
+    retried = await authenticated_client.delete(url, headers=headers)
+    assert deleted.status_code == retried.status_code == 200
+    assert retried.json() == deleted.json()
+    response = await authenticated_client.delete(url)
+    assert response.status_code == 404
+
+    # Expired keys are purged in batches, not by the writes
+    await test_session.execute(
+        idempotency_keys.update().values(expires_at=func.now())
+    )
+    await test_session.commit()
+    assert await purge_expired_idempotency_keys(test_session, batch_size=2) == 3
+    result = await test_session.execute(
+        select(func.count()).select_from(idempotency_keys)
+    )
+    assert result.scalar() == 0
@@ -0,0 +1,81 @@
+"""Tests for JWT signing, verification and the signing keyring."""
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from fastapi import HTTPException
+
+from src.auth import keys
+from src.auth.jwt import create_access_token, decode_token, token_cache
+from src.auth.keys import KeyRing
+
+pytestmark = pytest.mark.asyncio
+
+
+def write_private_key(path, private_key) -> None:
+    """Write a private key as an unencrypted PKCS8 PEM file."""
+    path.write_bytes(
+        private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+    )
+
+
+async def test_keyring_rotation(tmp_path, monkeypatch):
+    """Test signing with kid headers across an overlapping key rotation."""
+    write_private_key(tmp_path / "old.pem", ec.generate_private_key(ec.SECP256R1()))
+    write_private_key(tmp_path / "new.pem", ed25519.Ed25519PrivateKey.generate())
+
+    monkeypatch.setattr(keys, "keyring", KeyRing.from_directory(tmp_path, "old"))
+    old_token = create_access_token({"sub": "rotate@example.com"})
+
+    monkeypatch.setattr(keys, "keyring", KeyRing.from_directory(tmp_path, "new"))
+    new_token = create_access_token({"sub": "rotate@example.com"})
+    token_cache.clear()
+
+    assert decode_token(old_token).email == "rotate@example.com"
+    assert decode_token(new_token).email == "rotate@example.com"
+
+    (tmp_path / "old.pem").unlink()
+    monkeypatch.setattr(keys, "keyring", KeyRing.from_directory(tmp_path, "new"))
+    token_cache.clear()
+    with pytest.raises(HTTPException):
+        decode_token(old_token)
+
+
+async def test_keyring_requires_active_key(tmp_path):
+    """Test that a keyring with several private keys needs an active kid."""
+    write_private_key(tmp_path / "a.pem", ed25519.Ed25519PrivateKey.generate())
+    write_private_key(tmp_path / "b.pem", ed25519.Ed25519PrivateKey.generate())
+    with pytest.raises(ValueError):
+        KeyRing.from_directory(tmp_path)
+
+
+async def test_jwks_endpoint(client, tmp_path, monkeypatch):
+    """Test that the JWKS endpoint publishes public keys with cache headers."""
+    write_private_key(tmp_path / "k1.pem", ec.generate_private_key(ec.SECP256R1()))
+    monkeypatch.setattr(keys, "keyring", KeyRing.from_directory(tmp_path))
+
+    response = await client.get("/auth/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert "max-age=" in response.headers["cache-control"]
+    (jwk,) = response.json()["keys"]
+    assert jwk["kid"] == "k1"
+    assert jwk["alg"] == "ES256"
+    assert "d" not in jwk
+
+    etag = response.headers["etag"]
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}'):
+        response = await client.get(
+            "/auth/.well-known/jwks.json", headers={"If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304
+
+
+async def test_jwks_endpoint_shared_secret(client):
+    """Test that a shared secret is never published."""
+    response = await client.get("/auth/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}